@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Benchmark every stage of the analysis pipeline on synthetic panels.
+
+For each panel size a CSV export in the real format (``;`` delimiter, decimal
+commas, enzymes as rows) is generated and run through the stages behind the
+GUI, without Tk:
+
+- ``import_data``: parse the CSV
+- ``compute_correlation_matrix``: correlate all enzyme pairs and round
+- ``compute_histogram``: count the lower-triangle correlations per bin
+- ``sort_into_groups``: build the cutoff index and look up the grouping
+
+Like the GUI, the histogram and the grouping work on the unrounded matrix, and
+only the heatmap shows the rounded one.
+- ``plot_correlation``: draw and render the heatmap on an Agg canvas
+- ``plot_histogram``: draw and render the histogram on an Agg canvas
+
+Startup is measured as well: every module in ``STARTUP_MODULES`` is imported
+in a fresh interpreter, and the import is recorded as stage ``import <module>``
+of a ``0 x 0`` panel so that it is compared with the baseline like any stage.
+
+Each stage reports its best wall time over ``--repeat`` runs and the peak
+memory it allocated on top of its inputs, measured with tracemalloc in a
+separate run so that tracing does not slow the timed runs. Results are saved
+as JSON; a previous result file passed as ``--baseline`` is compared stage by
+stage, and the script exits with status 1 when a stage got slower or bigger
+than the tolerance allows.
+
+Two panel presets are available: the default quick one (``DEFAULT_ENZYMES``
+x ``DEFAULT_SUBSTRATES``), and ``--full``, which covers 10 to 10,000 enzymes
+times 5 to 500 substrates (``FULL_ENZYMES`` x ``FULL_SUBSTRATES``). The
+heatmap rasterizes one cell per enzyme pair, which takes several GiB for
+10,000 enzymes, so ``--full`` leaves out ``plot_correlation`` unless it is
+named with ``--include-heatmap``.
+
+The reference results live in ``benchmarks/baseline.json`` (``BASELINE``),
+recorded with ``--full`` on the machine described in its metadata. Timings only
+compare on similar hardware; regenerate the file on the machine that runs the
+comparison before relying on it.
+
+Usage:
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --full --output benchmarks/baseline.json
+    python benchmarks/bench_pipeline.py --full --baseline
+    python benchmarks/bench_pipeline.py --baseline other_results.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable, Sequence
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import matplotlib
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from enzyme_correlator.analysis import (
+    DEFAULT_CUTOFF,
+    DISPLAY_DECIMALS,
+    histogram_axis,
+    histogram_counts,
+)
+from enzyme_correlator.correlation import correlate
+from enzyme_correlator.grouping import CutoffIndex
+from enzyme_correlator.parsing import read_activity_csv
+from enzyme_correlator.plotting import (
+    CORRELATION_FIGSIZE,
+    HISTOGRAM_FIGSIZE,
+    draw_correlation_matrix,
+    draw_histogram,
+)
+
+DEFAULT_ENZYMES = (10, 100, 1000)
+DEFAULT_SUBSTRATES = (5, 50)
+FULL_ENZYMES = (10, 100, 1000, 10000)
+FULL_SUBSTRATES = (5, 50, 500)
+BASELINE = Path(__file__).with_name("baseline.json")
+DEFAULT_TOLERANCE = 0.25
+# Stages faster than this are too noisy to flag as regressions.
+MIN_COMPARED_SECONDS = 0.005
+STARTUP_MODULES = (
+    "enzyme_correlator",
+    "enzyme_correlator.correlation",
+    "enzyme_correlator.analysis",
+    "enzyme_correlator.batch",
+    "enzyme_correlator.gui",
+)
+_STARTUP_SCRIPT = """
+import importlib, sys, time, tracemalloc
+if sys.argv[2] == "memory":
+    tracemalloc.start()
+start = time.perf_counter()
+importlib.import_module(sys.argv[1])
+seconds = time.perf_counter() - start
+print(seconds, tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0)
+"""
+
+
+def write_panel(path: Path, enzymes: int, substrates: int, seed: int = 0) -> None:
+    """Write a synthetic activity export in the format of the plate reader.
+
+    Enzymes are drawn around a few shared activity profiles, so the panel has
+    groups at the default cutoff like a real screen.
+
+    Args:
+        path: CSV file to write.
+        enzymes: Number of enzyme rows.
+        substrates: Number of substrate columns.
+        seed: Seed of the random activities.
+    """
+    rng = np.random.default_rng(seed)
+    profiles = rng.random((max(1, enzymes // 10), substrates))
+    activities = profiles[rng.integers(0, len(profiles), enzymes)]
+    activities += 0.1 * rng.standard_normal((enzymes, substrates))
+    pd.DataFrame(
+        np.round(activities, 3),
+        index=[f"Enzyme{i + 1}" for i in range(enzymes)],
+        columns=[f"Substrate{j + 1}" for j in range(substrates)],
+    ).to_csv(path, sep=";", decimal=",")
+
+
+def _render(fig: Figure) -> None:
+    FigureCanvasAgg(fig).draw()  # type: ignore[no-untyped-call]
+
+
+STAGES = (
+    "import_data",
+    "compute_correlation_matrix",
+    "compute_histogram",
+    "sort_into_groups",
+    "plot_correlation",
+    "plot_histogram",
+)
+
+
+def pipeline_stages(
+    path: Path, method: str = "pearson", skip: Sequence[str] = ()
+) -> list[tuple[str, Callable[[dict[str, Any]], None]]]:
+    """Build the stages, each reading its inputs from and storing its output in a state dict.
+
+    Args:
+        path: CSV export to analyze.
+        method: Correlation method.
+        skip: Names of stages to leave out; only the plot stages have no
+            later stage depending on them.
+    """
+    bins = histogram_axis()
+
+    def import_data(state: dict[str, Any]) -> None:
+        state["df"] = read_activity_csv(path)
+
+    def compute_correlation_matrix(state: dict[str, Any]) -> None:
+        state["raw"] = correlate(state["df"].to_numpy(dtype=np.float64), method=method)
+        state["matrix"] = np.round(state["raw"], DISPLAY_DECIMALS)
+        state["names"] = tuple(str(enzyme) for enzyme in state["df"].columns)
+
+    def compute_histogram(state: dict[str, Any]) -> None:
+        state["counts"] = histogram_counts(state["raw"])
+
+    def sort_into_groups(state: dict[str, Any]) -> None:
+        state["grouping"] = CutoffIndex(state["raw"], state["names"]).grouping(DEFAULT_CUTOFF)
+
+    def plot_correlation(state: dict[str, Any]) -> None:
+        fig = Figure(figsize=CORRELATION_FIGSIZE)
+        draw_correlation_matrix(fig, state["matrix"], state["names"])
+        _render(fig)
+
+    def plot_histogram(state: dict[str, Any]) -> None:
+        fig = Figure(figsize=HISTOGRAM_FIGSIZE)
+        draw_histogram(fig, state["counts"], bins, DEFAULT_CUTOFF)
+        _render(fig)
+
+    stages = {
+        "import_data": import_data,
+        "compute_correlation_matrix": compute_correlation_matrix,
+        "compute_histogram": compute_histogram,
+        "sort_into_groups": sort_into_groups,
+        "plot_correlation": plot_correlation,
+        "plot_histogram": plot_histogram,
+    }
+    return [(name, stages[name]) for name in STAGES if name not in skip]
+
+
+def _peak_bytes(stage: Callable[[dict[str, Any]], None], state: dict[str, Any]) -> int:
+    """Run a stage under tracemalloc and return its peak allocation above the start."""
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        stage(state)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return max(0, peak - start)
+
+
+def benchmark_panel(
+    path: Path,
+    enzymes: int,
+    substrates: int,
+    repeat: int,
+    method: str,
+    skip: Sequence[str] = (),
+) -> list[dict[str, Any]]:
+    """Time and measure every stage on one panel.
+
+    Returns:
+        One record per stage.
+    """
+    stages = pipeline_stages(path, method, skip)
+    timings: dict[str, list[float]] = {name: [] for name, _ in stages}
+    for _ in range(repeat):
+        state: dict[str, Any] = {}
+        for name, stage in stages:
+            start = time.perf_counter()
+            stage(state)
+            timings[name].append(time.perf_counter() - start)
+        # release the previous run's matrix before building the next one
+        del state
+
+    state = {}
+    records = []
+    for name, stage in stages:
+        records.append(
+            {
+                "enzymes": enzymes,
+                "substrates": substrates,
+                "stage": name,
+                "seconds": min(timings[name]),
+                "peak_bytes": _peak_bytes(stage, state),
+            }
+        )
+    return records
+
+
+def _import_in_fresh_interpreter(module: str, mode: str) -> tuple[float, int]:
+    completed = subprocess.run(
+        [sys.executable, "-c", _STARTUP_SCRIPT, module, mode],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    seconds, peak_bytes = completed.stdout.split()
+    return float(seconds), int(peak_bytes)
+
+
+def benchmark_startup(
+    modules: Sequence[str] = STARTUP_MODULES, repeat: int = 3
+) -> list[dict[str, Any]]:
+    """Time the import of each module in fresh interpreters and trace its memory once.
+
+    Returns:
+        One ``import <module>`` record per module, with a ``0 x 0`` panel.
+    """
+    records = []
+    for module in modules:
+        seconds = min(_import_in_fresh_interpreter(module, "time")[0] for _ in range(repeat))
+        records.append(
+            {
+                "enzymes": 0,
+                "substrates": 0,
+                "stage": f"import {module}",
+                "seconds": seconds,
+                "peak_bytes": _import_in_fresh_interpreter(module, "memory")[1],
+            }
+        )
+    return records
+
+
+def compare(
+    results: Sequence[dict[str, Any]],
+    baseline: Sequence[dict[str, Any]],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> list[str]:
+    """List the stages that got slower or allocate more than the baseline allows.
+
+    Args:
+        results: Records of the current run.
+        baseline: Records of the reference run.
+        tolerance: Allowed relative increase of time and peak memory.
+
+    Returns:
+        One message per regression.
+    """
+    reference = {(r["enzymes"], r["substrates"], r["stage"]): r for r in baseline}
+    regressions = []
+    for record in results:
+        key = (record["enzymes"], record["substrates"], record["stage"])
+        if key not in reference:
+            continue
+        label = f"{record['stage']} ({record['enzymes']} x {record['substrates']})"
+        before = reference[key]
+        seconds, reference_seconds = record["seconds"], before["seconds"]
+        measurable = max(seconds, reference_seconds) >= MIN_COMPARED_SECONDS
+        if measurable and seconds > reference_seconds * (1 + tolerance):
+            regressions.append(f"{label}: {reference_seconds:.4f} s -> {seconds:.4f} s")
+        if record["peak_bytes"] > before["peak_bytes"] * (1 + tolerance) + 1024:
+            regressions.append(
+                f"{label}: {before['peak_bytes'] / 2**20:.2f} MiB -> "
+                f"{record['peak_bytes'] / 2**20:.2f} MiB"
+            )
+    return regressions
+
+
+def _format_table(results: Sequence[dict[str, Any]]) -> str:
+    lines = [f"{'panel':>13}  {'stage':<38} {'time':>10} {'peak memory':>14}"]
+    for record in results:
+        panel = f"{record['enzymes']} x {record['substrates']}" if record["enzymes"] else "startup"
+        lines.append(
+            f"{panel:>13}  {record['stage']:<38} {record['seconds']:>8.4f} s "
+            f"{record['peak_bytes'] / 2**20:>10.2f} MiB"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Benchmark the pipeline on every requested panel size."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--enzymes",
+        type=int,
+        nargs="+",
+        help=f"panel sizes in enzymes (default: {' '.join(map(str, DEFAULT_ENZYMES))})",
+    )
+    parser.add_argument(
+        "--substrates",
+        type=int,
+        nargs="+",
+        help=f"panel sizes in substrates (default: {' '.join(map(str, DEFAULT_SUBSTRATES))})",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help=(
+            f"benchmark {' '.join(map(str, FULL_ENZYMES))} enzymes x "
+            f"{' '.join(map(str, FULL_SUBSTRATES))} substrates, without the heatmap"
+        ),
+    )
+    parser.add_argument(
+        "--include-heatmap",
+        action="store_true",
+        help="keep plot_correlation in the --full preset (needs several GiB)",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage")
+    parser.add_argument("--method", default="pearson", help="correlation method")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--skip",
+        nargs="+",
+        choices=[stage for stage in STAGES if stage.startswith("plot_")],
+        default=[],
+        help="stages to leave out",
+    )
+    parser.add_argument("--no-startup", action="store_true", help="skip timing the package imports")
+    parser.add_argument("--output", type=Path, help="write the results to this JSON file")
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        nargs="?",
+        const=BASELINE,
+        help=f"JSON results to compare against (without a path: {BASELINE.name})",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help=f"allowed relative slowdown (default: {DEFAULT_TOLERANCE})",
+    )
+    args = parser.parse_args(argv)
+    if args.full and (args.enzymes or args.substrates):
+        parser.error("--full sets the panel sizes; leave out --enzymes and --substrates")
+    preset = "full" if args.full else "custom" if args.enzymes or args.substrates else "default"
+    if args.full:
+        args.enzymes, args.substrates = list(FULL_ENZYMES), list(FULL_SUBSTRATES)
+        if not args.include_heatmap and "plot_correlation" not in args.skip:
+            args.skip.append("plot_correlation")
+    args.enzymes = args.enzymes or list(DEFAULT_ENZYMES)
+    args.substrates = args.substrates or list(DEFAULT_SUBSTRATES)
+
+    results = [] if args.no_startup else benchmark_startup(repeat=args.repeat)
+    with tempfile.TemporaryDirectory() as directory:
+        for enzymes in args.enzymes:
+            for substrates in args.substrates:
+                path = Path(directory) / f"panel_{enzymes}x{substrates}.csv"
+                write_panel(path, enzymes, substrates, seed=args.seed)
+                results.extend(
+                    benchmark_panel(path, enzymes, substrates, args.repeat, args.method, args.skip)
+                )
+    print(_format_table(results))
+
+    if args.output is not None:
+        report = {
+            "metadata": {
+                "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "pandas": pd.__version__,
+                "matplotlib": matplotlib.__version__,
+                "machine": platform.machine(),
+                "preset": preset,
+                "method": args.method,
+                "repeat": args.repeat,
+                "seed": args.seed,
+                "skipped": args.skip,
+            },
+            "results": results,
+        }
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+"""
+Display-free analysis core.
+
+Everything needed to go from a CSV export to a correlation matrix, a histogram
+and an enzyme grouping, without importing tkinter. ``EnzymeCorrelatorGUI`` and
+the batch command line both delegate to these functions.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from enzyme_correlator.correlation import (
+    DEFAULT_TILE_SIZE,
+    METHODS,
+    CondensedMatrix,
+    Correlations,
+    correlate,
+    lower_tiles,
+    overlap_counts,
+    pearson_condensed,
+    pearson_equivalent,
+    pearson_matrix,
+    pearson_matrix_tiled,
+    strict_lower_values,
+)
+from enzyme_correlator.grouping import group_enzymes
+from enzyme_correlator.parsing import read_activity_csv
+
+__all__ = [
+    "DEFAULT_CUTOFF",
+    "DISPLAY_DECIMALS",
+    "HISTOGRAM_BINSIZE",
+    "AnalysisResult",
+    "analysis_result",
+    "analyze",
+    "analyze_file",
+    "bin_correlations",
+    "correlation_matrix",
+    "histogram_axis",
+    "histogram_counts",
+    "histogram_values",
+    "read_activity_csv",
+]
+
+DEFAULT_CUTOFF = 0.85
+DISPLAY_DECIMALS = 2
+HISTOGRAM_BINSIZE = 0.05
+
+
+def correlation_matrix(
+    df: pd.DataFrame, lower_triangle_only: bool = False, method: str = "pearson"
+) -> np.ndarray[Any, np.dtype[np.float64]]:
+    """Compute the enzyme correlation matrix rounded to two decimals.
+
+    Args:
+        df: Substrates x enzymes activity frame.
+        lower_triangle_only: Leave the strict upper triangle at zero.
+        method: Correlation method, one of
+            :data:`~enzyme_correlator.correlation.METHODS`.
+
+    Returns:
+        The enzymes x enzymes correlation matrix.
+    """
+    return np.round(
+        correlate(
+            df.to_numpy(dtype=np.float64), method=method, lower_triangle_only=lower_triangle_only
+        ),
+        DISPLAY_DECIMALS,
+    )
+
+
+def histogram_values(
+    matrix: np.ndarray[Any, np.dtype[np.float64]],
+) -> np.ndarray[Any, np.dtype[np.float64]]:
+    """Collect the strict lower triangle of a correlation matrix in row-major order."""
+    rows, columns = np.tril_indices(matrix.shape[0], k=-1)
+    values: np.ndarray[Any, np.dtype[np.float64]] = matrix[rows, columns]
+    return values
+
+
+def histogram_axis() -> np.ndarray[Any, np.dtype[np.float64]]:
+    """Return the histogram bin edges covering [-1, 1]."""
+    return np.arange(-1, 1.05, HISTOGRAM_BINSIZE)
+
+
+def histogram_counts(
+    correlations: Correlations, tile_size: int = DEFAULT_TILE_SIZE
+) -> np.ndarray[Any, np.dtype[np.int64]]:
+    """Count the rounded lower-triangle correlations in each histogram bin.
+
+    The matrix is read tile by tile, so memory-mapped matrices are never
+    loaded whole; condensed matrices are read in chunks of the same size.
+    Undefined (NaN) correlations are not counted.
+
+    Args:
+        correlations: Enzymes x enzymes correlation matrix.
+        tile_size: Side length of the scanned tiles.
+
+    Returns:
+        One count per bin of :func:`histogram_axis`.
+    """
+    bins = histogram_axis()
+    counts = np.zeros(len(bins) - 1, dtype=np.int64)
+    if isinstance(correlations, CondensedMatrix):
+        chunks: Iterable[np.ndarray[Any, np.dtype[Any]]] = (
+            correlations.values[start : start + tile_size**2]
+            for start in range(0, len(correlations.values), tile_size**2)
+        )
+    else:
+        chunks = (
+            strict_lower_values(correlations, rows, columns)
+            for rows, columns in lower_tiles(correlations.shape[0], tile_size)
+        )
+    for chunk in chunks:
+        counts += bin_correlations(chunk, bins)
+    return counts
+
+
+def bin_correlations(
+    values: np.ndarray[Any, np.dtype[Any]],
+    bins: np.ndarray[Any, np.dtype[np.float64]] | None = None,
+) -> np.ndarray[Any, np.dtype[np.int64]]:
+    """Count correlations per histogram bin as displayed, rounded and without NaN.
+
+    Counts of disjoint sets of values add up, so histograms can be updated
+    by subtracting the counts of old values and adding those of new ones.
+
+    Args:
+        values: Correlations in any shape.
+        bins: Bin edges, by default :func:`histogram_axis`.
+
+    Returns:
+        One count per bin.
+    """
+    edges = histogram_axis() if bins is None else bins
+    rounded = np.round(np.asarray(values, dtype=np.float64), DISPLAY_DECIMALS)
+    counts: np.ndarray[Any, np.dtype[np.int64]] = np.histogram(
+        rounded[~np.isnan(rounded)], bins=edges
+    )[0].astype(np.int64)
+    return counts
+
+
+@dataclass
+class AnalysisResult:
+    """Results of analyzing one enzyme activity dataset."""
+
+    df: pd.DataFrame
+    enzyme_names: tuple[str, ...]
+    correlations: Correlations
+    histogram_counts: np.ndarray[Any, np.dtype[np.int64]]
+    grouping: dict[int, list[str]] = field(default_factory=dict)
+    cutoff: float = DEFAULT_CUTOFF
+    lower_triangle_only: bool = False
+    # substrates shared by each enzyme pair, only kept when activities are missing
+    overlap: np.ndarray[Any, np.dtype[np.int32]] | None = None
+
+    @property
+    def out_of_core(self) -> bool:
+        """Whether the correlations are memory-mapped from disk."""
+        return isinstance(self.correlations, np.memmap)
+
+    @property
+    def correlation_matrix(self) -> np.ndarray[Any, np.dtype[np.float64]]:
+        """The rounded display matrix, loaded fully into memory."""
+        if isinstance(self.correlations, CondensedMatrix):
+            dense = self.correlations.to_dense(lower_triangle_only=self.lower_triangle_only)
+            rounded: np.ndarray[Any, np.dtype[np.float64]] = dense.round(DISPLAY_DECIMALS)
+            return rounded
+        matrix = np.asarray(self.correlations, dtype=np.float64).round(DISPLAY_DECIMALS)
+        return np.tril(matrix) if self.lower_triangle_only else matrix
+
+
+def analyze(
+    df: pd.DataFrame,
+    cutoff: float = DEFAULT_CUTOFF,
+    lower_triangle_only: bool = False,
+    matrix_path: str | os.PathLike[str] | None = None,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    compact: bool = False,
+    method: str = "pearson",
+    jobs: int = 1,
+) -> AnalysisResult:
+    """Run the full analysis on a substrates x enzymes frame.
+
+    Args:
+        df: Substrates x enzymes activity frame.
+        cutoff: Grouping cutoff.
+        lower_triangle_only: Leave the strict upper triangle of the display matrix at zero.
+        matrix_path: Compute the matrix out of core into this ``.npy`` file
+            instead of in memory. Peak memory is then bounded by the tile size.
+        tile_size: Side length of the tiles used for the matrix, histogram and grouping.
+        compact: Keep only the lower triangle in float32, as a
+            :class:`~enzyme_correlator.correlation.CondensedMatrix`.
+        method: Correlation method, one of
+            :data:`~enzyme_correlator.correlation.METHODS`.
+        jobs: Number of worker processes for the rank correlations.
+
+    Returns:
+        The correlations, histogram counts and grouping. Missing (NaN)
+        activities are left out pair by pair, and the in-memory results then
+        carry the overlap counts.
+
+    Raises:
+        ValueError: If both ``matrix_path`` and ``compact`` are given, if
+            ``method`` is unknown, or if a method that is only computed pair
+            by pair (Kendall's tau, Spearman with missing values) is requested
+            out of core or in compact storage.
+    """
+    if compact and matrix_path is not None:
+        raise ValueError("compact storage cannot be combined with an out-of-core matrix")
+    if method not in METHODS:
+        raise ValueError(f"unknown correlation method {method!r}, expected one of {METHODS}")
+    data = df.to_numpy(dtype=np.float64)
+    tiled_data = pearson_equivalent(data, method)
+    if tiled_data is None and (compact or matrix_path is not None):
+        raise ValueError(
+            f"{method.capitalize()} correlation of this data is only computed "
+            "as a full in-memory matrix"
+        )
+    correlations: Correlations
+    if tiled_data is None:
+        correlations = correlate(data, method=method, jobs=jobs)
+    elif compact:
+        correlations = pearson_condensed(tiled_data, tile_size=tile_size)
+    elif matrix_path is None:
+        correlations = pearson_matrix(tiled_data)
+    else:
+        correlations = pearson_matrix_tiled(tiled_data, matrix_path, tile_size=tile_size)
+    return analysis_result(
+        df,
+        correlations,
+        cutoff=cutoff,
+        lower_triangle_only=lower_triangle_only,
+        tile_size=tile_size,
+        overlap=not compact and matrix_path is None,
+    )
+
+
+def analysis_result(
+    df: pd.DataFrame,
+    correlations: Correlations,
+    cutoff: float = DEFAULT_CUTOFF,
+    lower_triangle_only: bool = False,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    overlap: bool = True,
+) -> AnalysisResult:
+    """Derive the histogram and grouping from an already computed matrix.
+
+    Args:
+        df: Substrates x enzymes activity frame the matrix was computed from.
+        correlations: Unrounded correlation matrix of ``df``.
+        cutoff: Grouping cutoff.
+        lower_triangle_only: Leave the strict upper triangle of the display matrix at zero.
+        tile_size: Side length of the tiles used for the histogram and grouping.
+        overlap: Count the substrates shared by each pair when activities are missing.
+
+    Returns:
+        The correlations, histogram counts and grouping.
+    """
+    enzyme_names = tuple(str(enzyme) for enzyme in df.columns)
+    data = df.to_numpy(dtype=np.float64)
+    return AnalysisResult(
+        df=df,
+        enzyme_names=enzyme_names,
+        correlations=correlations,
+        histogram_counts=histogram_counts(correlations, tile_size=tile_size),
+        grouping=group_enzymes(correlations, enzyme_names, cutoff, tile_size=tile_size),
+        cutoff=cutoff,
+        lower_triangle_only=lower_triangle_only,
+        overlap=overlap_counts(data) if overlap and np.isnan(data).any() else None,
+    )
+
+
+def analyze_file(
+    path: str | os.PathLike[str],
+    cutoff: float = DEFAULT_CUTOFF,
+    lower_triangle_only: bool = False,
+    matrix_path: str | os.PathLike[str] | None = None,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    compact: bool = False,
+    method: str = "pearson",
+    jobs: int = 1,
+) -> AnalysisResult:
+    """Read a CSV export and run the full analysis on it.
+
+    Args:
+        path: Path to the CSV file.
+        cutoff: Grouping cutoff.
+        lower_triangle_only: Leave the strict upper triangle of the display matrix at zero.
+        matrix_path: Compute the matrix out of core into this ``.npy`` file.
+        tile_size: Side length of the tiles used for the matrix, histogram and grouping.
+        compact: Keep only the lower triangle in float32.
+        method: Correlation method, one of
+            :data:`~enzyme_correlator.correlation.METHODS`.
+        jobs: Number of worker processes for the rank correlations.
+
+    Returns:
+        The correlations, histogram counts and grouping.
+    """
+    return analyze(
+        read_activity_csv(path, chunksize=None if matrix_path is None else tile_size),
+        cutoff=cutoff,
+        lower_triangle_only=lower_triangle_only,
+        matrix_path=matrix_path,
+        tile_size=tile_size,
+        compact=compact,
+        method=method,
+        jobs=jobs,
+    )
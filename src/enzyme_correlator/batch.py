@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+Headless batch processing of enzyme activity exports.
+
+Every CSV in a directory is analyzed in a separate worker process. For each
+input ``<name>.csv`` the output directory receives:
+
+- ``<name>_correlation.csv``: the correlation matrix
+- ``<name>_grouping.csv``: one ``Group;Enzyme`` row per grouped enzyme
+- ``<name>_correlation.png`` and ``<name>_histogram.png``: Agg-rendered figures
+
+Output CSVs use the same ``;`` delimiter and ``,`` decimal separator as the input.
+
+With ``--out-of-core`` the matrix is computed tile by tile into
+``<name>_correlation.npy`` instead, holding unrounded values, and neither the
+matrix CSV nor the heatmap is written.
+
+With ``--raster`` the heatmap is instead colored straight from the matrix,
+band by band, one pixel per cell and without cell labels; this also works
+out of core.
+
+With ``--edges`` the pairs reaching the cutoff are also streamed, tile by
+tile, into the edge list ``<name>_edges.csv``.
+
+With ``--resamples N`` every group also gets its permutation p-value and
+bootstrap interval in ``<name>_significance.csv``.
+
+With ``--compare`` all files are correlated together, passing the arrays to
+the workers through shared memory, and ``comparison.csv`` tabulates the group
+of every enzyme in every file.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from pathlib import Path
+
+import pandas as pd
+
+from enzyme_correlator.analysis import DEFAULT_CUTOFF, AnalysisResult, analyze_file, histogram_axis
+from enzyme_correlator.comparison import DatasetComparison, compare_files, format_comparison
+from enzyme_correlator.correlation import DEFAULT_TILE_SIZE, METHODS
+from enzyme_correlator.graph import write_edge_list
+from enzyme_correlator.plotting import (
+    CORRELATION_FIGSIZE,
+    HISTOGRAM_FIGSIZE,
+    draw_correlation_matrix,
+    draw_histogram,
+)
+from enzyme_correlator.raster import write_heatmap_png
+from enzyme_correlator.significance import SignificanceResult, assess_significance
+
+__all__ = ["compare", "main", "process_file", "write_results", "write_significance"]
+
+
+def write_results(
+    result: AnalysisResult,
+    output_dir: Path,
+    stem: str,
+    plots: bool = True,
+    raster: bool = False,
+) -> list[Path]:
+    """Write the matrix, grouping and figures of one analysis.
+
+    Args:
+        result: Analysis to write.
+        output_dir: Directory receiving the files.
+        stem: Common prefix of the output file names.
+        plots: Also render the heatmap and histogram PNGs.
+        raster: Color the heatmap PNG straight from the matrix instead of
+            rendering the figure, also for out-of-core matrices.
+
+    Returns:
+        The paths of the written files.
+    """
+    written: list[Path] = []
+    if plots:
+        # matplotlib is only loaded by runs that render figures
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+    if not result.out_of_core:
+        matrix_path = output_dir / f"{stem}_correlation.csv"
+        pd.DataFrame(
+            result.correlation_matrix, index=result.enzyme_names, columns=result.enzyme_names
+        ).to_csv(matrix_path, sep=";", decimal=",")
+        written.append(matrix_path)
+
+    grouping_path = output_dir / f"{stem}_grouping.csv"
+    pd.DataFrame(
+        [(group, enzyme) for group, enzymes in result.grouping.items() for enzyme in enzymes],
+        columns=["Group", "Enzyme"],
+    ).to_csv(grouping_path, sep=";", index=False)
+    written.append(grouping_path)
+
+    if raster:
+        heatmap_path = output_dir / f"{stem}_correlation.png"
+        write_heatmap_png(
+            result.correlations,
+            heatmap_path,
+            lower_triangle_only=result.lower_triangle_only,
+            support=result.overlap,
+        )
+        written.append(heatmap_path)
+    elif plots and not result.out_of_core:
+        fig = Figure(figsize=CORRELATION_FIGSIZE)
+        FigureCanvasAgg(fig)
+        draw_correlation_matrix(
+            fig,
+            result.correlation_matrix,
+            result.enzyme_names,
+            lower_triangle_only=result.lower_triangle_only,
+            support=result.overlap,
+        )
+        heatmap_path = output_dir / f"{stem}_correlation.png"
+        fig.savefig(heatmap_path)
+        written.append(heatmap_path)
+
+    if plots:
+        bins = histogram_axis()
+        fig = Figure(figsize=HISTOGRAM_FIGSIZE)
+        FigureCanvasAgg(fig)
+        draw_histogram(fig, result.histogram_counts, bins, result.cutoff)
+        histogram_path = output_dir / f"{stem}_histogram.png"
+        fig.savefig(histogram_path)
+        written.append(histogram_path)
+
+    return written
+
+
+def write_significance(significance: SignificanceResult, output_dir: Path, stem: str) -> Path:
+    """Write one row of resampling statistics per group.
+
+    Args:
+        significance: Statistics to write.
+        output_dir: Directory receiving the file.
+        stem: Common prefix of the output file names.
+
+    Returns:
+        The path of the written file.
+    """
+    path = output_dir / f"{stem}_significance.csv"
+    pd.DataFrame(
+        [
+            (
+                group,
+                len(statistics.enzymes),
+                statistics.mean_correlation,
+                statistics.p_value,
+                *statistics.interval,
+            )
+            for group, statistics in significance.groups.items()
+        ],
+        columns=["Group", "Enzymes", "Mean correlation", "P-value", "Lower", "Upper"],
+    ).to_csv(path, sep=";", decimal=",", index=False)
+    return path
+
+
+def process_file(
+    path: Path,
+    output_dir: Path,
+    cutoff: float = DEFAULT_CUTOFF,
+    lower_triangle_only: bool = False,
+    plots: bool = True,
+    out_of_core: bool = False,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    method: str = "pearson",
+    resamples: int = 0,
+    seed: int = 0,
+    edges: bool = False,
+    raster: bool = False,
+    jobs: int = 1,
+) -> list[Path]:
+    """Analyze one CSV export and write its results.
+
+    Args:
+        path: CSV export to analyze.
+        output_dir: Directory receiving the files.
+        cutoff: Grouping cutoff.
+        lower_triangle_only: Leave the strict upper triangle of the matrix at zero.
+        plots: Also render the heatmap and histogram PNGs.
+        out_of_core: Compute the matrix tile by tile into ``<name>_correlation.npy``.
+        tile_size: Side length of the tiles in out-of-core mode.
+        method: Correlation method, one of
+            :data:`~enzyme_correlator.correlation.METHODS`.
+        resamples: Number of permutations and bootstrap resamples of the
+            group statistics; ``0`` skips them.
+        seed: Seed of the resampling.
+        edges: Also write the above-cutoff pairs as an edge list.
+        raster: Color the heatmap PNG straight from the matrix.
+        jobs: Number of worker processes computing the rank correlations
+            and the resamples.
+
+    Returns:
+        The paths of the written files.
+    """
+    matrix_path = output_dir / f"{path.stem}_correlation.npy" if out_of_core else None
+    result = analyze_file(
+        path,
+        cutoff=cutoff,
+        lower_triangle_only=lower_triangle_only,
+        matrix_path=matrix_path,
+        tile_size=tile_size,
+        method=method,
+        jobs=jobs,
+    )
+    written = write_results(result, output_dir, path.stem, plots=plots, raster=raster)
+    written += _write_extras(
+        result, output_dir, path.stem, method, resamples, seed, edges, tile_size, jobs
+    )
+    return [matrix_path, *written] if matrix_path is not None else written
+
+
+def _write_extras(
+    result: AnalysisResult,
+    output_dir: Path,
+    stem: str,
+    method: str,
+    resamples: int,
+    seed: int,
+    edges: bool,
+    tile_size: int,
+    jobs: int = 1,
+) -> list[Path]:
+    """Write the optional significance table and edge list of one analysis."""
+    written: list[Path] = []
+    if resamples:
+        significance = assess_significance(
+            result.df,
+            result.grouping,
+            method=method,
+            resamples=resamples,
+            seed=seed,
+            jobs=jobs,
+        )
+        written.append(write_significance(significance, output_dir, stem))
+    if edges:
+        edges_path = output_dir / f"{stem}_edges.csv"
+        write_edge_list(result.df, edges_path, result.cutoff, method=method, tile_size=tile_size)
+        written.append(edges_path)
+    return written
+
+
+def compare(
+    paths: Sequence[Path],
+    output_dir: Path,
+    cutoff: float = DEFAULT_CUTOFF,
+    lower_triangle_only: bool = False,
+    plots: bool = True,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    method: str = "pearson",
+    resamples: int = 0,
+    seed: int = 0,
+    edges: bool = False,
+    jobs: int = 1,
+    raster: bool = False,
+) -> tuple[DatasetComparison, list[Path]]:
+    """Analyze several CSV exports together and write how their groupings differ.
+
+    Besides the per-file results of :func:`process_file`, ``comparison.csv``
+    holds the group of every enzyme in every file, ``-1`` for ungrouped.
+
+    Args:
+        paths: CSV exports to compare.
+        output_dir: Directory receiving the files.
+        cutoff: Grouping cutoff.
+        lower_triangle_only: Leave the strict upper triangles of the matrices at zero.
+        plots: Also render the heatmap and histogram PNGs.
+        tile_size: Side length of the tiles used for the edge lists.
+        method: Correlation method, one of
+            :data:`~enzyme_correlator.correlation.METHODS`.
+        resamples: Number of permutations and bootstrap resamples of the
+            group statistics; ``0`` skips them.
+        seed: Seed of the resampling.
+        edges: Also write the above-cutoff pairs as edge lists.
+        jobs: Number of worker processes computing the matrices and resamples.
+        raster: Color the heatmap PNGs straight from the matrices.
+
+    Returns:
+        The comparison, for :func:`~enzyme_correlator.comparison.format_comparison`,
+        and the paths of the written files.
+    """
+    comparison = compare_files(
+        paths, cutoff=cutoff, method=method, lower_triangle_only=lower_triangle_only, jobs=jobs
+    )
+    written: list[Path] = []
+    for path, result in zip(paths, comparison.results):
+        written += write_results(result, output_dir, path.stem, plots=plots, raster=raster)
+        written += _write_extras(
+            result, output_dir, path.stem, method, resamples, seed, edges, tile_size, jobs
+        )
+    comparison_path = output_dir / "comparison.csv"
+    membership = comparison.membership()
+    membership.columns = [path.stem for path in paths]
+    membership.to_csv(comparison_path, sep=";", index_label="Enzyme")
+    written.append(comparison_path)
+    return comparison, written
+
+
+def _run(
+    worker: Callable[[Path], list[Path]], paths: Sequence[Path], jobs: int
+) -> Iterator[tuple[Path, Exception | None]]:
+    """Apply ``worker`` to every path, in a process pool when ``jobs`` > 1."""
+    if jobs <= 1:
+        for path in paths:
+            try:
+                worker(path)
+            except Exception as error:
+                yield path, error
+            else:
+                yield path, None
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {executor.submit(worker, path): path for path in paths}
+        for future in as_completed(futures):
+            failure = future.exception()
+            yield futures[future], failure if isinstance(failure, Exception) else None
+
+
+def _parse_args(argv: Sequence[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="enzyme-correlator-batch",
+        description="Analyze every enzyme activity CSV in a directory without a display.",
+    )
+    parser.add_argument("directory", type=Path, help="directory containing the CSV exports")
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        default=None,
+        help="output directory (default: <directory>/results)",
+    )
+    parser.add_argument(
+        "-c", "--cutoff", type=float, default=DEFAULT_CUTOFF, help="grouping cutoff"
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="number of worker processes (default: number of cores)",
+    )
+    parser.add_argument("--pattern", default="*.csv", help="glob selecting the input files")
+    parser.add_argument(
+        "--lower-triangle", action="store_true", help="only compute the lower triangle"
+    )
+    parser.add_argument("--no-plots", action="store_true", help="skip rendering the PNG figures")
+    parser.add_argument(
+        "--out-of-core",
+        action="store_true",
+        help="compute the matrix tile by tile into a memory-mapped .npy file",
+    )
+    parser.add_argument(
+        "--tile-size",
+        type=int,
+        default=DEFAULT_TILE_SIZE,
+        help=f"tile side length in out-of-core mode (default: {DEFAULT_TILE_SIZE})",
+    )
+    parser.add_argument(
+        "-m",
+        "--method",
+        choices=METHODS,
+        default="pearson",
+        help="correlation method (default: pearson)",
+    )
+    parser.add_argument(
+        "--resamples",
+        type=int,
+        default=0,
+        help="permutations and bootstrap resamples for group significance (default: off)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="seed of the resampling")
+    parser.add_argument(
+        "--edges",
+        action="store_true",
+        help="also write the pairs reaching the cutoff as an edge list",
+    )
+    parser.add_argument(
+        "--raster",
+        action="store_true",
+        help="color the heatmap PNG straight from the matrix, one pixel per cell",
+    )
+    parser.add_argument(
+        "--compare",
+        action="store_true",
+        help="correlate all files together and compare their groupings",
+    )
+    args = parser.parse_args(argv)
+    if args.compare and args.out_of_core:
+        parser.error("--compare keeps the matrices in memory and cannot be used with --out-of-core")
+    return args
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Entry point for the headless batch command line."""
+    args = _parse_args(argv)
+    output_dir: Path = args.output if args.output is not None else args.directory / "results"
+    paths = sorted(args.directory.glob(args.pattern))
+    if not paths:
+        sys.exit(f"No files matching {args.pattern!r} in {args.directory}")
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if args.compare:
+        try:
+            comparison, _ = compare(
+                paths,
+                output_dir,
+                cutoff=args.cutoff,
+                lower_triangle_only=args.lower_triangle,
+                plots=not args.no_plots,
+                tile_size=args.tile_size,
+                method=args.method,
+                resamples=args.resamples,
+                seed=args.seed,
+                edges=args.edges,
+                jobs=args.jobs,
+                raster=args.raster,
+            )
+        except Exception as failure:
+            sys.exit(f"Comparison failed: {failure}")
+        print(format_comparison(comparison))
+        return
+
+    worker = partial(
+        process_file,
+        output_dir=output_dir,
+        cutoff=args.cutoff,
+        lower_triangle_only=args.lower_triangle,
+        plots=not args.no_plots,
+        out_of_core=args.out_of_core,
+        tile_size=args.tile_size,
+        method=args.method,
+        resamples=args.resamples,
+        seed=args.seed,
+        edges=args.edges,
+        raster=args.raster,
+        # one file gets the workers for its resamples, several share them per file
+        jobs=args.jobs if len(paths) == 1 else 1,
+    )
+    failures = 0
+    for path, error in _run(worker, paths, args.jobs if len(paths) > 1 else 1):
+        if error is None:
+            print(f"done   {path.name}")
+        else:
+            failures += 1
+            print(f"FAILED {path.name}: {error}", file=sys.stderr)
+
+    if failures:
+        sys.exit(f"{failures} of {len(paths)} files failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Content-addressed on-disk cache of parsed data and correlation results.
+
+Entries are keyed by the SHA-256 of the input file together with the analysis
+settings, so editing a file or changing a setting never returns stale results.
+Each entry is a directory of ``.npy`` arrays, loaded memory-mapped, and a
+``meta.json`` file whose modification time records the last access. When the
+cache grows beyond its size limit the least recently used entries are evicted.
+
+Windows refuses to delete a file that is still memory-mapped, so an entry
+whose arrays are in use may survive eviction or clearing. Its metadata is
+deleted last, so such an entry stays listed, counts toward the size limit
+and is removed by a later eviction once it has been released.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+__all__ = [
+    "CACHE_VERSION",
+    "DEFAULT_SIZE_LIMIT",
+    "CacheEntry",
+    "ResultCache",
+    "default_cache_dir",
+    "file_digest",
+]
+
+CACHE_VERSION = 1
+DEFAULT_SIZE_LIMIT = 2 * 1024**3
+_METADATA = "meta.json"
+
+
+def default_cache_dir() -> Path:
+    """Return the cache directory.
+
+    ``ENZYME_CORRELATOR_CACHE_DIR`` takes precedence, then ``XDG_CACHE_HOME``,
+    then ``~/.cache``.
+    """
+    override = os.environ.get("ENZYME_CORRELATOR_CACHE_DIR")
+    if override:
+        return Path(override)
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "enzyme_correlator"
+
+
+def _remove_entry(entry_dir: Path) -> bool:
+    """Delete an entry directory, its metadata last.
+
+    Returns:
+        Whether the entry is gone; False if a file is still in use.
+    """
+    try:
+        for file in entry_dir.iterdir():
+            if file.name != _METADATA:
+                file.unlink()
+        (entry_dir / _METADATA).unlink(missing_ok=True)
+        entry_dir.rmdir()
+    except OSError:
+        return not entry_dir.exists()
+    return True
+
+
+def file_digest(path: str | os.PathLike[str]) -> str:
+    """Return the SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@dataclass
+class CacheEntry:
+    """Arrays and metadata stored under one cache key."""
+
+    arrays: dict[str, np.ndarray[Any, np.dtype[Any]]] = field(default_factory=dict)
+    metadata: dict[str, Any] = field(default_factory=dict)
+
+
+class ResultCache:
+    """Size-limited LRU cache of analysis results on disk."""
+
+    def __init__(
+        self, directory: str | os.PathLike[str] | None = None, size_limit: int = DEFAULT_SIZE_LIMIT
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            directory: Cache directory; created on first store. Defaults to
+                :func:`default_cache_dir`.
+            size_limit: Maximum total size of all entries in bytes.
+        """
+        self.directory = Path(directory) if directory is not None else default_cache_dir()
+        self.size_limit = size_limit
+
+    def key(self, path: str | os.PathLike[str], **settings: Any) -> str:
+        """Return the cache key of a file analyzed with the given settings."""
+        identity = json.dumps(
+            {"version": CACHE_VERSION, "content": file_digest(path), "settings": settings},
+            sort_keys=True,
+        )
+        return hashlib.sha256(identity.encode()).hexdigest()
+
+    def load(self, key: str) -> CacheEntry | None:
+        """Return the entry stored under ``key``, or None on a miss.
+
+        Arrays are memory-mapped read-only, and the entry is marked as used.
+        """
+        entry_dir = self.directory / key
+        metadata_path = entry_dir / _METADATA
+        try:
+            metadata = json.loads(metadata_path.read_text())
+            arrays = {
+                name: np.load(entry_dir / f"{name}.npy", mmap_mode="r")
+                for name in metadata["arrays"]
+            }
+        except (OSError, ValueError, KeyError):
+            return None
+        os.utime(metadata_path)
+        return CacheEntry(arrays=arrays, metadata=metadata["metadata"])
+
+    def store(
+        self,
+        key: str,
+        arrays: Mapping[str, np.ndarray[Any, np.dtype[Any]]],
+        metadata: Mapping[str, Any] | None = None,
+    ) -> None:
+        """Store arrays and JSON-serializable metadata under ``key``.
+
+        The entry is written to a temporary directory and moved into place, so
+        readers never see a partial entry. Least recently used entries are then
+        evicted until the cache fits its size limit.
+        """
+        if sum(array.nbytes for array in arrays.values()) > self.size_limit:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=".staging-", dir=self.directory))
+        try:
+            for name, array in arrays.items():
+                np.save(staging / f"{name}.npy", np.ascontiguousarray(array))
+            (staging / _METADATA).write_text(
+                json.dumps({"arrays": list(arrays), "metadata": dict(metadata or {})})
+            )
+            self.invalidate(key)
+            os.replace(staging, self.directory / key)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        self.evict()
+
+    def invalidate(self, key: str) -> bool:
+        """Remove the entry stored under ``key``.
+
+        Returns:
+            Whether an entry was removed.
+        """
+        entry_dir = self.directory / key
+        if not entry_dir.is_dir():
+            return False
+        return _remove_entry(entry_dir)
+
+    def clear(self) -> int:
+        """Remove every entry that is not in use.
+
+        Returns:
+            The number of entries that could not be removed because their
+            arrays are still mapped.
+        """
+        in_use = sum(not _remove_entry(entry_dir) for entry_dir, _, _ in self.entries())
+        if not in_use:
+            shutil.rmtree(self.directory, ignore_errors=True)
+        return in_use
+
+    def entries(self) -> list[tuple[Path, float, int]]:
+        """Return ``(directory, last access, size in bytes)`` of every entry, oldest first."""
+        if not self.directory.is_dir():
+            return []
+        entries = []
+        for entry_dir in self.directory.iterdir():
+            metadata_path = entry_dir / _METADATA
+            if entry_dir.name.startswith(".") or not metadata_path.is_file():
+                continue
+            size = sum(file.stat().st_size for file in entry_dir.iterdir())
+            entries.append((entry_dir, metadata_path.stat().st_mtime, size))
+        return sorted(entries, key=lambda entry: entry[1])
+
+    def size(self) -> int:
+        """Return the total size of all entries in bytes."""
+        return sum(size for _, _, size in self.entries())
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits its size limit.
+
+        Entries still in use are skipped and keep counting toward the limit,
+        so newer entries are evicted in their place.
+        """
+        entries = self.entries()
+        total = sum(size for _, _, size in entries)
+        for entry_dir, _, size in entries:
+            if total <= self.size_limit:
+                break
+            if _remove_entry(entry_dir):
+                total -= size
@@ -0,0 +1,322 @@
+"""
+Side-by-side analysis of several datasets of one enzyme panel.
+
+:func:`compare_files` reads N exports, e.g. the same panel measured on
+different plates or batches, and correlates them at once on a process pool.
+Arrays are handed to the workers through :mod:`multiprocessing.shared_memory`
+instead of being pickled: each worker attaches to the activities of its
+dataset and writes the correlation matrix straight into a block the parent
+allocated, so only block names cross the process boundary.
+
+The resulting :class:`DatasetComparison` keeps every analysis and summarizes
+how the grouping differs between the datasets. Group numbers are arbitrary per
+dataset, so membership is compared by group-mates: an enzyme is stable when
+it is grouped with the same enzymes everywhere it was measured.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import pandas as pd
+
+from enzyme_correlator.analysis import (
+    DEFAULT_CUTOFF,
+    AnalysisResult,
+    analysis_result,
+    read_activity_csv,
+)
+from enzyme_correlator.correlation import METHODS, PARALLEL_MIN_WORK, correlate, process_pool
+
+if TYPE_CHECKING:
+    from multiprocessing.shared_memory import SharedMemory
+
+__all__ = [
+    "DatasetComparison",
+    "compare_datasets",
+    "compare_files",
+    "correlate_datasets",
+    "format_comparison",
+]
+
+_SharedArray = tuple[str, tuple[int, ...]]
+"""Name of a shared memory block and the shape of the float64 array it holds."""
+
+
+def _attach(array: _SharedArray) -> tuple[SharedMemory, np.ndarray[Any, np.dtype[np.float64]]]:
+    """Open an existing shared memory block as an array."""
+    from multiprocessing.shared_memory import SharedMemory
+
+    name, shape = array
+    block = SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+
+
+def _correlate_shared(
+    data: _SharedArray, output: _SharedArray, method: str, lower_triangle_only: bool
+) -> None:
+    """Correlate shared activities into a shared matrix; runs in a worker process."""
+    data_block, activities = _attach(data)
+    output_block, matrix = _attach(output)
+    try:
+        matrix[...] = correlate(activities, method=method, lower_triangle_only=lower_triangle_only)
+    finally:
+        del activities, matrix
+        data_block.close()
+        output_block.close()
+
+
+def correlate_datasets(
+    arrays: Sequence[np.ndarray[Any, np.dtype[Any]]],
+    method: str = "pearson",
+    lower_triangle_only: bool = False,
+    jobs: int = 1,
+) -> list[np.ndarray[Any, np.dtype[np.float64]]]:
+    """Compute the correlation matrix of every array, one dataset per worker.
+
+    With ``jobs`` > 1 and at least
+    :data:`~enzyme_correlator.correlation.PARALLEL_MIN_WORK` pairs times
+    observations in total, the arrays are copied once into shared memory,
+    spawned workers write their matrices into shared blocks, and the parent
+    copies each matrix out before the blocks are released.
+
+    Args:
+        arrays: Substrates x enzymes activities of each dataset, NaN where missing.
+        method: Correlation method, one of
+            :data:`~enzyme_correlator.correlation.METHODS`.
+        lower_triangle_only: Leave the strict upper triangles at zero.
+        jobs: Number of worker processes.
+
+    Returns:
+        The unrounded enzymes x enzymes matrices, in the order of ``arrays``.
+
+    Raises:
+        ValueError: If ``method`` is unknown.
+    """
+    if method not in METHODS:
+        raise ValueError(f"unknown correlation method {method!r}, expected one of {METHODS}")
+    work = sum(
+        np.shape(data)[1] * (np.shape(data)[1] - 1) // 2 * np.shape(data)[0] for data in arrays
+    )
+    if jobs <= 1 or len(arrays) < 2 or work < PARALLEL_MIN_WORK:
+        return [
+            correlate(np.asarray(data, dtype=np.float64), method, lower_triangle_only)
+            for data in arrays
+        ]
+
+    from multiprocessing.shared_memory import SharedMemory
+
+    blocks: list[SharedMemory] = []
+    jobs_args: list[tuple[_SharedArray, _SharedArray]] = []
+    try:
+        for data in arrays:
+            n = np.shape(data)[1]
+            # zero-sized blocks are not allowed
+            source = SharedMemory(create=True, size=max(np.size(data) * 8, 1))
+            blocks.append(source)
+            np.ndarray(np.shape(data), dtype=np.float64, buffer=source.buf)[...] = data
+            target = SharedMemory(create=True, size=max(n * n * 8, 1))
+            blocks.append(target)
+            jobs_args.append(((source.name, np.shape(data)), (target.name, (n, n))))
+        with process_pool(min(jobs, len(arrays))) as executor:
+            futures = [
+                executor.submit(_correlate_shared, data, output, method, lower_triangle_only)
+                for data, output in jobs_args
+            ]
+            for future in futures:
+                future.result()
+        return [
+            np.ndarray(shape, dtype=np.float64, buffer=block.buf).copy()
+            for (_, (_, shape)), block in zip(jobs_args, blocks[1::2])
+        ]
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+@dataclass
+class DatasetComparison:
+    """Analyses of several datasets of one enzyme panel, kept side by side."""
+
+    labels: tuple[str, ...]
+    results: tuple[AnalysisResult, ...]
+
+    def __getitem__(self, label: str) -> AnalysisResult:
+        """Return the analysis of the dataset called ``label``."""
+        return self.results[self.labels.index(label)]
+
+    @property
+    def enzyme_names(self) -> tuple[str, ...]:
+        """All enzymes measured in any dataset, in order of first appearance."""
+        return tuple(dict.fromkeys(name for r in self.results for name in r.enzyme_names))
+
+    def membership(self) -> pd.DataFrame:
+        """Tabulate the group of every enzyme in every dataset.
+
+        Returns:
+            Enzymes x datasets group numbers; ``-1`` for ungrouped enzymes
+            and missing where an enzyme was not measured.
+        """
+        columns = {}
+        for label, result in zip(self.labels, self.results):
+            groups = dict.fromkeys(result.enzyme_names, -1)
+            for group, enzymes in result.grouping.items():
+                groups.update(dict.fromkeys(enzymes, group))
+            columns[label] = pd.Series(groups, dtype="Int64")
+        membership: pd.DataFrame = pd.DataFrame(columns).reindex(list(self.enzyme_names))
+        return membership
+
+    def group_mates(self) -> dict[str, tuple[frozenset[str] | None, ...]]:
+        """Return, per enzyme and dataset, the other members of its group.
+
+        Ungrouped enzymes have no mates; enzymes not measured in a dataset
+        are ``None`` there.
+        """
+        mates: dict[str, list[frozenset[str] | None]] = {
+            name: [None] * len(self.results) for name in self.enzyme_names
+        }
+        for position, result in enumerate(self.results):
+            for name in result.enzyme_names:
+                mates[name][position] = frozenset()
+            for enzymes in result.grouping.values():
+                group = frozenset(enzymes)
+                for name in enzymes:
+                    mates[name][position] = group - {name}
+        return {name: tuple(sets) for name, sets in mates.items()}
+
+    def changed_enzymes(self) -> dict[str, tuple[frozenset[str] | None, ...]]:
+        """Return the group-mates of the enzymes whose group differs between datasets.
+
+        Datasets that did not measure an enzyme are not counted as a change.
+        """
+        return {
+            name: sets
+            for name, sets in self.group_mates().items()
+            if len({mates for mates in sets if mates is not None}) > 1
+        }
+
+    def consistent_groups(self) -> list[tuple[str, ...]]:
+        """Return the groups found with exactly the same members in every dataset."""
+        if not self.results:
+            return []
+        common = set.intersection(
+            *({frozenset(enzymes) for enzymes in r.grouping.values()} for r in self.results)
+        )
+        return [
+            tuple(enzymes)
+            for enzymes in self.results[0].grouping.values()
+            if frozenset(enzymes) in common
+        ]
+
+
+def compare_datasets(
+    frames: Sequence[pd.DataFrame],
+    labels: Sequence[str] | None = None,
+    cutoff: float = DEFAULT_CUTOFF,
+    method: str = "pearson",
+    lower_triangle_only: bool = False,
+    jobs: int = 1,
+) -> DatasetComparison:
+    """Analyze several activity frames and keep the results side by side.
+
+    Args:
+        frames: Substrates x enzymes activity frame of each dataset.
+        labels: Name of each dataset, by default its position.
+        cutoff: Grouping cutoff.
+        method: Correlation method, one of
+            :data:`~enzyme_correlator.correlation.METHODS`.
+        lower_triangle_only: Leave the strict upper triangles at zero.
+        jobs: Number of worker processes computing the matrices.
+
+    Returns:
+        The analyses of all datasets.
+
+    Raises:
+        ValueError: If the labels do not name every frame exactly once.
+    """
+    names = tuple(labels) if labels is not None else tuple(str(i) for i in range(len(frames)))
+    if len(names) != len(frames) or len(set(names)) != len(names):
+        raise ValueError("every dataset needs its own label")
+    matrices = correlate_datasets(
+        [df.to_numpy(dtype=np.float64) for df in frames],
+        method=method,
+        lower_triangle_only=lower_triangle_only,
+        jobs=jobs,
+    )
+    return DatasetComparison(
+        labels=names,
+        results=tuple(
+            analysis_result(df, matrix, cutoff=cutoff, lower_triangle_only=lower_triangle_only)
+            for df, matrix in zip(frames, matrices)
+        ),
+    )
+
+
+def compare_files(
+    paths: Sequence[str | os.PathLike[str]],
+    cutoff: float = DEFAULT_CUTOFF,
+    method: str = "pearson",
+    lower_triangle_only: bool = False,
+    jobs: int = 1,
+) -> DatasetComparison:
+    """Read several CSV exports and analyze them side by side.
+
+    Datasets are labelled by file name without the extension, or by the full
+    path when two files share a name.
+
+    Args:
+        paths: CSV exports to compare.
+        cutoff: Grouping cutoff.
+        method: Correlation method, one of
+            :data:`~enzyme_correlator.correlation.METHODS`.
+        lower_triangle_only: Leave the strict upper triangles at zero.
+        jobs: Number of worker processes computing the matrices.
+
+    Returns:
+        The analyses of all files.
+    """
+    labels = [Path(path).stem for path in paths]
+    if len(set(labels)) != len(labels):
+        labels = [str(path) for path in paths]
+    return compare_datasets(
+        [read_activity_csv(path) for path in paths],
+        labels,
+        cutoff=cutoff,
+        method=method,
+        lower_triangle_only=lower_triangle_only,
+        jobs=jobs,
+    )
+
+
+def format_comparison(comparison: DatasetComparison) -> str:
+    """Summarize how the grouping differs between the datasets, as plain text."""
+    changed = comparison.changed_enzymes()
+    lines = [
+        f"{len(comparison.labels)} datasets: {', '.join(comparison.labels)}",
+        f"{'Dataset':<20} {'Enzymes':<8} {'Groups':<8} Grouped",
+    ]
+    for label, result in zip(comparison.labels, comparison.results):
+        grouped = sum(len(enzymes) for enzymes in result.grouping.values())
+        lines.append(
+            f"{label:<20} {len(result.enzyme_names):<8} {len(result.grouping):<8} {grouped}"
+        )
+    consistent = comparison.consistent_groups()
+    lines.append(f"Groups found in every dataset: {len(consistent)}")
+    lines.extend(f"  {', '.join(enzymes)}" for enzymes in consistent)
+    lines.append(f"Enzymes whose group-mates differ: {len(changed)}")
+    for name, sets in changed.items():
+        described = (
+            "not measured" if mates is None else ", ".join(sorted(mates)) or "ungrouped"
+            for mates in sets
+        )
+        lines.append(
+            f"  {name}: "
+            + "; ".join(f"{label}: {text}" for label, text in zip(comparison.labels, described))
+        )
+    return "\n".join(lines)
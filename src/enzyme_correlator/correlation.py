@@ -0,0 +1,897 @@
+"""
+Vectorized correlation engines.
+
+The functions in this module operate on plain NumPy blocks laid out like
+``EnzymeCorrelatorGUI.df``: one row per observation (substrate) and one column
+per variable (enzyme).
+
+For panels whose n x n matrix does not fit in memory, :func:`pearson_matrix_tiled`
+writes the matrix tile by tile into a memory-mapped ``.npy`` file, and
+:func:`lower_tiles` lets consumers walk it back with bounded memory.
+:func:`pearson_condensed` instead keeps only the lower triangle in float32, as a
+:class:`CondensedMatrix`.
+
+Besides Pearson, two rank correlations are available: :func:`spearman_matrix`
+is the Pearson matrix of the column ranks, and :func:`kendall_matrix` computes
+Kendall's tau-b with Knight's O(m log m) algorithm for many pairs at once.
+:func:`correlate` dispatches on one of :data:`METHODS`.
+
+Missing observations are NaN. Every pair is then correlated over the
+observations present in both of its columns: Pearson from mask-aware matrix
+products (:func:`pairwise_moments`), the rank correlations pair by pair in
+vectorized batches. :func:`overlap_counts` tells how many observations
+support each pair.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Callable, Iterator, Sequence
+from typing import TYPE_CHECKING, Any, NamedTuple, Union
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+__all__ = [
+    "DEFAULT_TILE_SIZE",
+    "METHODS",
+    "PAIR_BATCH_SIZE",
+    "PARALLEL_MIN_WORK",
+    "RELATIVE_VARIANCE_FLOOR",
+    "CondensedMatrix",
+    "Correlations",
+    "PairwiseMoments",
+    "condensed_index",
+    "correlate",
+    "correlation_rows",
+    "correlation_tiles",
+    "kendall_matrix",
+    "lower_tiles",
+    "overlap_counts",
+    "pairwise_moments",
+    "pearson_condensed",
+    "pearson_equivalent",
+    "pearson_from_moments",
+    "pearson_matrix",
+    "pearson_matrix_tiled",
+    "process_pool",
+    "rank_columns",
+    "spearman_matrix",
+    "standardize",
+    "strict_lower_values",
+]
+
+DEFAULT_TILE_SIZE = 1024
+PAIR_BATCH_SIZE = 8192
+METHODS = ("pearson", "spearman", "kendall")
+PARALLEL_MIN_WORK = 5_000_000
+"""Fewest pairs times observations worth starting worker processes for.
+
+Kendall's tau takes about two seconds for this much work in one process,
+while every spawned worker needs a few tenths of a second to start.
+"""
+
+RELATIVE_VARIANCE_FLOOR = 1e-10
+"""Variance below this fraction of the sum of squares counts as a constant column."""
+
+
+def standardize(data: np.ndarray[Any, np.dtype[Any]]) -> np.ndarray[Any, np.dtype[np.float64]]:
+    """Center every column and scale it to unit Euclidean norm.
+
+    Missing (NaN) values are left out of the mean and norm and stay NaN.
+    Columns with zero variance have no defined correlation and become all-NaN,
+    matching the result of ``pd.Series.corr`` for constant series. A column
+    counts as constant when its centered sum of squares is at most
+    :data:`RELATIVE_VARIANCE_FLOOR` times its raw one, so that rounding in the
+    mean, as for 0.1 repeated, does not leave a spurious nonzero variance.
+
+    Args:
+        data: Observations x variables block.
+
+    Returns:
+        The standardized block as float64.
+    """
+    block = np.asarray(data, dtype=np.float64)
+    present = ~np.isnan(block)
+    values = np.where(present, block, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        centered = block - values.sum(axis=0) / present.sum(axis=0)
+        filled = np.where(present, centered, 0.0)
+        squares = np.einsum("ij,ij->j", filled, filled)
+        standardized: np.ndarray[Any, np.dtype[np.float64]] = centered / np.sqrt(squares)
+    standardized[:, squares <= RELATIVE_VARIANCE_FLOOR * np.einsum("ij,ij->j", values, values)] = (
+        np.nan
+    )
+    return standardized
+
+
+class PairwiseMoments(NamedTuple):
+    """Sums over the observations present in both columns of every pair.
+
+    Entry ``(i, j)`` of each array only sums over the observations where
+    left column ``i`` and right column ``j`` are both present. Moments of
+    disjoint sets of observations add up.
+    """
+
+    counts: np.ndarray[Any, np.dtype[np.float64]]
+    left_sums: np.ndarray[Any, np.dtype[np.float64]]
+    right_sums: np.ndarray[Any, np.dtype[np.float64]]
+    left_squares: np.ndarray[Any, np.dtype[np.float64]]
+    right_squares: np.ndarray[Any, np.dtype[np.float64]]
+    products: np.ndarray[Any, np.dtype[np.float64]]
+
+
+def pairwise_moments(
+    left: np.ndarray[Any, np.dtype[Any]], right: np.ndarray[Any, np.dtype[Any]]
+) -> PairwiseMoments:
+    """Compute the pairwise-complete moments between the columns of two blocks.
+
+    Missing values are zeroed and every moment is one matrix product with
+    the presence mask of the other block, so there is no loop over pairs.
+
+    Args:
+        left: Observations x variables block, NaN where missing.
+        right: Observations x variables block over the same observations.
+
+    Returns:
+        The left-columns x right-columns moments.
+    """
+    left_present = ~np.isnan(left)
+    right_present = ~np.isnan(right)
+    left_mask = left_present.astype(np.float64)
+    right_mask = right_present.astype(np.float64)
+    left_values = np.where(left_present, left, 0.0)
+    right_values = np.where(right_present, right, 0.0)
+    return PairwiseMoments(
+        counts=left_mask.T @ right_mask,
+        left_sums=left_values.T @ right_mask,
+        right_sums=left_mask.T @ right_values,
+        left_squares=(left_values * left_values).T @ right_mask,
+        right_squares=left_mask.T @ (right_values * right_values),
+        products=left_values.T @ right_values,
+    )
+
+
+def pearson_from_moments(moments: PairwiseMoments) -> np.ndarray[Any, np.dtype[np.float64]]:
+    """Turn pairwise-complete moments into Pearson correlations.
+
+    Pairs with fewer than two shared observations, or that are constant over
+    them, get NaN like ``pd.DataFrame.corr`` gives them.
+    """
+    counts, left_sums, right_sums, left_squares, right_squares, products = moments
+    with np.errstate(divide="ignore", invalid="ignore"):
+        covariance = products - left_sums * right_sums / counts
+        left_variance = left_squares - left_sums * left_sums / counts
+        right_variance = right_squares - right_sums * right_sums / counts
+        matrix: np.ndarray[Any, np.dtype[np.float64]] = covariance / np.sqrt(
+            left_variance * right_variance
+        )
+    matrix[
+        (counts < 2)
+        | (left_variance <= RELATIVE_VARIANCE_FLOOR * left_squares)
+        | (right_variance <= RELATIVE_VARIANCE_FLOOR * right_squares)
+    ] = np.nan
+    np.clip(matrix, -1.0, 1.0, out=matrix)
+    return matrix
+
+
+def overlap_counts(data: np.ndarray[Any, np.dtype[Any]]) -> np.ndarray[Any, np.dtype[np.int32]]:
+    """Count the observations present in both columns of every pair.
+
+    Args:
+        data: Observations x variables block, NaN where missing.
+
+    Returns:
+        The variables x variables overlap counts.
+    """
+    present = (~np.isnan(np.asarray(data, dtype=np.float64))).astype(np.float64)
+    counts: np.ndarray[Any, np.dtype[np.int32]] = (present.T @ present).astype(np.int32)
+    return counts
+
+
+def _has_missing(data: np.ndarray[Any, np.dtype[Any]]) -> bool:
+    return bool(np.isnan(np.asarray(data, dtype=np.float64)).any())
+
+
+def _pearson_block(
+    standardized: np.ndarray[Any, np.dtype[np.float64]],
+    rows: slice,
+    columns: slice,
+    missing: bool,
+) -> np.ndarray[Any, np.dtype[np.float64]]:
+    """Correlate two column ranges of a standardized block."""
+    if missing:
+        return pearson_from_moments(
+            pairwise_moments(standardized[:, rows], standardized[:, columns])
+        )
+    block: np.ndarray[Any, np.dtype[np.float64]] = (
+        standardized[:, rows].T @ standardized[:, columns]
+    )
+    np.clip(block, -1.0, 1.0, out=block)
+    return block
+
+
+def pearson_matrix(
+    data: np.ndarray[Any, np.dtype[Any]], lower_triangle_only: bool = False
+) -> np.ndarray[Any, np.dtype[np.float64]]:
+    """Compute the Pearson correlation matrix between all columns of ``data``.
+
+    The block is standardized once and the whole matrix is obtained from a
+    single matrix product instead of one ``pd.Series.corr`` call per pair.
+    With missing values every pair is correlated over the observations
+    present in both columns, from a few mask-aware matrix products.
+
+    Args:
+        data: Observations x variables block, NaN where missing.
+        lower_triangle_only: Leave the strict upper triangle at zero.
+
+    Returns:
+        The variables x variables correlation matrix.
+    """
+    standardized = standardize(data)
+    everything = slice(None)
+    matrix = _pearson_block(standardized, everything, everything, _has_missing(data))
+    if lower_triangle_only:
+        matrix = np.tril(matrix)
+    return matrix
+
+
+def lower_tiles(n: int, tile_size: int = DEFAULT_TILE_SIZE) -> Iterator[tuple[slice, slice]]:
+    """Yield the square tiles covering the lower triangle of an n x n matrix.
+
+    Tiles are yielded row band by row band. Diagonal tiles, whose row and
+    column slices are equal, also cover part of the upper triangle.
+
+    Args:
+        n: Matrix size.
+        tile_size: Side length of a tile.
+
+    Yields:
+        ``(rows, columns)`` slices of one tile.
+    """
+    for row_start in range(0, n, tile_size):
+        rows = slice(row_start, min(row_start + tile_size, n))
+        for column_start in range(0, row_start + 1, tile_size):
+            yield rows, slice(column_start, min(column_start + tile_size, n))
+
+
+def strict_lower_values(
+    matrix: Correlations, rows: slice, columns: slice
+) -> np.ndarray[Any, np.dtype[np.float64]]:
+    """Return the values of a tile that lie strictly below the matrix diagonal."""
+    block = np.asarray(matrix[rows, columns])
+    if rows == columns:
+        values: np.ndarray[Any, np.dtype[np.float64]] = block[np.tril_indices(len(block), k=-1)]
+        return values
+    return block.ravel()
+
+
+def pearson_matrix_tiled(
+    data: np.ndarray[Any, np.dtype[Any]],
+    path: str | os.PathLike[str],
+    tile_size: int = DEFAULT_TILE_SIZE,
+) -> np.memmap[Any, np.dtype[np.float64]]:
+    """Compute the Pearson correlation matrix tile by tile into a ``.npy`` file.
+
+    Only the standardized data and one tile are held in memory. Every lower
+    tile is mirrored into the upper triangle, so the stored matrix is exactly
+    symmetric and each row can be read contiguously.
+
+    Args:
+        data: Observations x variables block.
+        path: Destination ``.npy`` file, overwritten if it exists.
+        tile_size: Side length of a tile.
+
+    Returns:
+        The variables x variables correlation matrix, memory-mapped read-write.
+    """
+    standardized = standardize(data)
+    missing = _has_missing(data)
+    n = standardized.shape[1]
+    matrix: np.memmap[Any, np.dtype[np.float64]] = np.lib.format.open_memmap(
+        path, mode="w+", dtype=np.float64, shape=(n, n)
+    )
+    for rows, columns in lower_tiles(n, tile_size):
+        block = _pearson_block(standardized, rows, columns, missing)
+        if rows == columns:
+            block = np.tril(block) + np.tril(block, k=-1).T
+        matrix[rows, columns] = block
+        if rows != columns:
+            matrix[columns, rows] = block.T
+    matrix.flush()
+    return matrix
+
+
+def condensed_index(i: int, j: int) -> int:
+    """Return the position of entry ``(i, j)``, ``i != j``, in a condensed lower triangle."""
+    high, low = (i, j) if i > j else (j, i)
+    return high * (high - 1) // 2 + low
+
+
+def _positions(key: int | slice, n: int) -> np.ndarray[Any, np.dtype[np.intp]]:
+    if isinstance(key, slice):
+        return np.arange(*key.indices(n))
+    if not -n <= key < n:
+        raise IndexError(f"index {key} is out of bounds for size {n}")
+    return np.array([key % n])
+
+
+class CondensedMatrix:
+    """Symmetric matrix stored as its strict lower triangle and its diagonal.
+
+    The strict lower triangle is kept row by row in one float32 array, so
+    entry ``(i, j)`` with ``i > j`` lives at ``i * (i - 1) // 2 + j``. That
+    is a quarter of the memory of the full float64 matrix. Indexing with
+    integers and slices returns float64 blocks like a dense matrix would, so
+    tile-wise consumers read the compact form directly.
+    """
+
+    def __init__(
+        self,
+        values: np.ndarray[Any, np.dtype[Any]],
+        diagonal: np.ndarray[Any, np.dtype[Any]],
+    ) -> None:
+        """Initialize the matrix from its condensed parts.
+
+        Args:
+            values: Strict lower triangle in row-major order, n(n-1)/2 values.
+            diagonal: The n diagonal values.
+
+        Raises:
+            ValueError: If the number of values does not match the diagonal.
+        """
+        self.values: np.ndarray[Any, np.dtype[np.float32]] = np.asarray(values, dtype=np.float32)
+        self.diagonal: np.ndarray[Any, np.dtype[np.float32]] = np.asarray(
+            diagonal, dtype=np.float32
+        )
+        n = len(self.diagonal)
+        if len(self.values) != n * (n - 1) // 2:
+            raise ValueError(f"{len(self.values)} condensed values do not match a {n} x {n} matrix")
+        self.shape: tuple[int, int] = (n, n)
+
+    @classmethod
+    def from_dense(cls, matrix: np.ndarray[Any, np.dtype[Any]]) -> CondensedMatrix:
+        """Condense the lower triangle of a square matrix."""
+        n = matrix.shape[0]
+        values = np.empty(n * (n - 1) // 2, dtype=np.float32)
+        for i in range(1, n):
+            start = i * (i - 1) // 2
+            values[start : start + i] = matrix[i, :i]
+        return cls(values, np.diagonal(matrix))
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the condensed values and the diagonal."""
+        return self.values.nbytes + self.diagonal.nbytes
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def block(
+        self,
+        rows: np.ndarray[Any, np.dtype[np.intp]],
+        columns: np.ndarray[Any, np.dtype[np.intp]],
+    ) -> np.ndarray[Any, np.dtype[np.float64]]:
+        """Return the dense float64 block at the given row and column positions."""
+        row_grid = rows[:, None]
+        column_grid = columns[None, :]
+        high = np.maximum(row_grid, column_grid)
+        low = np.minimum(row_grid, column_grid)
+        off_diagonal = high != low
+        block = np.empty(off_diagonal.shape)
+        block[off_diagonal] = self.values[(high * (high - 1) // 2 + low)[off_diagonal]]
+        block[~off_diagonal] = self.diagonal[np.broadcast_to(row_grid, block.shape)[~off_diagonal]]
+        return block
+
+    def __getitem__(
+        self, key: int | slice | tuple[int | slice] | tuple[int | slice, int | slice]
+    ) -> np.ndarray[Any, np.dtype[np.float64]]:
+        """Index like a dense matrix; integer keys drop their axis."""
+        row_key, column_key = (
+            (*key, slice(None))[:2] if isinstance(key, tuple) else (key, slice(None))
+        )
+        n = self.shape[0]
+        block = self.block(_positions(row_key, n), _positions(column_key, n))
+        squeezed: np.ndarray[Any, np.dtype[np.float64]] = block[
+            0 if isinstance(row_key, int) else slice(None),
+            0 if isinstance(column_key, int) else slice(None),
+        ]
+        return squeezed
+
+    def to_dense(
+        self, dtype: type[np.floating[Any]] = np.float64, lower_triangle_only: bool = False
+    ) -> np.ndarray[Any, np.dtype[Any]]:
+        """Expand into a full matrix.
+
+        Args:
+            dtype: Element type of the result.
+            lower_triangle_only: Leave the strict upper triangle at zero.
+
+        Returns:
+            The n x n matrix.
+        """
+        n = self.shape[0]
+        dense = np.zeros((n, n), dtype=dtype)
+        for i in range(1, n):
+            start = i * (i - 1) // 2
+            dense[i, :i] = self.values[start : start + i]
+            if not lower_triangle_only:
+                dense[:i, i] = self.values[start : start + i]
+        np.fill_diagonal(dense, self.diagonal)
+        return dense
+
+
+Correlations = Union[np.ndarray[Any, np.dtype[np.float64]], CondensedMatrix]
+"""A correlation matrix held densely, memory-mapped or condensed."""
+
+
+def pearson_condensed(
+    data: np.ndarray[Any, np.dtype[Any]], tile_size: int = DEFAULT_TILE_SIZE
+) -> CondensedMatrix:
+    """Compute the Pearson correlation matrix straight into condensed float32 storage.
+
+    Rows are computed in bands of ``tile_size``, so the full float64 matrix
+    never exists.
+
+    Args:
+        data: Observations x variables block.
+        tile_size: Number of matrix rows computed per band.
+
+    Returns:
+        The variables x variables correlation matrix in condensed form.
+    """
+    standardized = standardize(data)
+    missing = _has_missing(data)
+    n = standardized.shape[1]
+    values = np.empty(n * (n - 1) // 2, dtype=np.float32)
+    if missing:
+        diagonal = np.where(np.isnan(standardized).all(axis=0), np.nan, 1.0)
+    else:
+        diagonal = np.clip(np.einsum("ij,ij->j", standardized, standardized), -1.0, 1.0)
+    for start in range(0, n, tile_size):
+        stop = min(start + tile_size, n)
+        band = _pearson_block(standardized, slice(start, stop), slice(0, stop), missing)
+        for i in range(start, stop):
+            offset = i * (i - 1) // 2
+            values[offset : offset + i] = band[i - start, :i]
+    return CondensedMatrix(values, diagonal)
+
+
+def _sorted_runs(
+    data: np.ndarray[Any, np.dtype[Any]],
+) -> tuple[
+    np.ndarray[Any, np.dtype[np.intp]],
+    np.ndarray[Any, np.dtype[np.bool_]],
+    np.ndarray[Any, np.dtype[np.intp]],
+    np.ndarray[Any, np.dtype[np.intp]],
+]:
+    """Sort every column and locate the runs of tied values.
+
+    Returns:
+        The sorting permutation, a mask of the positions that start a new
+        run, and for every sorted position the first and last position of
+        its run.
+    """
+    m = data.shape[0]
+    order = np.argsort(data, axis=0, kind="stable")
+    ordered = np.take_along_axis(data, order, axis=0)
+    starts = np.ones(ordered.shape, dtype=bool)
+    starts[1:] = ordered[1:] != ordered[:-1]
+    positions = np.broadcast_to(np.arange(m)[:, None], ordered.shape)
+    first = np.maximum.accumulate(np.where(starts, positions, 0), axis=0)
+    ends = np.ones(ordered.shape, dtype=bool)
+    ends[:-1] = starts[1:]
+    last = np.minimum.accumulate(np.where(ends, positions, m - 1)[::-1], axis=0)[::-1]
+    return order, starts, first, last
+
+
+def rank_columns(data: np.ndarray[Any, np.dtype[Any]]) -> np.ndarray[Any, np.dtype[np.float64]]:
+    """Rank the values of every column, giving ties their average rank.
+
+    Ranks start at 1 and only count the present values; missing (NaN) values
+    keep a NaN rank.
+
+    Args:
+        data: Observations x variables block.
+
+    Returns:
+        The rank block as float64.
+    """
+    block = np.asarray(data, dtype=np.float64)
+    order, _starts, first, last = _sorted_runs(block)
+    ranks = np.empty(block.shape)
+    np.put_along_axis(ranks, order, (first + last) / 2 + 1, axis=0)
+    ranks[np.isnan(block)] = np.nan
+    return ranks
+
+
+def _spearman_pairs(
+    data: np.ndarray[Any, np.dtype[np.float64]],
+    left: np.ndarray[Any, np.dtype[np.intp]],
+    right: np.ndarray[Any, np.dtype[np.intp]],
+) -> np.ndarray[Any, np.dtype[np.float64]]:
+    """Compute Spearman's rho for the column pairs ``(left[k], right[k])``.
+
+    Each pair is ranked over the observations present in both columns.
+    """
+    present = ~(np.isnan(data[:, left]) | np.isnan(data[:, right]))
+    x = rank_columns(np.where(present, data[:, left], np.nan))
+    y = rank_columns(np.where(present, data[:, right], np.nan))
+    counts = present.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = np.where(present, x - np.where(present, x, 0.0).sum(axis=0) / counts, 0.0)
+        y = np.where(present, y - np.where(present, y, 0.0).sum(axis=0) / counts, 0.0)
+        rho: np.ndarray[Any, np.dtype[np.float64]] = np.einsum("ij,ij->j", x, y) / np.sqrt(
+            np.einsum("ij,ij->j", x, x) * np.einsum("ij,ij->j", y, y)
+        )
+    return rho
+
+
+def _count_inversions(
+    sequences: np.ndarray[Any, np.dtype[np.int64]], size: int
+) -> np.ndarray[Any, np.dtype[np.int64]]:
+    """Count the inversions of many integer sequences at once.
+
+    Every row is swept once with its own Fenwick tree over the values
+    ``0 .. size - 1``, which costs O(m log m) for a row of length m.
+    """
+    batch, m = sequences.shape
+    rows = np.arange(batch)
+    tree = np.zeros((batch, size + 1), dtype=np.int64)
+    inversions = np.zeros(batch, dtype=np.int64)
+    levels = size.bit_length() + 1
+    for position in range(m):
+        # Earlier values not greater than the current one; index 0 stays empty.
+        index = sequences[:, position] + 1
+        seen = np.zeros(batch, dtype=np.int64)
+        for _ in range(levels):
+            seen += tree[rows, index]
+            index -= index & -index
+        inversions += position - seen
+        index = sequences[:, position] + 1
+        for _ in range(levels):
+            inside = index <= size
+            tree[rows, np.minimum(index, size)] += inside
+            index += index & -index
+    return inversions
+
+
+def _tied_pairs(ordered: np.ndarray[Any, np.dtype[Any]]) -> np.ndarray[Any, np.dtype[np.int64]]:
+    """Count the pairs of equal values in every row of an already sorted block."""
+    equal = np.diff(ordered, axis=1) == 0
+    run = np.cumsum(equal, axis=1)
+    reset = np.maximum.accumulate(np.where(equal, 0, run), axis=1)
+    tied: np.ndarray[Any, np.dtype[np.int64]] = (run - reset).sum(axis=1)
+    return tied
+
+
+def _kendall_pairs(
+    dense: np.ndarray[Any, np.dtype[np.int64]],
+    missing: np.ndarray[Any, np.dtype[np.bool_]],
+    left: np.ndarray[Any, np.dtype[np.intp]],
+    right: np.ndarray[Any, np.dtype[np.intp]],
+) -> np.ndarray[Any, np.dtype[np.float64]]:
+    """Compute Kendall's tau-b for the column pairs ``(left[k], right[k])``.
+
+    Knight's algorithm: sort each pair by x, then y, count the ties, and
+    count the discordant pairs as the inversions of the y sequence.
+    Observations missing from either column get distinct values above every
+    rank, so they sort last and add neither ties nor inversions.
+    """
+    m = dense.shape[0]
+    present = ~(missing[:, left] | missing[:, right]).T
+    outside = np.arange(m, 2 * m)
+    x = np.where(present, dense[:, left].T, outside)
+    y = np.where(present, dense[:, right].T, outside)
+    order = np.argsort(x * 2 * m + y, axis=1, kind="stable")
+    x = np.take_along_axis(x, order, axis=1)
+    y = np.take_along_axis(y, order, axis=1)
+    x_ties = _tied_pairs(x)
+    y_ties = _tied_pairs(np.sort(y, axis=1))
+    joint = _tied_pairs(x * 2 * m + y)
+    discordant = _count_inversions(y, 2 * m)
+    counts = present.sum(axis=1)
+    total = counts * (counts - 1) // 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tau: np.ndarray[Any, np.dtype[np.float64]] = (
+            total - x_ties - y_ties + joint - 2 * discordant
+        ) / np.sqrt((total - x_ties) * (total - y_ties))
+    return tau
+
+
+_PairFunction = Callable[..., np.ndarray[Any, np.dtype[np.float64]]]
+
+
+def _pair_band(
+    function: _PairFunction,
+    arrays: tuple[np.ndarray[Any, np.dtype[Any]], ...],
+    start: int,
+    stop: int,
+    batch_size: int,
+) -> np.ndarray[Any, np.dtype[np.float64]]:
+    """Compute rows ``start .. stop - 1`` of the lower triangle, diagonal included."""
+    counts = np.arange(start, stop) + 1
+    left = np.repeat(np.arange(start, stop), counts)
+    offsets = np.repeat(np.cumsum(counts) - counts, counts)
+    right = np.arange(len(left)) - offsets
+    band = np.zeros((stop - start, stop))
+    for begin in range(0, len(left), batch_size):
+        pairs = slice(begin, begin + batch_size)
+        band[left[pairs] - start, right[pairs]] = function(*arrays, left[pairs], right[pairs])
+    return band
+
+
+def process_pool(jobs: int) -> ProcessPoolExecutor:
+    """Return a pool of ``jobs`` worker processes started with the spawn method.
+
+    Forking is unsafe in a process that runs threads, such as the GUI with
+    its grouping worker, so workers never inherit the caller's state.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    return ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _balanced_bands(n: int, count: int) -> list[tuple[int, int]]:
+    """Split the rows of a lower triangle into bands holding about equally many pairs."""
+    bounds = np.unique(np.round(n * np.sqrt(np.arange(count + 1) / count)).astype(int))
+    return [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+def _pairwise_matrix(
+    function: _PairFunction,
+    arrays: tuple[np.ndarray[Any, np.dtype[Any]], ...],
+    n: int,
+    lower_triangle_only: bool,
+    jobs: int,
+    batch_size: int,
+) -> np.ndarray[Any, np.dtype[np.float64]]:
+    """Fill a correlation matrix by applying ``function`` to batches of column pairs.
+
+    The lower triangle is split into row bands of similar cost that run on
+    ``jobs`` worker processes, unless there are fewer than
+    :data:`PARALLEL_MIN_WORK` pairs times observations.
+    """
+    matrix = np.zeros((n, n))
+    if jobs <= 1 or n * (n - 1) // 2 * len(arrays[0]) < PARALLEL_MIN_WORK:
+        matrix[:] = _pair_band(function, arrays, 0, n, batch_size)
+    else:
+        bands = _balanced_bands(n, 4 * jobs)
+        with process_pool(jobs) as executor:
+            futures = [
+                executor.submit(_pair_band, function, arrays, start, stop, batch_size)
+                for start, stop in bands
+            ]
+            for (start, stop), future in zip(bands, futures):
+                matrix[start:stop, :stop] = future.result()
+    np.clip(matrix, -1.0, 1.0, out=matrix)
+    if not lower_triangle_only:
+        matrix += np.tril(matrix, k=-1).T
+    return matrix
+
+
+def spearman_matrix(
+    data: np.ndarray[Any, np.dtype[Any]],
+    lower_triangle_only: bool = False,
+    jobs: int = 1,
+    batch_size: int = PAIR_BATCH_SIZE,
+) -> np.ndarray[Any, np.dtype[np.float64]]:
+    """Compute the Spearman rank correlation matrix between all columns of ``data``.
+
+    Without missing values this is the Pearson matrix of the column ranks.
+    With missing values the ranks depend on which observations a pair
+    shares, so the pairs are ranked and correlated in vectorized batches of
+    ``batch_size`` on ``jobs`` worker processes instead.
+
+    Args:
+        data: Observations x variables block, NaN where missing.
+        lower_triangle_only: Leave the strict upper triangle at zero.
+        jobs: Number of worker processes for data with missing values.
+        batch_size: Number of pairs computed per vectorized pass.
+
+    Returns:
+        The variables x variables correlation matrix.
+    """
+    block = np.asarray(data, dtype=np.float64)
+    if not _has_missing(block):
+        return pearson_matrix(rank_columns(block), lower_triangle_only=lower_triangle_only)
+    return _pairwise_matrix(
+        _spearman_pairs, (block,), block.shape[1], lower_triangle_only, jobs, batch_size
+    )
+
+
+def kendall_matrix(
+    data: np.ndarray[Any, np.dtype[Any]],
+    lower_triangle_only: bool = False,
+    jobs: int = 1,
+    batch_size: int = PAIR_BATCH_SIZE,
+) -> np.ndarray[Any, np.dtype[np.float64]]:
+    """Compute the Kendall tau-b correlation matrix between all columns of ``data``.
+
+    Every column is ranked once. The pairs are then processed in batches of
+    ``batch_size``, each with one vectorized O(m log m) pass, on ``jobs``
+    worker processes. Missing values are left out pair by pair.
+
+    Args:
+        data: Observations x variables block, NaN where missing.
+        lower_triangle_only: Leave the strict upper triangle at zero.
+        jobs: Number of worker processes; 1 computes in this process.
+        batch_size: Number of pairs computed per vectorized pass.
+
+    Returns:
+        The variables x variables correlation matrix.
+    """
+    block = np.asarray(data, dtype=np.float64)
+    return _pairwise_matrix(
+        _kendall_pairs,
+        _kendall_arrays(block),
+        block.shape[1],
+        lower_triangle_only,
+        jobs,
+        batch_size,
+    )
+
+
+def _kendall_arrays(
+    block: np.ndarray[Any, np.dtype[np.float64]],
+) -> tuple[np.ndarray[Any, np.dtype[np.int64]], np.ndarray[Any, np.dtype[np.bool_]]]:
+    """Return the dense column ranks and the missing mask read by :func:`_kendall_pairs`."""
+    order, starts, _first, _last = _sorted_runs(block)
+    dense = np.empty(block.shape, dtype=np.int64)
+    np.put_along_axis(dense, order, np.cumsum(starts, axis=0) - 1, axis=0)
+    return dense, np.isnan(block)
+
+
+def pearson_equivalent(
+    data: np.ndarray[Any, np.dtype[Any]], method: str
+) -> np.ndarray[Any, np.dtype[np.float64]] | None:
+    """Return the block whose Pearson matrix is the ``method`` matrix of ``data``.
+
+    That is the data itself for Pearson, and the column ranks for Spearman
+    without missing values. Such matrices can also be computed tile by tile
+    or condensed; all others are only computed pair by pair in memory.
+
+    Args:
+        data: Observations x variables block, NaN where missing.
+        method: One of :data:`METHODS`.
+
+    Returns:
+        The block to correlate, or None if there is none.
+    """
+    block = np.asarray(data, dtype=np.float64)
+    if method == "pearson":
+        return block
+    if method == "spearman" and not _has_missing(block):
+        return rank_columns(block)
+    return None
+
+
+def correlation_tiles(
+    data: np.ndarray[Any, np.dtype[Any]],
+    method: str = "pearson",
+    tile_size: int = DEFAULT_TILE_SIZE,
+    batch_size: int = PAIR_BATCH_SIZE,
+) -> Iterator[tuple[slice, slice, np.ndarray[Any, np.dtype[np.float64]]]]:
+    """Compute the lower triangle of the correlation matrix of ``data`` tile by tile.
+
+    Methods with a Pearson equivalent yield the square tiles of
+    :func:`lower_tiles`; the others yield bands of ``tile_size`` rows up to
+    the diagonal, computed pair by pair. Only one tile exists at a time.
+
+    Args:
+        data: Observations x variables block, NaN where missing.
+        method: One of :data:`METHODS`.
+        tile_size: Side length of a tile, or rows of a band.
+        batch_size: Number of pairs computed per vectorized pass.
+
+    Yields:
+        ``(rows, columns, block)`` of one tile. Tiles on the diagonal also
+        hold values on and above it.
+
+    Raises:
+        ValueError: If ``method`` is unknown.
+    """
+    block = np.asarray(data, dtype=np.float64)
+    n = block.shape[1]
+    equivalent = pearson_equivalent(block, method)
+    if equivalent is not None:
+        standardized = standardize(equivalent)
+        missing = _has_missing(equivalent)
+        for rows, columns in lower_tiles(n, tile_size):
+            yield rows, columns, _pearson_block(standardized, rows, columns, missing)
+        return
+    function, arrays = _pair_engine(block, method)
+    for start in range(0, n, tile_size):
+        stop = min(start + tile_size, n)
+        band = _pair_band(function, arrays, start, stop, batch_size)
+        np.clip(band, -1.0, 1.0, out=band)
+        yield slice(start, stop), slice(0, stop), band
+
+
+def _pair_engine(
+    block: np.ndarray[Any, np.dtype[np.float64]], method: str
+) -> tuple[_PairFunction, tuple[np.ndarray[Any, np.dtype[Any]], ...]]:
+    """Return the pair function of a rank method and the arrays it reads."""
+    if method == "spearman":
+        return _spearman_pairs, (block,)
+    if method == "kendall":
+        return _kendall_pairs, _kendall_arrays(block)
+    raise ValueError(f"unknown correlation method {method!r}, expected one of {METHODS}")
+
+
+def correlation_rows(
+    data: np.ndarray[Any, np.dtype[Any]],
+    rows: Sequence[int] | np.ndarray[Any, np.dtype[np.intp]],
+    method: str = "pearson",
+    batch_size: int = PAIR_BATCH_SIZE,
+) -> np.ndarray[Any, np.dtype[np.float64]]:
+    """Compute only the given rows of the correlation matrix of ``data``.
+
+    Each row costs O(m n), so single enzymes can be looked up in panels
+    whose full matrix would not fit in memory.
+
+    Args:
+        data: Observations x variables block, NaN where missing.
+        rows: Positions of the variables whose rows are computed.
+        method: One of :data:`METHODS`.
+        batch_size: Number of pairs computed per vectorized pass of the
+            rank correlations without a Pearson equivalent.
+
+    Returns:
+        The ``len(rows)`` x variables block of correlations.
+
+    Raises:
+        ValueError: If ``method`` is unknown.
+    """
+    block = np.asarray(data, dtype=np.float64)
+    positions = np.asarray(rows, dtype=np.intp)
+    n = block.shape[1]
+    equivalent = pearson_equivalent(block, method)
+    if equivalent is not None:
+        standardized = standardize(equivalent)
+        if _has_missing(equivalent):
+            return pearson_from_moments(pairwise_moments(standardized[:, positions], standardized))
+        product: np.ndarray[Any, np.dtype[np.float64]] = standardized[:, positions].T @ standardized
+        np.clip(product, -1.0, 1.0, out=product)
+        return product
+    function, arrays = _pair_engine(block, method)
+    left = np.repeat(positions, n)
+    right = np.tile(np.arange(n), len(positions))
+    values = np.empty(len(left))
+    for begin in range(0, len(left), batch_size):
+        pairs = slice(begin, begin + batch_size)
+        values[pairs] = function(*arrays, left[pairs], right[pairs])
+    np.clip(values, -1.0, 1.0, out=values)
+    return values.reshape(len(positions), n)
+
+
+def correlate(
+    data: np.ndarray[Any, np.dtype[Any]],
+    method: str = "pearson",
+    lower_triangle_only: bool = False,
+    jobs: int = 1,
+) -> np.ndarray[Any, np.dtype[np.float64]]:
+    """Compute the correlation matrix between all columns of ``data`` in memory.
+
+    Args:
+        data: Observations x variables block.
+        method: One of :data:`METHODS`.
+        lower_triangle_only: Leave the strict upper triangle at zero.
+        jobs: Number of worker processes for the rank correlations.
+
+    Returns:
+        The variables x variables correlation matrix.
+
+    Raises:
+        ValueError: If ``method`` is unknown.
+    """
+    if method == "pearson":
+        return pearson_matrix(data, lower_triangle_only=lower_triangle_only)
+    if method == "spearman":
+        return spearman_matrix(data, lower_triangle_only=lower_triangle_only, jobs=jobs)
+    if method == "kendall":
+        return kendall_matrix(data, lower_triangle_only=lower_triangle_only, jobs=jobs)
+    raise ValueError(f"unknown correlation method {method!r}, expected one of {METHODS}")
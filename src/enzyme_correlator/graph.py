@@ -0,0 +1,195 @@
+"""
+Sparse enzyme similarity graphs of the above-cutoff correlations.
+
+Two enzymes are joined by an edge when their correlation reaches the cutoff,
+exactly as they are linked by :func:`~enzyme_correlator.grouping.group_enzymes`:
+the groups are the connected components of this graph with two or more
+enzymes, and NaN correlations never form an edge.
+
+The edges are collected tile by tile straight from the activities with
+:func:`~enzyme_correlator.correlation.correlation_tiles`, so no n x n array
+is ever allocated:
+
+- :func:`correlation_graph` builds a symmetric CSR structure whose memory
+  scales with the number of edges.
+- :func:`write_edge_list` streams the edges into a CSV file one tile at a
+  time, so even the edges are never held all at once.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from enzyme_correlator.analysis import DEFAULT_CUTOFF
+from enzyme_correlator.correlation import DEFAULT_TILE_SIZE, correlation_tiles
+
+__all__ = ["CorrelationGraph", "correlation_graph", "threshold_edges", "write_edge_list"]
+
+Edges = tuple[
+    np.ndarray[Any, np.dtype[np.intp]],
+    np.ndarray[Any, np.dtype[np.intp]],
+    np.ndarray[Any, np.dtype[np.float64]],
+]
+"""Source positions, target positions and correlations of a batch of edges."""
+
+
+@dataclass
+class CorrelationGraph:
+    """Undirected weighted graph in compressed sparse row form.
+
+    Every edge is stored in both directions, so the neighbors of enzyme ``i``
+    are ``indices[indptr[i]:indptr[i + 1]]``, sorted by position, with their
+    correlations in ``weights`` at the same offsets.
+    """
+
+    enzyme_names: tuple[str, ...]
+    cutoff: float
+    indptr: np.ndarray[Any, np.dtype[np.int64]]
+    indices: np.ndarray[Any, np.dtype[np.intp]]
+    weights: np.ndarray[Any, np.dtype[np.float64]]
+
+    @property
+    def edge_count(self) -> int:
+        """Number of undirected edges."""
+        return len(self.indices) // 2
+
+    def neighbors(self, enzyme: int) -> list[tuple[str, float]]:
+        """Return the names and correlations of the enzymes linked to ``enzyme``."""
+        start, stop = self.indptr[enzyme], self.indptr[enzyme + 1]
+        return [
+            (self.enzyme_names[index], float(weight))
+            for index, weight in zip(self.indices[start:stop], self.weights[start:stop])
+        ]
+
+    def to_scipy(self) -> Any:
+        """Return the graph as a ``scipy.sparse.csr_array``.
+
+        Raises:
+            ImportError: If SciPy is not installed.
+        """
+        try:
+            from scipy.sparse import csr_array
+        except ImportError as error:
+            raise ImportError("converting the graph to SciPy requires scipy") from error
+        n = len(self.enzyme_names)
+        return csr_array((self.weights, self.indices, self.indptr), shape=(n, n))
+
+
+def threshold_edges(
+    data: np.ndarray[Any, np.dtype[Any]],
+    cutoff: float = DEFAULT_CUTOFF,
+    method: str = "pearson",
+    tile_size: int = DEFAULT_TILE_SIZE,
+) -> Iterator[Edges]:
+    """Yield the edges of every lower tile whose correlation reaches the cutoff.
+
+    Args:
+        data: Substrates x enzymes activities, NaN where missing.
+        cutoff: Minimum correlation of an edge.
+        method: Correlation method, one of
+            :data:`~enzyme_correlator.correlation.METHODS`.
+        tile_size: Side length of the computed tiles.
+
+    Yields:
+        The edges of one tile, each once with source > target.
+    """
+    for rows, columns, block in correlation_tiles(data, method, tile_size):
+        linked = block >= cutoff
+        if columns.stop > rows.start:
+            # drop the diagonal and everything above it
+            linked &= (
+                np.arange(rows.start, rows.stop)[:, None]
+                > np.arange(columns.start, columns.stop)[None, :]
+            )
+        sources, targets = np.nonzero(linked)
+        yield (
+            sources + rows.start,
+            targets + columns.start,
+            block[sources, targets].astype(np.float64),
+        )
+
+
+def correlation_graph(
+    df: pd.DataFrame,
+    cutoff: float = DEFAULT_CUTOFF,
+    method: str = "pearson",
+    tile_size: int = DEFAULT_TILE_SIZE,
+) -> CorrelationGraph:
+    """Build the sparse graph of all enzyme pairs whose correlation reaches the cutoff.
+
+    Args:
+        df: Substrates x enzymes activity frame.
+        cutoff: Minimum correlation of an edge.
+        method: Correlation method, one of
+            :data:`~enzyme_correlator.correlation.METHODS`.
+        tile_size: Side length of the computed tiles.
+
+    Returns:
+        The graph in CSR form.
+    """
+    names = tuple(str(enzyme) for enzyme in df.columns)
+    batches = list(threshold_edges(df.to_numpy(dtype=np.float64), cutoff, method, tile_size))
+    sources = np.concatenate([np.empty(0, dtype=np.intp)] + [b[0] for b in batches])
+    targets = np.concatenate([np.empty(0, dtype=np.intp)] + [b[1] for b in batches])
+    weights = np.concatenate([np.empty(0)] + [b[2] for b in batches])
+    del batches
+    rows = np.concatenate((sources, targets))
+    columns = np.concatenate((targets, sources))
+    order = np.lexsort((columns, rows))
+    indptr = np.zeros(len(names) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=len(names)), out=indptr[1:])
+    return CorrelationGraph(
+        enzyme_names=names,
+        cutoff=cutoff,
+        indptr=indptr,
+        indices=columns[order],
+        weights=np.concatenate((weights, weights))[order],
+    )
+
+
+def write_edge_list(
+    df: pd.DataFrame,
+    path: str | os.PathLike[str],
+    cutoff: float = DEFAULT_CUTOFF,
+    method: str = "pearson",
+    tile_size: int = DEFAULT_TILE_SIZE,
+    sep: str = ";",
+    decimal: str = ",",
+) -> int:
+    """Stream the above-cutoff edges into a ``Source;Target;Correlation`` CSV file.
+
+    Each undirected edge is written once. The file uses the ``;`` delimiter
+    and ``,`` decimal separator of the input exports by default.
+
+    Args:
+        df: Substrates x enzymes activity frame.
+        path: Destination file, overwritten if it exists.
+        cutoff: Minimum correlation of an edge.
+        method: Correlation method, one of
+            :data:`~enzyme_correlator.correlation.METHODS`.
+        tile_size: Side length of the computed tiles.
+        sep: Field delimiter.
+        decimal: Decimal separator of the correlations.
+
+    Returns:
+        The number of written edges.
+    """
+    names: Sequence[str] = [str(enzyme) for enzyme in df.columns]
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as stream:
+        stream.write(f"Source{sep}Target{sep}Correlation\n")
+        for sources, targets, weights in threshold_edges(
+            df.to_numpy(dtype=np.float64), cutoff, method, tile_size
+        ):
+            stream.writelines(
+                f"{names[a]}{sep}{names[b]}{sep}{repr(w).replace('.', decimal)}\n"
+                for a, b, w in zip(sources.tolist(), targets.tolist(), weights.tolist())
+            )
+            count += len(sources)
+    return count
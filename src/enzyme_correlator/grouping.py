@@ -0,0 +1,237 @@
+"""
+Enzyme grouping as connected components of the thresholded correlation matrix.
+
+Two enzymes are linked when their correlation reaches the cutoff, and a group
+is a connected component of two or more linked enzymes. Only the strict lower
+triangle of the matrix is read, so matrices computed with
+``lower_triangle_only`` work as well.
+
+Grouping at a cutoff is single-linkage connectivity, so the maximum spanning
+forest of the matrix holds every grouping at once: the groups at cutoff ``c``
+are the components formed by the forest edges of weight ``c`` or more.
+:class:`CutoffIndex` stores that forest so any cutoff is answered without
+touching the matrix again.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+
+from enzyme_correlator.correlation import (
+    DEFAULT_TILE_SIZE,
+    CondensedMatrix,
+    Correlations,
+    lower_tiles,
+)
+
+__all__ = ["CutoffIndex", "DisjointSet", "group_enzymes", "label_components", "linked_pairs"]
+
+
+class DisjointSet:
+    """Union-find over the integers ``0..n-1`` with path halving and union by size."""
+
+    def __init__(self, n: int) -> None:
+        """Initialize ``n`` singleton sets.
+
+        Args:
+            n: Number of elements.
+        """
+        self.parent: list[int] = list(range(n))
+        self.size: list[int] = [1] * n
+
+    def find(self, x: int) -> int:
+        """Return the representative of the set containing ``x``."""
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> bool:
+        """Merge the sets containing ``a`` and ``b``.
+
+        Returns:
+            Whether two distinct sets were merged.
+        """
+        root_a = self.find(a)
+        root_b = self.find(b)
+        if root_a == root_b:
+            return False
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        return True
+
+
+def linked_pairs(
+    correlations: Correlations,
+    cutoff: float,
+    tile_size: int = DEFAULT_TILE_SIZE,
+) -> tuple[np.ndarray[Any, np.dtype[np.intp]], np.ndarray[Any, np.dtype[np.intp]]]:
+    """Find all lower-triangle pairs whose correlation reaches the cutoff.
+
+    The matrix is scanned tile by tile, so memory-mapped matrices are never
+    loaded whole. Condensed matrices are scanned in chunks of their values,
+    whose positions map back to row and column in O(1).
+
+    Args:
+        correlations: Enzymes x enzymes correlation matrix.
+        cutoff: Minimum correlation for two enzymes to be linked.
+        tile_size: Side length of the scanned tiles.
+
+    Returns:
+        Row and column indices of the linked pairs, with row > column.
+    """
+    if isinstance(correlations, CondensedMatrix):
+        return _condensed_linked_pairs(correlations, cutoff, tile_size**2)
+    found_rows = [np.empty(0, dtype=np.intp)]
+    found_columns = [np.empty(0, dtype=np.intp)]
+    for rows, columns in lower_tiles(correlations.shape[0], tile_size):
+        linked = np.asarray(correlations[rows, columns]) >= cutoff
+        if rows == columns:
+            linked = np.tril(linked, k=-1)
+        tile_rows, tile_columns = np.nonzero(linked)
+        found_rows.append(tile_rows + rows.start)
+        found_columns.append(tile_columns + columns.start)
+    return np.concatenate(found_rows), np.concatenate(found_columns)
+
+
+def _condensed_linked_pairs(
+    correlations: CondensedMatrix, cutoff: float, chunk_size: int
+) -> tuple[np.ndarray[Any, np.dtype[np.intp]], np.ndarray[Any, np.dtype[np.intp]]]:
+    found = [np.empty(0, dtype=np.intp)]
+    values = correlations.values
+    for start in range(0, len(values), chunk_size):
+        chunk = values[start : start + chunk_size].astype(np.float64)
+        found.append(np.flatnonzero(chunk >= cutoff) + start)
+    positions = np.concatenate(found)
+    # invert position = row * (row - 1) / 2 + column, correcting float rounding
+    rows = ((1 + np.sqrt(1 + 8 * positions.astype(np.float64))) // 2).astype(np.intp)
+    rows[rows * (rows - 1) // 2 > positions] -= 1
+    rows[(rows + 1) * rows // 2 <= positions] += 1
+    return rows, positions - rows * (rows - 1) // 2
+
+
+def group_enzymes(
+    correlations: Correlations,
+    enzyme_names: Sequence[str],
+    cutoff: float,
+    tile_size: int = DEFAULT_TILE_SIZE,
+) -> dict[int, list[str]]:
+    """Sort enzymes into groups based on a correlation cutoff.
+
+    Groups are numbered in order of their first enzyme, and enzymes within a
+    group keep their matrix order.
+
+    Args:
+        correlations: Enzymes x enzymes correlation matrix.
+        enzyme_names: Enzyme names in matrix order.
+        cutoff: Minimum correlation for two enzymes to be linked.
+        tile_size: Side length of the scanned tiles.
+
+    Returns:
+        Mapping from group number to the enzymes in that group.
+    """
+    rows, columns = linked_pairs(correlations, cutoff, tile_size=tile_size)
+    return label_components(rows, columns, enzyme_names)
+
+
+def label_components(
+    rows: np.ndarray[Any, np.dtype[np.intp]],
+    columns: np.ndarray[Any, np.dtype[np.intp]],
+    enzyme_names: Sequence[str],
+) -> dict[int, list[str]]:
+    """Name the connected components spanned by the given edges.
+
+    Groups are numbered in order of their first enzyme, and enzymes within a
+    group keep their matrix order, whatever the order of the edges.
+    """
+    components = DisjointSet(len(enzyme_names))
+    for a, b in zip(rows.tolist(), columns.tolist()):
+        components.union(a, b)
+
+    members: dict[int, list[str]] = {}
+    for enzyme in np.union1d(rows, columns).tolist():
+        members.setdefault(components.find(enzyme), []).append(enzyme_names[enzyme])
+    return dict(enumerate(members.values()))
+
+
+class CutoffIndex:
+    """Single-linkage merge tree answering the grouping at any cutoff.
+
+    The index is the maximum spanning forest of the correlation matrix, found
+    with Prim's algorithm in O(n^2) time and O(n) extra memory. Its edges are
+    kept sorted by decreasing correlation, so a query only unions the prefix
+    of edges that reach the cutoff.
+    """
+
+    def __init__(
+        self,
+        correlations: Correlations,
+        enzyme_names: Sequence[str],
+        symmetric: bool = False,
+    ) -> None:
+        """Build the index from a correlation matrix.
+
+        Args:
+            correlations: Enzymes x enzymes correlation matrix. Only the strict
+                lower triangle is read; NaN correlations never link.
+            enzyme_names: Enzyme names in matrix order.
+            symmetric: The matrix is stored in full and exactly symmetric, as
+                written by ``pearson_matrix_tiled``. Whole rows are then read
+                instead of strided columns, which keeps memory-mapped matrices
+                streaming from disk.
+        """
+        self.enzyme_names: tuple[str, ...] = tuple(enzyme_names)
+        n = len(self.enzyme_names)
+
+        size = max(n - 1, 0)
+        weights = np.empty(size)
+        sources = np.empty(size, dtype=np.intp)
+        targets = np.empty(size, dtype=np.intp)
+
+        best = np.full(n, -np.inf)
+        nearest = np.zeros(n, dtype=np.intp)
+        remaining = np.ones(n, dtype=bool)
+        current = 0
+        remaining[:1] = False
+        for step in range(size):
+            if symmetric:
+                row = np.asarray(correlations[current])
+            else:
+                row = np.concatenate(
+                    (correlations[current, :current], correlations[current:, current])
+                )
+            closer = remaining & (row > best)
+            best[closer] = row[closer]
+            nearest[closer] = current
+            current = int(np.nanargmax(np.where(remaining, best, np.nan)))
+            weights[step] = best[current]
+            sources[step] = nearest[current]
+            targets[step] = current
+            remaining[current] = False
+
+        order = np.argsort(-weights, kind="stable")
+        self.weights: np.ndarray[Any, np.dtype[np.float64]] = weights[order]
+        self.sources: np.ndarray[Any, np.dtype[np.intp]] = sources[order]
+        self.targets: np.ndarray[Any, np.dtype[np.intp]] = targets[order]
+
+    def linked_count(self, cutoff: float) -> int:
+        """Return how many forest edges reach the cutoff."""
+        return int(np.searchsorted(-self.weights, -cutoff, side="right"))
+
+    def grouping(self, cutoff: float) -> dict[int, list[str]]:
+        """Return the grouping at a cutoff, numbered like :func:`group_enzymes`.
+
+        Args:
+            cutoff: Minimum correlation for two enzymes to be linked.
+
+        Returns:
+            Mapping from group number to the enzymes in that group.
+        """
+        count = self.linked_count(cutoff)
+        return label_components(self.sources[:count], self.targets[:count], self.enzyme_names)
@@ -0,0 +1,187 @@
+"""
+Virtualized, searchable list of enzyme groups for the GUI.
+
+With thousands of grouped enzymes, writing the whole grouping into a text
+widget on every slider step is slow and leaves a list nobody can navigate.
+:class:`VirtualGroupList` instead keeps only the rows in view in its listbox
+and drives the scrollbar itself, so a redraw touches at most
+:data:`GROUP_ROWS` lines, and only those whose text changed.
+
+:class:`GroupRows` holds the rows behind the view. Moving the cutoff only
+reformats groups whose members changed, and searching narrows the previous
+matches while the query grows character by character.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import tkinter as tk
+    from tkinter import ttk
+
+__all__ = ["GROUP_HEADER", "GROUP_ROWS", "GroupRows", "VirtualGroupList"]
+
+GROUP_ROWS = 10
+"""Number of groups shown at once."""
+
+GROUP_HEADER = f"{'Group':<8} Enzymes"
+"""Column titles above the rows, aligned with them in a fixed-width font."""
+
+_Members = tuple[str, ...]
+
+
+class GroupRows:
+    """The groups of a grouping as display rows, optionally filtered by enzyme name."""
+
+    def __init__(self) -> None:
+        """Initialize an empty list without a search query."""
+        self.groups: list[tuple[int, _Members]] = []
+        self.query: str = ""
+        self.matches: list[int] = []
+        self._texts: dict[_Members, str] = {}
+        self._hits: dict[_Members, bool] = {}
+
+    def __len__(self) -> int:
+        """Return the number of groups matching the query."""
+        return len(self.matches)
+
+    def set_grouping(self, grouping: Mapping[int, Sequence[str]]) -> list[int]:
+        """Install a new grouping, keeping what is known about unchanged groups.
+
+        Args:
+            grouping: Mapping from group number to the enzymes in that group.
+
+        Returns:
+            Positions of the groups that differ from the previous grouping.
+        """
+        groups = [(number, tuple(members)) for number, members in grouping.items()]
+        changed = [
+            position
+            for position, group in enumerate(groups)
+            if position >= len(self.groups) or self.groups[position] != group
+        ]
+        present = {members for _, members in groups}
+        self._texts = {members: text for members, text in self._texts.items() if members in present}
+        self._hits = {members: hit for members, hit in self._hits.items() if members in present}
+        self.groups = groups
+        self.matches = [
+            position for position in range(len(groups)) if self._matches(groups[position][1])
+        ]
+        return changed
+
+    def search(self, query: str) -> None:
+        """Show only the groups with an enzyme whose name contains ``query``.
+
+        The search ignores case; an empty query shows every group. A query
+        extending the previous one only searches the groups that matched it.
+        """
+        query = query.strip().lower()
+        if query == self.query:
+            return
+        if self.query and query.startswith(self.query):
+            candidates: Sequence[int] = self.matches
+        else:
+            candidates = range(len(self.groups))
+        self.query = query
+        self._hits = {}
+        self.matches = [
+            position for position in candidates if self._matches(self.groups[position][1])
+        ]
+
+    def _matches(self, members: _Members) -> bool:
+        if not self.query:
+            return True
+        hit = self._hits.get(members)
+        if hit is None:
+            hit = self._hits[members] = any(self.query in name.lower() for name in members)
+        return hit
+
+    def lines(self, start: int, stop: int) -> list[str]:
+        """Return the text of the matching groups from ``start`` up to ``stop``."""
+        lines = []
+        for position in self.matches[start:stop]:
+            number, members = self.groups[position]
+            text = self._texts.get(members)
+            if text is None:
+                text = self._texts[members] = ", ".join(members)
+            lines.append(f"{number:<8} {text}")
+        return lines
+
+
+class VirtualGroupList:
+    """Show a :class:`GroupRows` in a listbox that only holds the visible rows.
+
+    The scrollbar is not attached to the listbox, which never holds more
+    than a screenful; its ``command`` must be :meth:`scroll`. The column
+    titles, :data:`GROUP_HEADER`, belong in a fixed label above the listbox
+    so that they stay in view while scrolling.
+    """
+
+    def __init__(
+        self, listbox: tk.Listbox, scrollbar: ttk.Scrollbar, height: int = GROUP_ROWS
+    ) -> None:
+        """Initialize the view on existing widgets.
+
+        Args:
+            listbox: Listbox with room for ``height`` rows.
+            scrollbar: Scrollbar whose position the view sets.
+            height: Number of rows shown at once.
+        """
+        self.rows = GroupRows()
+        self.listbox = listbox
+        self.scrollbar = scrollbar
+        self.height = height
+        self.top: int = 0
+        self.shown: list[str] = []
+
+    def show(self, grouping: Mapping[int, Sequence[str]]) -> None:
+        """Display a new grouping, keeping the scroll position."""
+        self.rows.set_grouping(grouping)
+        self.refresh()
+
+    def search(self, query: str) -> None:
+        """Filter the groups by enzyme name and scroll to the first match."""
+        self.rows.search(query)
+        self.top = 0
+        self.refresh()
+
+    def scroll(self, action: str, amount: str, unit: str = "units") -> None:
+        """Move the view; accepts the arguments of a Tk scrollbar command.
+
+        Args:
+            action: ``"moveto"`` to jump to a fraction of the list, or
+                ``"scroll"`` to move by a number of units.
+            amount: The fraction or the number of units.
+            unit: ``"units"`` for rows or ``"pages"`` for screenfuls.
+        """
+        if action == "moveto":
+            self.top = round(float(amount) * len(self.rows))
+        elif action == "scroll":
+            self.top += int(amount) * (self.height if unit == "pages" else 1)
+        self.refresh()
+
+    def wheel(self, event: tk.Event[tk.Misc]) -> None:
+        """Scroll three rows per mouse wheel step, on every windowing system."""
+        up = event.num == 4 or (event.num != 5 and event.delta > 0)
+        self.scroll("scroll", "-3" if up else "3")
+
+    def refresh(self) -> None:
+        """Rewrite the visible rows whose text changed and move the scrollbar."""
+        total = len(self.rows)
+        self.top = max(0, min(self.top, total - self.height))
+        lines = self.rows.lines(self.top, self.top + self.height)
+        for index, line in enumerate(lines):
+            if index < len(self.shown):
+                if self.shown[index] == line:
+                    continue
+                self.listbox.delete(index)
+            self.listbox.insert(index, line)
+        if len(self.shown) > len(lines):
+            self.listbox.delete(len(lines), len(self.shown) - 1)
+        self.shown = lines
+        if total:
+            self.scrollbar.set(self.top / total, min(self.top + self.height, total) / total)
+        else:
+            self.scrollbar.set(0.0, 1.0)
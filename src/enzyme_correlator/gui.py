@@ -0,0 +1,932 @@
+#!/usr/bin/env python3
+"""
+Tkinter front end of the enzyme activity correlator.
+
+All computation is delegated to :mod:`enzyme_correlator.analysis`; this module
+only holds the window, its widgets and the callbacks that tie them together.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import tkinter as tk
+from collections.abc import Callable, Iterable, Sequence
+from tkinter import filedialog, ttk
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_tkagg import (  # type: ignore[attr-defined]
+    FigureCanvasTkAgg,
+    NavigationToolbar2Tk,
+)
+from matplotlib.figure import Figure
+
+from enzyme_correlator.analysis import (
+    DEFAULT_CUTOFF,
+    DISPLAY_DECIMALS,
+    histogram_axis,
+    histogram_counts,
+    read_activity_csv,
+)
+from enzyme_correlator.cache import ResultCache
+from enzyme_correlator.comparison import DatasetComparison, compare_files, format_comparison
+from enzyme_correlator.correlation import (
+    METHODS,
+    CondensedMatrix,
+    Correlations,
+    correlate,
+    overlap_counts,
+    pearson_condensed,
+    pearson_equivalent,
+)
+from enzyme_correlator.grouping import CutoffIndex
+from enzyme_correlator.groupview import GROUP_HEADER, GROUP_ROWS, VirtualGroupList
+from enzyme_correlator.incremental import IncrementalAnalysis
+from enzyme_correlator.partners import DEFAULT_PARTNERS, top_partners
+from enzyme_correlator.plotting import (
+    CORRELATION_FIGSIZE,
+    HISTOGRAM_FIGSIZE,
+    BlitManager,
+    Heatmap,
+    draw_correlation_matrix,
+    draw_histogram,
+    highlight_grouped_bins,
+    update_histogram,
+)
+from enzyme_correlator.profiling import StageProfiler, StageRecord, format_records, profiled
+from enzyme_correlator.raster import write_heatmap_png, write_heatmap_tiles
+from enzyme_correlator.selection import SubstrateSelection
+from enzyme_correlator.worker import CoalescingWorker
+
+if TYPE_CHECKING:
+    from matplotlib.patches import Rectangle
+
+__all__ = ["REDRAW_INTERVAL_MS", "WATCH_INTERVAL_MS", "EnzymeCorrelatorGUI", "main"]
+
+logger = logging.getLogger(__name__)
+
+REDRAW_INTERVAL_MS = 50
+"""Shortest time between two redraws while the cutoff slider moves."""
+
+WATCH_INTERVAL_MS = 1000
+"""Time between two checks of a watched data file for changes."""
+
+
+class EnzymeCorrelatorGUI:
+    """GUI application for enzyme activity correlation analysis."""
+
+    def __init__(self, root: tk.Tk, profiler: StageProfiler | None = None) -> None:
+        """Initialize the enzyme correlator GUI.
+
+        Args:
+            root: The tkinter root window.
+            profiler: Stage profiler; by default configured from the
+                environment. An enabled profiler adds a status bar showing
+                the time and memory of the last action and its stages.
+        """
+        self.plot_only_lt: bool = False
+        self.compact_storage: bool = False
+        self.correlation_method: str = "pearson"
+        self.datapath: str = ""
+        self.df: pd.DataFrame = pd.DataFrame()
+        self.enzyme_list: list[pd.Series[float]] = []
+        self.enzyme_matrix_columns: tuple[str, ...] = ()
+        self.raw_correlation_matrix: Correlations = np.array([])
+        self.enzyme_correlation_matrix: Correlations = np.array([])
+        self.overlap: np.ndarray[Any, np.dtype[np.int32]] | None = None
+        self.hist_counts: np.ndarray[Any, np.dtype[np.int64]] = np.array([], dtype=np.int64)
+        self.hist_axis: np.ndarray[Any, np.dtype[np.float64]] = np.array([])
+        self.cutoff_index: CutoffIndex | None = None
+        self.grouping: dict[int, list[str]] = {}
+        self.patches: list[Rectangle] = []
+        self.fig: Figure = Figure()
+        self.canvas: FigureCanvasTkAgg | None = None
+        self.toolbar: NavigationToolbar2Tk | None = None
+        self.figures: dict[str, Figure] = {}
+        self.blitters: dict[str, BlitManager] = {}
+        self.heatmap: Heatmap | None = None
+        self.view: str = ""
+        self.current_plot: Callable[[], None] | None = None
+        self.substrate_selection: SubstrateSelection | None = None
+        self.comparison: DatasetComparison | None = None
+        self.comparison_paths: dict[str, str] = {}
+        self.watching: bool = False
+        self.watched_stat: tuple[int, int] | None = None
+        self.incremental: IncrementalAnalysis | None = None
+        self.cache = ResultCache()
+        self.grouping_worker: CoalescingWorker[tuple[CutoffIndex, float], dict[int, list[str]]] = (
+            CoalescingWorker(lambda job: job[0].grouping(job[1]))
+        )
+        self.poll_scheduled: bool = False
+        self.profiler = profiler if profiler is not None else StageProfiler.from_environment()
+        self.stage_records: list[StageRecord] = []
+        self.status_bar: ttk.Label | None = None
+
+        self.root = root
+        self.root.title("Enzyme Activity Correlator")
+        self.root.wm_attributes("-fullscreen", 1)
+
+        self.framestyle = ttk.Style()
+        self.framestyle.configure("TFrame", background="white")
+
+        self.mainframe = ttk.Frame(self.root, padding=(0, 0, 12, 12))
+
+        self.cutoff = tk.StringVar(self.mainframe, str(DEFAULT_CUTOFF))
+
+        def update_cutoff(_value: str) -> None:
+            self.request_grouping(float(self.cutoff.get()))
+
+        self.load_data_button = ttk.Button(
+            self.mainframe, text="Load Data", command=self.load_data_callback
+        )
+        self.show_grouping_button = ttk.Button(
+            self.mainframe, text="Show Enzyme Grouping", command=self.show_grouping_button_callback
+        )
+        self.plot_correlation_matrix_button = ttk.Button(
+            self.mainframe,
+            text="Plot Correlation Matrix",
+            command=self.plot_correlation_data_callback,
+        )
+        self.plot_histogram_button = ttk.Button(
+            self.mainframe, text="Plot Histogram", command=self.plot_histogram_button_callback
+        )
+        self.save_fig_button = ttk.Button(
+            self.mainframe, text="Save Figure", command=self.save_fig_button_callback
+        )
+        self.export_heatmap_button = ttk.Button(
+            self.mainframe, text="Export Heatmap Image", command=self.export_heatmap_button_callback
+        )
+        self.watch_button = ttk.Button(
+            self.mainframe, text="Watch File", command=self.toggle_watch_callback
+        )
+        self.compare_button = ttk.Button(
+            self.mainframe, text="Compare Datasets", command=self.compare_datasets_callback
+        )
+        self.dataset_selector = ttk.Combobox(self.mainframe, state="readonly")
+        self.dataset_selector.bind("<<ComboboxSelected>>", self.dataset_selector_callback)
+        self.clear_cache_button = ttk.Button(
+            self.mainframe, text="Clear Cache", command=self.clear_cache_button_callback
+        )
+        self.quit_button = ttk.Button(
+            self.mainframe, text="Quit", command=self.quit_button_callback
+        )
+        self.substrate_list = tk.Listbox(
+            self.mainframe, selectmode=tk.MULTIPLE, exportselection=False, height=8
+        )
+        self.substrate_list.bind("<<ListboxSelect>>", self.substrate_selection_callback)
+        self.method_selector = ttk.Combobox(self.mainframe, values=METHODS, state="readonly")
+        self.method_selector.set(self.correlation_method)
+        self.method_selector.bind("<<ComboboxSelected>>", self.method_selector_callback)
+        self.partner_selector = ttk.Combobox(self.mainframe)
+        self.partner_selector.bind("<<ComboboxSelected>>", self.partner_lookup_callback)
+        self.partner_selector.bind("<Return>", self.partner_lookup_callback)
+        self.partner_count = ttk.Spinbox(self.mainframe, from_=1, to=1000, width=5)
+        self.partner_count.set(DEFAULT_PARTNERS)
+        # partner lookups, comparison reports and errors; groups have their own list
+        self.details_text = tk.Text(root, height=10, width=150)
+        self.group_frame = ttk.Frame(root)
+        self.group_search_label = ttk.Label(self.group_frame, text="Find enzyme:")
+        self.group_search = ttk.Entry(self.group_frame)
+        self.group_search.bind("<KeyRelease>", self.group_search_callback)
+        self.group_header = ttk.Label(self.group_frame, text=GROUP_HEADER, font="TkFixedFont")
+        self.group_list = tk.Listbox(
+            self.group_frame,
+            height=GROUP_ROWS,
+            width=150,
+            exportselection=False,
+            font="TkFixedFont",
+        )
+        self.group_scrollbar = ttk.Scrollbar(self.group_frame, orient=tk.VERTICAL)
+        self.group_view = VirtualGroupList(self.group_list, self.group_scrollbar)
+        self.group_scrollbar.configure(command=self.group_view.scroll)
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.group_list.bind(sequence, self.group_view.wheel)
+        self.cutoff_slider = tk.Scale(
+            root,
+            from_=-1,
+            to=1,
+            resolution=0.01,
+            variable=self.cutoff,  # type: ignore[arg-type]
+            command=update_cutoff,
+            orient=tk.HORIZONTAL,
+            label="Set grouping cutoff",
+        )
+
+        self.mainframe.grid(column=0, row=0, sticky=tk.N + tk.S + tk.E + tk.W)
+        self.load_data_button.grid(column=0, row=0, sticky=tk.N + tk.E + tk.W, pady=5, padx=5)
+        self.show_grouping_button.grid(column=0, row=1, sticky=tk.N + tk.E + tk.W, pady=5, padx=5)
+        self.plot_correlation_matrix_button.grid(
+            column=0, row=2, sticky=tk.N + tk.E + tk.W, pady=5, padx=5
+        )
+        self.plot_histogram_button.grid(
+            column=0, row=3, sticky=tk.N + tk.E + tk.W, pady=(5, 0), padx=5
+        )
+        self.save_fig_button.grid(column=0, row=4, sticky=tk.N + tk.E + tk.W, pady=(5, 0), padx=5)
+        self.clear_cache_button.grid(
+            column=0, row=5, sticky=tk.N + tk.E + tk.W, pady=(5, 0), padx=5
+        )
+        self.quit_button.grid(column=0, row=6, sticky=tk.N + tk.E + tk.W, pady=(5, 0), padx=5)
+        self.substrate_list.grid(column=0, row=7, sticky=tk.N + tk.E + tk.W, pady=(5, 0), padx=5)
+        self.method_selector.grid(column=0, row=8, sticky=tk.N + tk.E + tk.W, pady=(5, 0), padx=5)
+        self.partner_selector.grid(column=0, row=9, sticky=tk.N + tk.E + tk.W, pady=(5, 0), padx=5)
+        self.partner_count.grid(column=0, row=10, sticky=tk.N + tk.W, pady=(5, 0), padx=5)
+        self.compare_button.grid(column=0, row=11, sticky=tk.N + tk.E + tk.W, pady=(5, 0), padx=5)
+        self.dataset_selector.grid(column=0, row=12, sticky=tk.N + tk.E + tk.W, pady=(5, 0), padx=5)
+        self.export_heatmap_button.grid(
+            column=0, row=13, sticky=tk.N + tk.E + tk.W, pady=(5, 0), padx=5
+        )
+        self.watch_button.grid(column=0, row=14, sticky=tk.N + tk.E + tk.W, pady=(5, 0), padx=5)
+        self.details_text.grid(
+            column=1, row=0, columnspan=5, sticky=tk.N + tk.E + tk.W, pady=5, padx=5
+        )
+        self.cutoff_slider.grid(
+            column=1, row=1, columnspan=5, sticky=tk.N + tk.E + tk.W, pady=5, padx=5
+        )
+        self.group_frame.grid(
+            column=1, row=2, columnspan=5, sticky=tk.N + tk.E + tk.W, pady=5, padx=5
+        )
+        self.group_search_label.grid(column=0, row=0, sticky=tk.W)
+        self.group_search.grid(column=1, row=0, sticky=tk.E + tk.W, pady=(0, 5))
+        self.group_header.grid(column=0, row=1, columnspan=2, sticky=tk.W)
+        self.group_list.grid(column=0, row=2, columnspan=2, sticky=tk.N + tk.E + tk.W)
+        self.group_scrollbar.grid(column=2, row=2, sticky=tk.N + tk.S)
+        self.group_frame.columnconfigure(1, weight=1)
+
+        self.show_grouping_button["state"] = tk.DISABLED
+        self.plot_correlation_matrix_button["state"] = tk.DISABLED
+        self.plot_histogram_button["state"] = tk.DISABLED
+        self.save_fig_button["state"] = tk.DISABLED
+        self.export_heatmap_button["state"] = tk.DISABLED
+        self.watch_button["state"] = tk.DISABLED
+        self.cutoff_slider["state"] = tk.DISABLED
+        self.substrate_list["state"] = tk.DISABLED
+        self.partner_selector["state"] = tk.DISABLED
+        self.dataset_selector["state"] = tk.DISABLED
+
+        self.root.columnconfigure(0, weight=1)
+        self.root.rowconfigure(0, weight=0)
+        self.mainframe.columnconfigure(0, weight=3)
+        self.mainframe.rowconfigure(1, weight=0)
+        self.mainframe.rowconfigure(2, weight=0)
+        self.mainframe.rowconfigure(3, weight=0)
+        self.mainframe.rowconfigure(4, weight=0)
+
+        if self.profiler.enabled:
+            self.status_bar = ttk.Label(root, anchor=tk.W)
+            self.status_bar.grid(column=0, row=99, columnspan=2, sticky=tk.E + tk.W, padx=5)
+            self.profiler.add_listener(self.show_stage_record)
+
+    def show_stage_record(self, record: StageRecord) -> None:
+        """Collect a profiled stage and show the last finished action in the status bar.
+
+        Inner stages finish before the action enclosing them, so they are
+        collected until a top-level record arrives.
+        """
+        self.stage_records.append(record)
+        if record.depth > 0 or self.status_bar is None:
+            return
+        self.status_bar["text"] = format_records([record, *self.stage_records[:-1]])
+        self.stage_records = []
+
+    def cache_key(self) -> str:
+        """Return the cache key of the current file and analysis settings.
+
+        Settings at their defaults are left out, so entries stored before the
+        setting existed stay valid.
+        """
+        settings: dict[str, Any] = {"lower_triangle_only": self.plot_only_lt}
+        if self.compact_storage:
+            settings["compact"] = True
+        if self.correlation_method != "pearson":
+            settings["method"] = self.correlation_method
+        return self.cache.key(self.datapath, **settings)
+
+    @profiled("load_cache")
+    def load_cached_results(self, key: str) -> bool:
+        """Restore the parsed data and correlation matrix from the cache.
+
+        Returns:
+            Whether the cache held an entry for ``key``.
+        """
+        entry = self.cache.load(key)
+        if entry is None:
+            return False
+        self.df = pd.DataFrame(
+            entry.arrays["data"],
+            index=entry.metadata["substrates"],
+            columns=entry.metadata["enzymes"],
+            copy=False,
+        )
+        self.enzyme_list = [self.df[enzyme] for enzyme in self.df.columns]
+        self.enzyme_matrix_columns = tuple(entry.metadata["enzymes"])
+        overlap = entry.arrays.get("overlap")
+        if "condensed" in entry.arrays:
+            self.set_correlations(
+                CondensedMatrix(entry.arrays["condensed"], entry.arrays["diagonal"]), overlap
+            )
+        else:
+            self.set_correlations(entry.arrays["correlations"], overlap)
+        return True
+
+    def store_cached_results(self, key: str) -> None:
+        """Store the parsed data and correlation matrix in the cache."""
+        arrays = {"data": self.df.to_numpy(dtype=np.float64)}
+        if isinstance(self.raw_correlation_matrix, CondensedMatrix):
+            arrays["condensed"] = self.raw_correlation_matrix.values
+            arrays["diagonal"] = self.raw_correlation_matrix.diagonal
+        else:
+            arrays["correlations"] = self.raw_correlation_matrix
+        if self.overlap is not None:
+            arrays["overlap"] = self.overlap
+        self.cache.store(
+            key,
+            arrays,
+            {
+                "substrates": [str(substrate) for substrate in self.df.index],
+                "enzymes": list(self.enzyme_matrix_columns),
+            },
+        )
+
+    @profiled("import_data")
+    def import_data(self) -> None:
+        """Import enzyme data from a CSV file."""
+        self.df = read_activity_csv(self.datapath)
+
+        self.enzyme_list = []
+        for enzyme in self.df.columns:
+            self.enzyme_list.append(self.df[enzyme])
+
+    @profiled("compute_correlation_matrix")
+    def compute_correlation_matrix(self) -> None:
+        """Calculate the correlation matrix for all enzyme pairs with the selected method."""
+        self.enzyme_matrix_columns = tuple(str(enzyme.name) for enzyme in self.enzyme_list)
+        data = self.df.to_numpy(dtype=np.float64)
+        overlap = overlap_counts(data) if np.isnan(data).any() else None
+        tiled_data = pearson_equivalent(data, self.correlation_method)
+        if self.compact_storage and tiled_data is not None:
+            self.set_correlations(pearson_condensed(tiled_data), overlap)
+            return
+        matrix = self.correlate_data(data)
+        self.set_correlations(
+            CondensedMatrix.from_dense(matrix) if self.compact_storage else matrix, overlap
+        )
+
+    def correlate_data(
+        self, data: np.ndarray[Any, np.dtype[np.float64]]
+    ) -> np.ndarray[Any, np.dtype[np.float64]]:
+        """Compute the full correlation matrix of ``data`` with the selected method.
+
+        Rank correlations of large panels run on spawned worker processes;
+        small ones stay in this process, see
+        :data:`~enzyme_correlator.correlation.PARALLEL_MIN_WORK`.
+        """
+        return correlate(
+            data,
+            method=self.correlation_method,
+            lower_triangle_only=self.plot_only_lt and not self.compact_storage,
+            jobs=os.cpu_count() or 1,
+        )
+
+    def set_correlations(
+        self,
+        correlations: Correlations,
+        overlap: np.ndarray[Any, np.dtype[np.int32]] | None = None,
+    ) -> None:
+        """Install a new unrounded correlation matrix and its rounded display copy.
+
+        A condensed matrix is kept as the only copy and rounded when displayed.
+        ``overlap`` holds the substrates shared by each pair when activities
+        are missing, and greys out low-support cells in the heatmap.
+        """
+        self.raw_correlation_matrix = correlations
+        self.overlap = overlap
+        if isinstance(correlations, CondensedMatrix):
+            self.enzyme_correlation_matrix = correlations
+        else:
+            self.enzyme_correlation_matrix = np.round(correlations, DISPLAY_DECIMALS)
+        self.cutoff_index = None
+
+    @profiled("select_substrates")
+    def select_substrates(self, substrates: Iterable[str]) -> None:
+        """Recompute the matrix, histogram and grouping over the given substrates.
+
+        For Pearson, the first call collects the sufficient statistics of all
+        substrates and every later call only adds or removes the contribution
+        of the substrates whose selection changed. Rank correlations have no
+        such statistics and are recomputed from the selected substrates.
+        """
+        if self.substrate_selection is None:
+            self.substrate_selection = SubstrateSelection(self.df)
+        self.substrate_selection.select(substrates)
+        self.enzyme_matrix_columns = self.substrate_selection.enzyme_names
+        if self.correlation_method == "pearson":
+            correlations = self.substrate_selection.correlations()
+            if self.plot_only_lt and not self.compact_storage:
+                correlations = np.tril(correlations)
+        else:
+            correlations = self.correlate_data(
+                self.substrate_selection.frame().to_numpy(dtype=np.float64)
+            )
+        overlap = self.substrate_selection.overlap()
+        if self.compact_storage:
+            self.set_correlations(CondensedMatrix.from_dense(correlations), overlap)
+        else:
+            self.set_correlations(correlations, overlap)
+        self.build_cutoff_index()
+        self.compute_histogram()
+        self.sort_into_groups()
+
+    @profiled("compute_histogram")
+    def compute_histogram(self) -> None:
+        """Count the lower-triangle correlations in each histogram bin."""
+        self.hist_counts = histogram_counts(self.raw_correlation_matrix)
+        self.hist_axis = histogram_axis()
+
+    @profiled("build_cutoff_index")
+    def build_cutoff_index(self) -> CutoffIndex:
+        """Build the merge tree that answers the grouping at any cutoff."""
+        self.cutoff_index = CutoffIndex(self.raw_correlation_matrix, self.enzyme_matrix_columns)
+        return self.cutoff_index
+
+    @profiled("sort_into_groups")
+    def sort_into_groups(self) -> None:
+        """Look up the enzyme grouping for the current cutoff in the cutoff index."""
+        index = self.cutoff_index if self.cutoff_index is not None else self.build_cutoff_index()
+        self.grouping = index.grouping(float(self.cutoff.get()))
+
+    def request_grouping(self, cutoff: float) -> None:
+        """Regroup at a new cutoff on the background worker.
+
+        A request that the worker has not started yet is replaced, so only
+        the latest slider position is computed.
+        """
+        index = self.cutoff_index if self.cutoff_index is not None else self.build_cutoff_index()
+        self.grouping_worker.submit((index, cutoff))
+        if not self.poll_scheduled:
+            self.poll_scheduled = True
+            self.root.after(REDRAW_INTERVAL_MS, self.poll_grouping_worker)
+
+    def poll_grouping_worker(self) -> None:
+        """Show the latest grouping finished by the worker.
+
+        Runs on the Tk loop every ``REDRAW_INTERVAL_MS`` while the worker is
+        busy, which also limits how often the figure is redrawn.
+        """
+        idle = self.grouping_worker.idle
+        try:
+            finished = self.grouping_worker.result()
+            if finished is not None:
+                (index, cutoff), grouping = finished
+                if index is self.cutoff_index:
+                    self.grouping = grouping
+                    self.show_grouping_button_callback()
+                    highlight_grouped_bins(self.patches, cutoff)
+                    if self.view == "histogram":
+                        self.blitters["histogram"].update()
+        except Exception as error:
+            # keep polling, or the slider would stop regrouping for good
+            logger.exception("regrouping failed")
+            self.details_text.delete("1.0", tk.END)
+            self.details_text.insert(tk.END, f"Regrouping failed: {error}")
+        finally:
+            if idle:
+                self.poll_scheduled = False
+            else:
+                self.root.after(REDRAW_INTERVAL_MS, self.poll_grouping_worker)
+
+    def load_data_callback(self) -> None:
+        """Handle the Load Data button click."""
+        filepath = filedialog.askopenfilename(
+            filetypes=(("csv files", "*.csv"), ("all files", "*.*"))
+        )
+        if not filepath:
+            return
+        self.datapath = filepath
+        self.analyze_data()
+        self.enable_analysis_controls()
+
+    def enable_analysis_controls(self) -> None:
+        """Enable the buttons and slider that need an analyzed dataset."""
+        self.show_grouping_button["state"] = tk.NORMAL
+        self.plot_correlation_matrix_button["state"] = tk.NORMAL
+        self.plot_histogram_button["state"] = tk.NORMAL
+        self.export_heatmap_button["state"] = tk.NORMAL
+        self.watch_button["state"] = tk.NORMAL
+        self.cutoff_slider["state"] = tk.NORMAL
+
+    @profiled("analyze_data")
+    def analyze_data(self) -> None:
+        """Analyze the loaded file over all substrates, reusing cached results."""
+        key = self.cache_key()
+        if not self.load_cached_results(key):
+            self.import_data()
+            self.compute_correlation_matrix()
+            self.store_cached_results(key)
+        self.show_analysis()
+
+    def show_analysis(self) -> None:
+        """Group the installed matrix and reset the views and selectors to it."""
+        self.build_cutoff_index()
+        self.compute_histogram()
+        self.sort_into_groups()
+        self.substrate_selection = None
+        self.current_plot = None
+        self.discard_figures()
+
+        self.substrate_list["state"] = tk.NORMAL
+        self.substrate_list.delete(0, tk.END)
+        for substrate in self.df.index:
+            self.substrate_list.insert(tk.END, str(substrate))
+        self.substrate_list.selection_set(0, tk.END)
+        self.partner_selector["state"] = tk.NORMAL
+        self.partner_selector["values"] = self.enzyme_matrix_columns
+
+    @profiled("compare_datasets")
+    def compare_datasets_callback(self) -> None:
+        """Load several files at once, analyze them side by side and compare their groupings.
+
+        The matrices are computed on a process pool, one dataset per worker.
+        The first dataset is shown; the dataset selector switches between
+        them without recomputing.
+        """
+        filepaths = filedialog.askopenfilenames(
+            filetypes=(("csv files", "*.csv"), ("all files", "*.*"))
+        )
+        if not filepaths:
+            return
+        self.comparison = compare_files(
+            filepaths,
+            cutoff=float(self.cutoff.get()),
+            method=self.correlation_method,
+            lower_triangle_only=self.plot_only_lt and not self.compact_storage,
+            jobs=os.cpu_count() or 1,
+        )
+        self.comparison_paths = dict(zip(self.comparison.labels, filepaths))
+        self.dataset_selector["state"] = "readonly"
+        self.dataset_selector["values"] = self.comparison.labels
+        self.dataset_selector.set(self.comparison.labels[0])
+        self.show_dataset(self.comparison.labels[0])
+        self.details_text.delete("1.0", tk.END)
+        self.details_text.insert(tk.END, format_comparison(self.comparison))
+
+    def show_dataset(self, label: str) -> None:
+        """Install one analysis of the current comparison as the loaded dataset."""
+        if self.comparison is None:
+            return
+        result = self.comparison[label]
+        self.datapath = self.comparison_paths[label]
+        self.df = result.df
+        self.enzyme_list = [self.df[enzyme] for enzyme in self.df.columns]
+        self.enzyme_matrix_columns = result.enzyme_names
+        correlations = np.asarray(result.correlations, dtype=np.float64)
+        self.set_correlations(
+            CondensedMatrix.from_dense(correlations) if self.compact_storage else correlations,
+            result.overlap,
+        )
+        self.show_analysis()
+        self.enable_analysis_controls()
+
+    def dataset_selector_callback(self, _event: object = None) -> None:
+        """Switch to the dataset picked in the dataset selector."""
+        plot = self.current_plot
+        self.show_dataset(self.dataset_selector.get())
+        self.show_grouping_button_callback()
+        if plot is not None:
+            plot()
+
+    def method_selector_callback(self, _event: object = None) -> None:
+        """Reanalyze the loaded file with the correlation method picked in the selector."""
+        self.correlation_method = self.method_selector.get()
+        if not self.datapath:
+            return
+        plot = self.current_plot
+        self.analyze_data()
+        self.show_grouping_button_callback()
+        if plot is not None:
+            plot()
+
+    def substrate_selection_callback(self, _event: object = None) -> None:
+        """Update the analysis after substrates were toggled in the substrate list."""
+        self.select_substrates(
+            [
+                self.substrate_list.get(i)
+                for i in self.substrate_list.curselection()  # type: ignore[no-untyped-call]
+            ]
+        )
+        self.show_grouping_button_callback()
+        if self.current_plot is not None:
+            self.current_plot()
+
+    @profiled("partner_lookup")
+    def partner_lookup_callback(self, _event: object = None) -> None:
+        """Show the enzymes most correlated with the one entered in the partner selector.
+
+        The partners are selected from one row of the current matrix, so the
+        lookup follows the substrate selection and correlation method.
+        """
+        enzyme = self.partner_selector.get().strip()
+        try:
+            k = max(1, int(self.partner_count.get()))
+        except ValueError:
+            k = DEFAULT_PARTNERS
+        self.details_text.delete("1.0", tk.END)
+        if enzyme not in self.enzyme_matrix_columns:
+            self.details_text.insert(tk.END, f"Unknown enzyme {enzyme!r}")
+            return
+        partners = top_partners(
+            self.df,
+            enzyme,
+            k,
+            correlations=self.raw_correlation_matrix,
+            lower_triangle_only=self.plot_only_lt
+            and not isinstance(self.raw_correlation_matrix, CondensedMatrix),
+        )
+        lines = [f"Partners of {enzyme}", f"{'Rank':<8} {'Enzyme':<15} Correlation"]
+        for rank, (partner, correlation) in enumerate(partners, start=1):
+            lines.append(f"{rank:<8} {partner:<15} {correlation:.{DISPLAY_DECIMALS}f}")
+        self.details_text.insert(tk.END, "\n".join(lines))
+
+    def show_grouping_button_callback(self) -> None:
+        """Display the enzyme grouping in the group list.
+
+        Only the rows in view are written, and only if their group changed.
+        """
+        self.group_view.show(self.grouping)
+
+    def group_search_callback(self, _event: object = None) -> None:
+        """Narrow the group list to groups with an enzyme matching the search text."""
+        self.group_view.search(self.group_search.get())
+
+    @profiled("plot_correlation")
+    def plot_correlation_data_callback(self) -> None:
+        """Plot the correlation matrix as a heatmap.
+
+        The heatmap figure is built once per dataset; later calls only swap
+        in the current matrix and blit the image and cell labels.
+        """
+        self.current_plot = self.plot_correlation_data_callback
+        if self.heatmap is None:
+            fig = Figure(figsize=CORRELATION_FIGSIZE)
+            self.heatmap = draw_correlation_matrix(
+                fig,
+                self.enzyme_correlation_matrix,
+                self.enzyme_matrix_columns,
+                lower_triangle_only=self.plot_only_lt,
+                animated=True,
+                support=self.overlap,
+            )
+            self.figures["correlation"] = fig
+            self.blitters["correlation"] = BlitManager(fig, self.heatmap.artists)
+        else:
+            self.heatmap.set_matrix(self.enzyme_correlation_matrix, self.overlap)
+        if not self.show_view("correlation"):
+            self.blitters["correlation"].update()
+
+    @profiled("plot_histogram")
+    def plot_histogram_button_callback(self) -> None:
+        """Plot the histogram of correlation values.
+
+        The histogram figure is built once per dataset; later calls only set
+        the bar heights to the current counts.
+        """
+        self.current_plot = self.plot_histogram_button_callback
+        cutoff = float(self.cutoff.get())
+        if "histogram" not in self.figures:
+            fig = Figure(figsize=HISTOGRAM_FIGSIZE)
+            self.patches = draw_histogram(
+                fig, self.hist_counts, self.hist_axis, cutoff, animated=True
+            )
+            self.figures["histogram"] = fig
+            self.blitters["histogram"] = BlitManager(fig, lambda: self.patches)
+        else:
+            update_histogram(self.patches, self.hist_counts)
+            highlight_grouped_bins(self.patches, cutoff)
+        if not self.show_view("histogram") and self.canvas is not None:
+            # the count axis may have been rescaled, which blitting cannot show
+            self.canvas.draw_idle()  # type: ignore[no-untyped-call]
+
+    def show_view(self, view: str) -> bool:
+        """Show the cached figure of a view on the persistent canvas.
+
+        The canvas and its navigation toolbar are created on first use and
+        then reused; switching views only swaps the figure they display.
+
+        Args:
+            view: Key of the figure in ``self.figures``.
+
+        Returns:
+            Whether the view was switched and fully drawn, as opposed to
+            already being on display.
+        """
+        self.fig = self.figures[view]
+        if self.canvas is not None and self.view == view:
+            return False
+        if self.canvas is None:
+            self.canvas = FigureCanvasTkAgg(self.fig, master=self.root)  # type: ignore[no-untyped-call]
+            self.canvas.get_tk_widget().grid(  # type: ignore[no-untyped-call]
+                columnspan=2, sticky=tk.N + tk.E + tk.W, pady=5, padx=5
+            )
+            self.toolbar = NavigationToolbar2Tk(  # type: ignore[no-untyped-call]
+                self.canvas, self.root, pack_toolbar=False
+            )
+            self.toolbar.grid(columnspan=2, sticky=tk.W, padx=5)
+        else:
+            self.canvas.figure = self.fig
+            self.fig.set_canvas(self.canvas)
+            width, height = self.fig.get_size_inches() * self.fig.dpi
+            self.canvas.get_tk_widget().configure(  # type: ignore[no-untyped-call]
+                width=int(width), height=int(height)
+            )
+            if self.toolbar is not None:
+                self.toolbar.update()  # type: ignore[no-untyped-call]
+        self.view = view
+        self.canvas.draw()  # type: ignore[no-untyped-call]
+
+        self.save_fig_button["state"] = tk.NORMAL
+        return True
+
+    def discard_figures(self) -> None:
+        """Forget the cached figures, e.g. because a new dataset was loaded."""
+        self.figures.clear()
+        self.blitters.clear()
+        self.heatmap = None
+        self.patches = []
+        self.view = ""
+
+    def save_fig_button_callback(self) -> None:
+        """Save the current figure to a file."""
+        savename = filedialog.asksaveasfilename()
+        if not savename:
+            return
+        if self.view in self.blitters:
+            with self.blitters[self.view].static():
+                self.fig.savefig(savename)
+        else:
+            self.fig.savefig(savename)
+
+    @profiled("export_heatmap")
+    def export_heatmap_button_callback(self) -> None:
+        """Render the correlation matrix straight to a raster image, without the figure.
+
+        Unlike Save Figure this writes no cell labels and never holds the
+        image in memory, so it suits panels too large for the heatmap. A name
+        ending in ``.png`` receives one image with a pixel per cell; any
+        other name becomes a directory holding a tile pyramid.
+        """
+        savename = filedialog.asksaveasfilename(
+            filetypes=(("png image", "*.png"), ("tile pyramid directory", "*"))
+        )
+        if not savename:
+            return
+        if savename.lower().endswith(".png"):
+            write_heatmap_png(
+                self.enzyme_correlation_matrix,
+                savename,
+                lower_triangle_only=self.plot_only_lt,
+                support=self.overlap,
+            )
+        else:
+            write_heatmap_tiles(
+                self.enzyme_correlation_matrix,
+                savename,
+                pyramid=True,
+                lower_triangle_only=self.plot_only_lt,
+                support=self.overlap,
+            )
+
+    def toggle_watch_callback(self) -> None:
+        """Start or stop watching the loaded file for re-measured enzymes."""
+        self.watching = not self.watching
+        self.watch_button["text"] = "Stop Watching" if self.watching else "Watch File"
+        if not self.watching:
+            self.incremental = None
+            return
+        self.watched_stat = self.file_signature()
+        self.incremental = None
+        self.root.after(WATCH_INTERVAL_MS, self.poll_watched_file)
+
+    def file_signature(self) -> tuple[int, int] | None:
+        """Return the modification time and size of the loaded file, None if it is missing."""
+        try:
+            stat = os.stat(self.datapath)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def poll_watched_file(self) -> None:
+        """Reload the watched file if it changed; runs every ``WATCH_INTERVAL_MS``."""
+        if not self.watching:
+            return
+        signature = self.file_signature()
+        if signature is not None and signature != self.watched_stat:
+            self.watched_stat = signature
+            self.reload_changed_rows()
+        self.root.after(WATCH_INTERVAL_MS, self.poll_watched_file)
+
+    def track_changes(self) -> IncrementalAnalysis:
+        """Index the installed analysis for row-level updates, reusing its histogram."""
+        incremental = IncrementalAnalysis(
+            self.df,
+            self.raw_correlation_matrix,
+            method=self.correlation_method,
+            cutoff=float(self.cutoff.get()),
+            lower_triangle_only=self.plot_only_lt
+            and not isinstance(self.raw_correlation_matrix, CondensedMatrix),
+            overlap=self.overlap,
+            counts=self.hist_counts,
+        )
+        if incremental.correlations is not self.raw_correlation_matrix:
+            # a read-only matrix mapped from the cache was copied
+            self.set_correlations(incremental.correlations, incremental.overlap)
+        return incremental
+
+    @profiled("reload_changed_rows")
+    def reload_changed_rows(self) -> None:
+        """Update the analysis from the rewritten file, recomputing only changed enzymes.
+
+        Only the rows and columns of enzymes whose activities changed are
+        recomputed, and the histogram and grouping are updated from the
+        changed pairs. A file that cannot be read, e.g. because it is still
+        being written, is skipped until it changes again. Added, removed or
+        renamed enzymes or substrates, and a partial substrate selection,
+        fall back to analyzing the whole file.
+        """
+        try:
+            df = read_activity_csv(self.datapath)
+        except (OSError, ValueError):
+            return
+        plot = self.current_plot
+        if self.substrate_selection is not None:
+            self.incremental = None
+            self.analyze_data()
+        else:
+            if self.incremental is None or (
+                self.incremental.correlations is not self.raw_correlation_matrix
+            ):
+                # another file, method or selection was analyzed since
+                self.incremental = self.track_changes()
+            try:
+                changed = self.incremental.update(df, cutoff=float(self.cutoff.get()))
+            except ValueError:
+                self.incremental = None
+                self.analyze_data()
+            else:
+                self.install_changed_rows(changed)
+        self.show_grouping_button_callback()
+        if plot is not None:
+            plot()
+
+    def install_changed_rows(self, changed: np.ndarray[Any, np.dtype[np.intp]]) -> None:
+        """Take over the updated data, histogram and grouping from the incremental analysis."""
+        if self.incremental is None:
+            return
+        self.df = self.incremental.df
+        self.enzyme_list = [self.df[enzyme] for enzyme in self.df.columns]
+        self.overlap = self.incremental.overlap
+        self.hist_counts = self.incremental.histogram_counts
+        self.grouping = self.incremental.grouping
+        raw = self.raw_correlation_matrix
+        display = self.enzyme_correlation_matrix
+        if isinstance(raw, np.ndarray) and isinstance(display, np.ndarray):
+            display[changed, :] = np.round(raw[changed, :], DISPLAY_DECIMALS)
+            display[:, changed] = np.round(raw[:, changed], DISPLAY_DECIMALS)
+        # the merge tree is rebuilt when the cutoff slider next moves
+        self.cutoff_index = None
+
+    def clear_cache_button_callback(self) -> None:
+        """Remove all cached parsing and correlation results."""
+        self.cache.clear()
+
+    def quit_button_callback(self) -> None:
+        """Quit the application."""
+        self.grouping_worker.close()
+        self.root.destroy()
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Entry point for the enzyme correlator application."""
+    parser = argparse.ArgumentParser(prog="enzyme-correlator")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="show stage timings and memory in a status bar and log them to stderr",
+    )
+    args = parser.parse_args(argv)
+    profiler = StageProfiler.from_environment(enabled=args.profile)
+    if profiler.enabled:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(name)s: %(message)s"))
+        profile_logger = logging.getLogger("enzyme_correlator.profiling")
+        profile_logger.addHandler(handler)
+        profile_logger.setLevel(logging.DEBUG)
+
+    root = tk.Tk()
+    EnzymeCorrelatorGUI(root, profiler=profiler)
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Row-level incremental updates of an analysis whose export is re-measured.
+
+Plate readers rewrite their export as they re-measure single enzymes. Instead
+of recomputing the whole n x n matrix, :class:`IncrementalAnalysis` hashes the
+activities of every enzyme, and when the file is read again it only
+
+- recomputes the rows and columns of the enzymes whose hash changed,
+- moves the changed pairs between histogram bins, subtracting the counts of
+  their old values and adding those of the new ones, and
+- replaces the changed pairs in the set of pairs reaching the cutoff and
+  relabels the groups from that set.
+
+Every step costs O(k n) for k changed enzymes; the full matrix is only
+scanned again when the cutoff moved since the last update.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from enzyme_correlator.analysis import DEFAULT_CUTOFF, bin_correlations, histogram_counts
+from enzyme_correlator.correlation import (
+    METHODS,
+    CondensedMatrix,
+    Correlations,
+    correlation_rows,
+    overlap_counts,
+)
+from enzyme_correlator.grouping import label_components, linked_pairs
+
+__all__ = ["IncrementalAnalysis", "changed_rows", "row_hashes"]
+
+_Positions = np.ndarray[Any, np.dtype[np.intp]]
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray[Any, np.dtype[np.uint64]]:
+    """Hash the name and activities of every enzyme, one value per column of ``df``."""
+    hashes: np.ndarray[Any, np.dtype[np.uint64]] = pd.util.hash_pandas_object(
+        df.T, index=True
+    ).to_numpy()
+    return hashes
+
+
+def changed_rows(
+    old: np.ndarray[Any, np.dtype[np.uint64]], new: np.ndarray[Any, np.dtype[np.uint64]]
+) -> _Positions:
+    """Return the positions of the enzymes whose hash differs."""
+    return np.flatnonzero(old != new)
+
+
+def _writable(correlations: Correlations) -> Correlations:
+    """Return ``correlations``, or a copy if it is read-only, e.g. mapped from the cache."""
+    if isinstance(correlations, CondensedMatrix):
+        if correlations.values.flags.writeable and correlations.diagonal.flags.writeable:
+            return correlations
+        return CondensedMatrix(correlations.values.copy(), correlations.diagonal.copy())
+    return correlations if correlations.flags.writeable else np.array(correlations)
+
+
+def _lower_pairs(changed: _Positions, n: int) -> tuple[_Positions, _Positions, _Positions]:
+    """List every lower-triangle pair touching a changed enzyme once.
+
+    Returns:
+        Row and column of each pair, with row > column, and its position in
+        the ``len(changed)`` x ``n`` block of the changed rows.
+    """
+    is_changed = np.zeros(n, dtype=bool)
+    is_changed[changed] = True
+    others = np.arange(n)
+    # a pair of two changed enzymes is listed from the later one
+    keep = (~is_changed[None, :] | (others[None, :] < changed[:, None])) & (
+        others[None, :] != changed[:, None]
+    )
+    block_rows, partners = np.nonzero(keep)
+    enzymes = changed[block_rows]
+    positions = block_rows * n + partners
+    return np.maximum(enzymes, partners), np.minimum(enzymes, partners), positions
+
+
+class IncrementalAnalysis:
+    """Correlations, histogram and grouping kept current as single enzymes change.
+
+    The matrix is updated in place, so a matrix shared with a display stays
+    current as well. Read-only matrices, such as those memory-mapped from the
+    cache, are copied once; ``correlations`` is then not the matrix passed in.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        correlations: Correlations,
+        method: str = "pearson",
+        cutoff: float = DEFAULT_CUTOFF,
+        lower_triangle_only: bool = False,
+        overlap: np.ndarray[Any, np.dtype[np.int32]] | None = None,
+        counts: np.ndarray[Any, np.dtype[np.int64]] | None = None,
+    ) -> None:
+        """Index an existing analysis; this scans the matrix once.
+
+        Args:
+            df: Substrates x enzymes activity frame the matrix was computed from.
+            correlations: Unrounded dense, memory-mapped or condensed matrix,
+                updated in place.
+            method: Correlation method of the matrix, one of
+                :data:`~enzyme_correlator.correlation.METHODS`.
+            cutoff: Grouping cutoff.
+            lower_triangle_only: The strict upper triangle of a dense matrix
+                is kept at zero.
+            overlap: Substrates shared by each pair, if activities are missing.
+            counts: Histogram counts of the matrix, computed if not given.
+
+        Raises:
+            ValueError: If ``method`` is unknown.
+        """
+        if method not in METHODS:
+            raise ValueError(f"unknown correlation method {method!r}, expected one of {METHODS}")
+        self.df = df
+        self.correlations = _writable(correlations)
+        self.method = method
+        self.lower_triangle_only = lower_triangle_only
+        self.overlap = None if overlap is None else np.array(overlap)
+        self.enzyme_names: tuple[str, ...] = tuple(str(enzyme) for enzyme in df.columns)
+        self.hashes = row_hashes(df)
+        self.histogram_counts: np.ndarray[Any, np.dtype[np.int64]] = (
+            histogram_counts(correlations) if counts is None else np.array(counts)
+        )
+        self.cutoff = cutoff
+        self.linked = linked_pairs(correlations, cutoff)
+        self.grouping = label_components(*self.linked, self.enzyme_names)
+
+    def _read_pairs(
+        self, rows: _Positions, columns: _Positions
+    ) -> np.ndarray[Any, np.dtype[np.float64]]:
+        if isinstance(self.correlations, CondensedMatrix):
+            stored = self.correlations.values[rows * (rows - 1) // 2 + columns]
+        else:
+            stored = self.correlations[rows, columns]
+        values: np.ndarray[Any, np.dtype[np.float64]] = np.asarray(stored, dtype=np.float64)
+        return values
+
+    def _write_rows(
+        self, changed: _Positions, block: np.ndarray[Any, np.dtype[np.float64]]
+    ) -> None:
+        n = len(self.enzyme_names)
+        if isinstance(self.correlations, CondensedMatrix):
+            rows, columns, positions = _lower_pairs(changed, n)
+            self.correlations.values[rows * (rows - 1) // 2 + columns] = block.ravel()[positions]
+            self.correlations.diagonal[changed] = block[np.arange(len(changed)), changed]
+            return
+        matrix = self.correlations
+        matrix[changed, :] = block
+        matrix[:, changed] = block.T
+        if self.lower_triangle_only:
+            for enzyme in changed.tolist():
+                matrix[enzyme, enzyme + 1 :] = 0.0
+                matrix[:enzyme, enzyme] = 0.0
+
+    def _update_overlap(
+        self, data: np.ndarray[Any, np.dtype[np.float64]], changed: _Positions
+    ) -> None:
+        present = ~np.isnan(data)
+        if present.all():
+            self.overlap = None
+        elif self.overlap is None:
+            self.overlap = overlap_counts(data)
+        else:
+            counts = present[:, changed].T.astype(np.int32) @ present.astype(np.int32)
+            self.overlap[changed, :] = counts
+            self.overlap[:, changed] = counts.T
+
+    def update(self, df: pd.DataFrame, cutoff: float | None = None) -> _Positions:
+        """Bring the analysis up to date with a new version of the activities.
+
+        Args:
+            df: The re-read activity frame, with the same enzymes and substrates.
+            cutoff: New grouping cutoff; a changed cutoff rescans the matrix once.
+
+        Returns:
+            The positions of the enzymes whose activities changed.
+
+        Raises:
+            ValueError: If enzymes or substrates were added, removed or
+                reordered; the matrix then has to be computed anew.
+        """
+        names = tuple(str(enzyme) for enzyme in df.columns)
+        if names != self.enzyme_names or not df.index.equals(self.df.index):
+            raise ValueError("the enzymes or substrates changed, so the matrix must be recomputed")
+        hashes = row_hashes(df)
+        changed = changed_rows(self.hashes, hashes)
+        self.df = df
+        self.hashes = hashes
+        if len(changed):
+            data = df.to_numpy(dtype=np.float64)
+            block = correlation_rows(data, changed, self.method)
+            rows, columns, positions = _lower_pairs(changed, len(names))
+            new_values = block.ravel()[positions]
+            self.histogram_counts -= bin_correlations(self._read_pairs(rows, columns))
+            self.histogram_counts += bin_correlations(new_values)
+            self._write_rows(changed, block)
+            self._update_overlap(data, changed)
+        if cutoff is not None and cutoff != self.cutoff:
+            self.cutoff = cutoff
+            self.linked = linked_pairs(self.correlations, cutoff)
+        elif len(changed):
+            self._relink(changed, rows, columns, new_values)
+        else:
+            return changed
+        self.grouping = label_components(*self.linked, self.enzyme_names)
+        return changed
+
+    def _relink(
+        self,
+        changed: _Positions,
+        rows: _Positions,
+        columns: _Positions,
+        values: np.ndarray[Any, np.dtype[np.float64]],
+    ) -> None:
+        """Replace the linked pairs of the changed enzymes by those of their new values."""
+        is_changed = np.zeros(len(self.enzyme_names), dtype=bool)
+        is_changed[changed] = True
+        linked_rows, linked_columns = self.linked
+        kept = ~(is_changed[linked_rows] | is_changed[linked_columns])
+        reaching = values >= self.cutoff
+        self.linked = (
+            np.concatenate((linked_rows[kept], rows[reaching])),
+            np.concatenate((linked_columns[kept], columns[reaching])),
+        )
@@ -0,0 +1,152 @@
+"""
+Bulk reader for enzyme activity exports.
+
+The documented format is semicolon-delimited with substrate names in the first
+row, enzyme names in the first column and comma decimal separators. Cells are
+parsed by pandas' C tokenizer straight into float64, and every cell that is not
+a decimal-comma number is reported with its enzyme and substrate. Blank and
+NA cells, and cells missing from the end of a short row, become NaN.
+"""
+
+from __future__ import annotations
+
+import csv
+import os
+import warnings
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+__all__ = ["MISSING_VALUES", "CsvFormatError", "read_activity_csv"]
+
+MISSING_VALUES = ("", "NA", "N/A", "n/a", "NaN", "nan", "#N/A")
+"""Cell contents read as a missing measurement."""
+
+_NUMBER = r"\s*[+-]?(?:\d+(?:,\d*)?|,\d+)(?:[eE][+-]?\d+)?\s*"
+_ENZYME_COLUMN = "enzyme"
+
+
+class CsvFormatError(ValueError):
+    """Raised when an activity export does not follow the documented format."""
+
+
+def _read_header(path: str | os.PathLike[str]) -> list[str]:
+    with open(path, newline="") as csv_file:
+        for row in csv.reader(csv_file, delimiter=";"):
+            return row[1:]
+    raise CsvFormatError(f"{os.fspath(path)}: file is empty")
+
+
+def _count_data_rows(path: str | os.PathLike[str]) -> int:
+    with open(path, "rb") as csv_file:
+        return sum(1 for line in csv_file if line.strip()) - 1
+
+
+def _chunks(
+    path: str | os.PathLike[str], substrates: Sequence[str], chunksize: int | None
+) -> Iterable[pd.DataFrame]:
+    options: dict[str, Any] = {
+        "sep": ";",
+        "decimal": ",",
+        "header": 0,
+        "names": [_ENZYME_COLUMN, *range(len(substrates))],
+        "dtype": {_ENZYME_COLUMN: str},
+        "na_values": list(MISSING_VALUES),
+        "keep_default_na": False,
+        "index_col": False,
+    }
+    if chunksize is None:
+        with _strict_parsing(path):
+            yield pd.read_csv(path, **options)
+        return
+
+    with _strict_parsing(path):
+        reader = pd.read_csv(path, chunksize=chunksize, **options)
+    with reader:
+        while True:
+            with _strict_parsing(path):
+                chunk = next(reader, None)
+            if chunk is None:
+                return
+            yield chunk
+
+
+@contextmanager
+def _strict_parsing(path: str | os.PathLike[str]) -> Iterator[None]:
+    """Turn pandas tokenizer complaints into :class:`CsvFormatError`."""
+    with warnings.catch_warnings():
+        # pandas only warns, and drops cells, when the first data row is longer than the header
+        warnings.simplefilter("error", pd.errors.ParserWarning)
+        try:
+            yield
+        except pd.errors.ParserWarning as error:
+            raise CsvFormatError(
+                f"{os.fspath(path)}: line 2 has more cells than the header"
+            ) from error
+        except pd.errors.ParserError as error:
+            raise CsvFormatError(f"{os.fspath(path)}: {error}") from error
+
+
+def _to_float_block(
+    path: str | os.PathLike[str], chunk: pd.DataFrame, substrates: Sequence[str]
+) -> np.ndarray[Any, np.dtype[np.float64]]:
+    """Convert the data cells of a chunk, naming the first malformed cell."""
+    data = chunk.drop(columns=_ENZYME_COLUMN)
+    for position, dtype in enumerate(data.dtypes):
+        if pd.api.types.is_float_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+            continue
+        cells = data.iloc[:, position]
+        text = cells.astype(str).str.strip()
+        blank = cells.isna() | text.isin(MISSING_VALUES)
+        malformed = ~text.str.fullmatch(_NUMBER) & ~blank
+        if malformed.any():
+            row = int(np.argmax(malformed.to_numpy()))
+            raise CsvFormatError(
+                f"{os.fspath(path)}: enzyme {chunk[_ENZYME_COLUMN].iloc[row]!r}, "
+                f"substrate {substrates[position]!r}: "
+                f"cannot parse {cells.iloc[row]!r} as a decimal-comma number"
+            )
+        # only padded numbers and whitespace-only blanks get here
+        data.isetitem(position, pd.to_numeric(text.mask(blank).str.replace(",", ".", regex=False)))
+    block: np.ndarray[Any, np.dtype[np.float64]] = data.to_numpy(dtype=np.float64)
+    return block
+
+
+def read_activity_csv(path: str | os.PathLike[str], chunksize: int | None = None) -> pd.DataFrame:
+    """Read an enzyme activity export.
+
+    Args:
+        path: Path to the CSV file.
+        chunksize: Parse this many enzyme rows at a time into a preallocated
+            block, so that only one full copy of the data is ever held. By
+            default the file is parsed in one pass.
+
+    Returns:
+        A substrates x enzymes float64 DataFrame.
+
+    Raises:
+        CsvFormatError: If a row has too many cells or a cell is neither a
+            decimal-comma number nor one of :data:`MISSING_VALUES`.
+    """
+    substrates = _read_header(path)
+    enzymes: list[str] = []
+
+    if chunksize is None:
+        (chunk,) = _chunks(path, substrates, None)
+        enzymes = chunk[_ENZYME_COLUMN].tolist()
+        block = _to_float_block(path, chunk, substrates)
+    else:
+        block = np.empty((_count_data_rows(path), len(substrates)))
+        start = 0
+        for chunk in _chunks(path, substrates, chunksize):
+            stop = start + len(chunk)
+            block[start:stop] = _to_float_block(path, chunk, substrates)
+            enzymes.extend(chunk[_ENZYME_COLUMN].tolist())
+            start = stop
+        block = block[:start]
+
+    df: pd.DataFrame = pd.DataFrame(block.T, index=substrates, columns=enzymes, copy=False)
+    return df
@@ -0,0 +1,208 @@
+"""
+Most correlated partners of each enzyme.
+
+Instead of scanning a row of the heatmap by eye, :func:`top_partners` returns
+the ``k`` enzymes most correlated with one enzyme, and :func:`nearest_partners`
+does so for every enzyme at once. Both select with :func:`numpy.argpartition`
+in O(n) per row and only sort the ``k`` winners.
+
+Rows are consumed as they are produced, so the full n x n matrix never has to
+exist: :func:`data_row_bands` computes bands of rows straight from the
+activities, and :func:`matrix_row_bands` reads them from a dense, memory-mapped
+or condensed matrix.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Any, Union
+
+import numpy as np
+import pandas as pd
+
+from enzyme_correlator.correlation import (
+    DEFAULT_TILE_SIZE,
+    CondensedMatrix,
+    Correlations,
+    correlation_rows,
+)
+
+__all__ = [
+    "DEFAULT_PARTNERS",
+    "data_row_bands",
+    "matrix_row_bands",
+    "matrix_rows",
+    "nearest_partners",
+    "top_k",
+    "top_partners",
+]
+
+DEFAULT_PARTNERS = 10
+
+RowBand = tuple[int, np.ndarray[Any, np.dtype[np.float64]]]
+"""First row position and the rows x enzymes block of correlations starting there."""
+
+_Positions = Union[Sequence[int], np.ndarray[Any, np.dtype[np.intp]]]
+
+
+def top_k(
+    rows: np.ndarray[Any, np.dtype[Any]],
+    k: int,
+    exclude: _Positions | None = None,
+) -> tuple[np.ndarray[Any, np.dtype[np.intp]], np.ndarray[Any, np.dtype[np.float64]]]:
+    """Select the ``k`` largest values of every row, largest first.
+
+    Equal values are listed by position. NaN values are never selected ahead
+    of a number; rows with fewer than ``k`` numbers are padded with NaN
+    values at positions ``-1``.
+
+    Args:
+        rows: Rows x columns block.
+        k: Number of values kept per row.
+        exclude: Per row, one column to leave out, e.g. the enzyme itself.
+
+    Returns:
+        Rows x ``min(k, columns)`` column positions and their values.
+    """
+    keys = -np.asarray(rows, dtype=np.float64)
+    keys[np.isnan(keys)] = np.inf
+    if exclude is not None:
+        keys[np.arange(len(keys)), np.asarray(exclude, dtype=np.intp)] = np.inf
+    k = min(k, keys.shape[1])
+    if k < keys.shape[1]:
+        candidates = np.argpartition(keys, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(k), keys.shape).copy()
+    order = np.lexsort((candidates, np.take_along_axis(keys, candidates, axis=1)), axis=1)
+    indices = np.take_along_axis(candidates, order, axis=1)
+    keys = np.take_along_axis(keys, indices, axis=1)
+    absent = np.isinf(keys) & (keys > 0)
+    values = np.where(absent, np.nan, -keys)
+    indices[absent] = -1
+    return indices, values
+
+
+def matrix_rows(
+    correlations: Correlations,
+    rows: _Positions,
+    lower_triangle_only: bool = False,
+) -> np.ndarray[Any, np.dtype[np.float64]]:
+    """Read full rows of a stored correlation matrix.
+
+    Args:
+        correlations: Dense, memory-mapped or condensed matrix.
+        rows: Positions of the rows to read.
+        lower_triangle_only: The strict upper triangle of a dense matrix is
+            zero, so the entries right of the diagonal are read from the
+            columns below it.
+
+    Returns:
+        The ``len(rows)`` x enzymes block.
+    """
+    positions = np.asarray(rows, dtype=np.intp)
+    n = correlations.shape[0]
+    if isinstance(correlations, CondensedMatrix):
+        return correlations.block(positions, np.arange(n))
+    block = np.array(correlations[positions], dtype=np.float64)
+    if lower_triangle_only:
+        upper = np.arange(n)[None, :] > positions[:, None]
+        block[upper] = np.asarray(correlations[:, positions], dtype=np.float64).T[upper]
+    return block
+
+
+def matrix_row_bands(
+    correlations: Correlations,
+    lower_triangle_only: bool = False,
+    band_size: int = DEFAULT_TILE_SIZE,
+) -> Iterator[RowBand]:
+    """Read a stored correlation matrix in bands of ``band_size`` full rows."""
+    n = correlations.shape[0]
+    for start in range(0, n, band_size):
+        rows = np.arange(start, min(start + band_size, n))
+        yield start, matrix_rows(correlations, rows, lower_triangle_only)
+
+
+def data_row_bands(
+    data: np.ndarray[Any, np.dtype[Any]],
+    method: str = "pearson",
+    band_size: int = DEFAULT_TILE_SIZE,
+) -> Iterator[RowBand]:
+    """Compute the correlation matrix of ``data`` in bands of ``band_size`` rows.
+
+    Args:
+        data: Substrates x enzymes activities, NaN where missing.
+        method: Correlation method, one of
+            :data:`~enzyme_correlator.correlation.METHODS`.
+        band_size: Rows computed at once.
+    """
+    n = np.shape(data)[1]
+    for start in range(0, n, band_size):
+        yield start, correlation_rows(data, np.arange(start, min(start + band_size, n)), method)
+
+
+def nearest_partners(
+    bands: Iterable[RowBand], n: int, k: int = DEFAULT_PARTNERS
+) -> tuple[np.ndarray[Any, np.dtype[np.intp]], np.ndarray[Any, np.dtype[np.float64]]]:
+    """Find the ``k`` most correlated partners of every enzyme from streamed rows.
+
+    Only one band of rows is held at a time.
+
+    Args:
+        bands: Row bands, e.g. from :func:`data_row_bands` or
+            :func:`matrix_row_bands`.
+        n: Number of enzymes.
+        k: Number of partners per enzyme.
+
+    Returns:
+        Enzymes x ``min(k, n)`` partner positions and correlations, most
+        correlated first; missing partners are ``-1`` and NaN.
+    """
+    k = min(k, n)
+    indices = np.full((n, k), -1, dtype=np.intp)
+    values = np.full((n, k), np.nan)
+    for start, band in bands:
+        stop = start + len(band)
+        indices[start:stop], values[start:stop] = top_k(band, k, exclude=np.arange(start, stop))
+    return indices, values
+
+
+def top_partners(
+    df: pd.DataFrame,
+    enzyme: str,
+    k: int = DEFAULT_PARTNERS,
+    method: str = "pearson",
+    correlations: Correlations | None = None,
+    lower_triangle_only: bool = False,
+) -> list[tuple[str, float]]:
+    """Return the ``k`` enzymes most correlated with ``enzyme``.
+
+    Without a stored matrix only the enzyme's own row is computed.
+
+    Args:
+        df: Substrates x enzymes activity frame.
+        enzyme: Name of the enzyme to look up.
+        k: Number of partners.
+        method: Correlation method used when no matrix is given.
+        correlations: Stored matrix to read the row from instead.
+        lower_triangle_only: Whether a dense ``correlations`` only holds its
+            lower triangle.
+
+    Returns:
+        Partner names and correlations, most correlated first, without
+        partners whose correlation is undefined.
+
+    Raises:
+        KeyError: If ``enzyme`` is not a column of ``df``.
+    """
+    names = [str(name) for name in df.columns]
+    if enzyme not in names:
+        raise KeyError(f"unknown enzyme {enzyme!r}")
+    position = names.index(enzyme)
+    if correlations is None:
+        row = correlation_rows(df.to_numpy(dtype=np.float64), [position], method)
+    else:
+        row = matrix_rows(correlations, [position], lower_triangle_only)
+    indices, values = top_k(row, k, exclude=[position])
+    return [
+        (names[index], float(value)) for index, value in zip(indices[0], values[0]) if index >= 0
+    ]
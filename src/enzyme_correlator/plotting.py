@@ -0,0 +1,382 @@
+"""
+Figure builders shared by the GUI and the batch command line.
+
+The functions here only draw onto a ``matplotlib.figure.Figure``; attaching a
+canvas (TkAgg in the GUI, Agg in batch mode) is left to the caller.
+"""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from enzyme_correlator.correlation import CondensedMatrix, Correlations
+
+if TYPE_CHECKING:
+    from matplotlib.artist import Artist
+    from matplotlib.axes import Axes
+    from matplotlib.figure import Figure
+    from matplotlib.image import AxesImage
+    from matplotlib.patches import Rectangle
+    from matplotlib.text import Text
+
+__all__ = [
+    "CORRELATION_FIGSIZE",
+    "HISTOGRAM_FIGSIZE",
+    "MAX_ANNOTATED_CELLS",
+    "MAX_TICK_LABELS",
+    "MIN_SUPPORT",
+    "BlitManager",
+    "CellAnnotations",
+    "Heatmap",
+    "draw_correlation_matrix",
+    "draw_histogram",
+    "grouped_bin_count",
+    "highlight_grouped_bins",
+    "image_data",
+    "update_histogram",
+]
+
+CORRELATION_FIGSIZE = (19, 9)
+HISTOGRAM_FIGSIZE = (20, 5)
+MAX_ANNOTATED_CELLS = 2500
+"""Largest number of heatmap cells in view that are labeled with their values."""
+MAX_TICK_LABELS = 50
+"""Largest number of enzyme names shown along each heatmap axis."""
+MIN_SUPPORT = 3
+"""Fewest shared substrates for a correlation to be drawn in color rather than grey."""
+
+
+def grouped_bin_count(cutoff: float, binsize: float = 0.05) -> int:
+    """Return how many of the highest histogram bins lie above the grouping cutoff."""
+    return round((1 - cutoff) / binsize)
+
+
+class CellAnnotations:
+    """Value labels of the heatmap cells inside the current view.
+
+    Labels are only drawn while at most ``max_cells`` cells are in view, and
+    only for those cells. They are rebuilt whenever the axes limits change,
+    so zooming into a large matrix reveals the values of the zoomed region.
+    """
+
+    def __init__(
+        self,
+        ax: Axes,
+        matrix: Correlations,
+        lower_triangle_only: bool = False,
+        max_cells: int = MAX_ANNOTATED_CELLS,
+        animated: bool = False,
+        decimals: int = 2,
+    ) -> None:
+        """Annotate the cells in view and follow later pans and zooms.
+
+        Args:
+            ax: Axes holding the heatmap.
+            matrix: Enzymes x enzymes correlation matrix shown in ``ax``.
+            lower_triangle_only: Write the upper-triangle labels in white.
+            max_cells: Largest number of visible cells that are labeled.
+            animated: Create the labels as animated artists for blitting.
+            decimals: Round the labels to this many decimals.
+        """
+        self.ax = ax
+        self.matrix = matrix
+        self.lower_triangle_only = lower_triangle_only
+        self.max_cells = max_cells
+        self.animated = animated
+        self.decimals = decimals
+        self.texts: list[Text] = []
+        self._view: tuple[range, range] | None = None
+        # the registry only keeps weak references to bound methods
+        ax.callbacks.connect("xlim_changed", lambda _ax: self.update())
+        ax.callbacks.connect("ylim_changed", lambda _ax: self.update())
+        self.update()
+
+    def visible_cells(self) -> tuple[range, range]:
+        """Return the row and column ranges whose cell centers are in view."""
+        n_rows, n_columns = self.matrix.shape
+        x_low, x_high = sorted(self.ax.get_xlim())
+        y_low, y_high = sorted(self.ax.get_ylim())
+        columns = range(max(math.ceil(x_low), 0), min(math.floor(x_high) + 1, n_columns))
+        rows = range(max(math.ceil(y_low), 0), min(math.floor(y_high) + 1, n_rows))
+        return rows, columns
+
+    def set_matrix(self, matrix: Correlations) -> None:
+        """Relabel the cells in view with the values of a new matrix of the same shape."""
+        self.matrix = matrix
+        self._view = None
+        self.update()
+
+    def update(self) -> None:
+        """Replace the labels with those of the cells now in view."""
+        view = self.visible_cells()
+        if view == self._view:
+            return
+        self._view = view
+        for text in self.texts:
+            text.remove()
+        self.texts = []
+        rows, columns = view
+        if len(rows) * len(columns) > self.max_cells:
+            return
+        block = np.asarray(
+            self.matrix[rows.start : rows.stop, columns.start : columns.stop], dtype=np.float64
+        )
+        values: list[list[float]] = block.round(self.decimals).tolist()
+        for i, row_values in zip(rows, values):
+            for j, value in zip(columns, row_values):
+                color = "white" if self.lower_triangle_only and i < j else "black"
+                self.texts.append(
+                    self.ax.text(
+                        j,
+                        i,
+                        str(value),
+                        ha="center",
+                        va="center",
+                        color=color,
+                        size=9,
+                        clip_on=True,
+                        animated=self.animated,
+                    )
+                )
+
+
+class Heatmap:
+    """Heatmap image and cell labels drawn by :func:`draw_correlation_matrix`."""
+
+    def __init__(
+        self,
+        image: AxesImage,
+        annotations: CellAnnotations | None,
+        lower_triangle_only: bool = False,
+        min_support: int = MIN_SUPPORT,
+    ) -> None:
+        """Initialize the heatmap.
+
+        Args:
+            image: The heatmap image.
+            annotations: The cell labels, or None when cells are not labeled.
+            lower_triangle_only: The image hides the upper triangle.
+            min_support: Fewest shared substrates of a cell drawn in color.
+        """
+        self.image = image
+        self.annotations = annotations
+        self.lower_triangle_only = lower_triangle_only
+        self.min_support = min_support
+
+    def set_matrix(
+        self, matrix: Correlations, support: np.ndarray[Any, np.dtype[Any]] | None = None
+    ) -> None:
+        """Show a new matrix of the same shape without rebuilding the axes."""
+        self.image.set_data(image_data(matrix, self.lower_triangle_only, support, self.min_support))
+        if self.annotations is not None:
+            self.annotations.set_matrix(matrix)
+
+    def artists(self) -> list[Artist]:
+        """Return the artists that change with the matrix."""
+        texts = self.annotations.texts if self.annotations is not None else []
+        return [self.image, *texts]
+
+
+def image_data(
+    matrix: Correlations,
+    lower_triangle_only: bool = False,
+    support: np.ndarray[Any, np.dtype[Any]] | None = None,
+    min_support: int = MIN_SUPPORT,
+) -> np.ndarray[Any, np.dtype[Any]]:
+    """Return the pixels of a heatmap; condensed matrices are expanded in float32.
+
+    Cells whose ``support``, the number of substrates the pair shares, is
+    below ``min_support`` are masked, so they are drawn in the colormap's
+    grey "bad" color like undefined correlations.
+    """
+    pixels = (
+        matrix.to_dense(np.float32, lower_triangle_only=lower_triangle_only)
+        if isinstance(matrix, CondensedMatrix)
+        else matrix
+    )
+    if support is None:
+        return pixels
+    low_support = np.asarray(support) < min_support
+    if lower_triangle_only:
+        low_support = np.tril(low_support)
+    masked: np.ndarray[Any, np.dtype[Any]] = np.ma.masked_where(low_support, pixels)
+    return masked
+
+
+def draw_correlation_matrix(
+    fig: Figure,
+    matrix: Correlations,
+    labels: Sequence[str],
+    lower_triangle_only: bool = False,
+    annotate: bool = True,
+    animated: bool = False,
+    support: np.ndarray[Any, np.dtype[Any]] | None = None,
+    min_support: int = MIN_SUPPORT,
+) -> Heatmap:
+    """Draw the correlation matrix as a heatmap.
+
+    Cell values and enzyme tick labels follow the view: values are written
+    once few enough cells are in view, and ticks are thinned out so they
+    never overlap. Undefined and low-support correlations are drawn grey.
+
+    Args:
+        fig: Figure to draw on.
+        matrix: Enzymes x enzymes correlation matrix, dense or condensed.
+            Cell labels are rounded to two decimals when drawn.
+        labels: Enzyme names in matrix order.
+        lower_triangle_only: Hide the upper triangle and the top/right spines.
+        annotate: Write the values of the cells in view into the heatmap.
+        animated: Draw image and labels as animated artists for a :class:`BlitManager`.
+        support: Substrates shared by each enzyme pair, e.g. from
+            :func:`~enzyme_correlator.correlation.overlap_counts`.
+        min_support: Fewest shared substrates of a cell drawn in color.
+
+    Returns:
+        The heatmap image and its cell labels.
+    """
+    from matplotlib import colormaps
+    from matplotlib.ticker import FuncFormatter, MaxNLocator
+
+    def enzyme_name(position: float, _index: int | None = None) -> str:
+        return labels[int(position)] if position.is_integer() and 0 <= position < n else ""
+
+    n = len(labels)
+    ax = fig.add_subplot(111)
+    im = ax.imshow(
+        image_data(matrix, lower_triangle_only, support, min_support),
+        aspect="auto",
+        cmap=colormaps["bwr"].with_extremes(bad="lightgrey"),
+        interpolation="nearest",
+        animated=animated,
+    )
+    im.set_clim(-1, 1)
+    ax.grid(False)
+    if lower_triangle_only:
+        ax.spines["top"].set_visible(False)
+        ax.spines["right"].set_visible(False)
+    for axis in (ax.xaxis, ax.yaxis):
+        axis.set_major_locator(MaxNLocator(nbins=MAX_TICK_LABELS, integer=True))
+        axis.set_major_formatter(FuncFormatter(enzyme_name))
+    ax.tick_params(axis="x", rotation=45, labelsize=9)
+    ax.set_ylim(n - 0.5, -0.5)
+    annotations = None
+    if annotate:
+        annotations = CellAnnotations(
+            ax, matrix, lower_triangle_only=lower_triangle_only, animated=animated
+        )
+    fig.colorbar(im, ax=ax, format="% .2f")
+    return Heatmap(
+        im, annotations, lower_triangle_only=lower_triangle_only, min_support=min_support
+    )
+
+
+def highlight_grouped_bins(bars: Sequence[Rectangle], cutoff: float) -> None:
+    """Color the histogram bars above the grouping cutoff red and all others blue."""
+    first_grouped = len(bars) - grouped_bin_count(cutoff)
+    for i, bar in enumerate(bars):
+        bar.set_facecolor("indianred" if i >= first_grouped else "steelblue")
+
+
+def draw_histogram(
+    fig: Figure,
+    counts: np.ndarray[Any, np.dtype[Any]],
+    bins: np.ndarray[Any, np.dtype[np.float64]],
+    cutoff: float,
+    animated: bool = False,
+) -> list[Rectangle]:
+    """Draw the histogram of pairwise correlations, highlighting grouped bins.
+
+    The bars are drawn straight from precomputed bin counts, so the values
+    are never binned a second time.
+
+    Args:
+        fig: Figure to draw on.
+        counts: Number of lower-triangle correlations in each bin.
+        bins: Histogram bin edges.
+        cutoff: Grouping cutoff; bins above it are drawn in red.
+        animated: Draw the bars as animated artists for a :class:`BlitManager`.
+
+    Returns:
+        The histogram bars, for :func:`highlight_grouped_bins`.
+    """
+    ax = fig.add_subplot(111)
+    bars = ax.bar(bins[:-1], counts, width=np.diff(bins), align="edge", ec="k", animated=animated)
+    patches: list[Rectangle] = list(bars.patches)
+    highlight_grouped_bins(patches, cutoff)
+    ax.set_xticks(bins[::2])
+    ax.grid(True)
+    ax.set_xlim(-1.0, 1.0)
+    ax.grid(color="black", linestyle=":", linewidth=0.25)
+    ax.set_xlabel("Correlation of activity between enzyme pairs")
+    ax.set_ylabel("Occurrence")
+    return patches
+
+
+def update_histogram(bars: Sequence[Rectangle], counts: np.ndarray[Any, np.dtype[Any]]) -> None:
+    """Set the bar heights to new bin counts and rescale the count axis."""
+    for bar, count in zip(bars, counts.tolist()):
+        bar.set_height(count)
+    if bars:
+        ax = bars[0].axes
+        assert ax is not None
+        ax.relim()
+        ax.autoscale_view()
+
+
+class BlitManager:
+    """Redraw the changing artists of a figure over a cached background.
+
+    The artists must be animated, so that a full draw leaves them out of the
+    background; they are drawn on top after every full draw and on
+    :meth:`update`. Anything else that changes needs a full ``draw_idle``.
+    """
+
+    def __init__(self, fig: Figure, artists: Callable[[], Sequence[Artist]]) -> None:
+        """Start caching the background of ``fig`` on every full draw.
+
+        Args:
+            fig: Figure whose canvas supports blitting.
+            artists: Returns the animated artists to redraw.
+        """
+        self.fig = fig
+        self.artists = artists
+        self.background: Any = None
+        # the registry only keeps weak references to bound methods
+        fig.canvas.mpl_connect("draw_event", lambda _event: self.on_draw())
+
+    def on_draw(self) -> None:
+        """Cache the freshly drawn background and draw the artists over it."""
+        self.background = self.fig.canvas.copy_from_bbox(self.fig.bbox)  # type: ignore[attr-defined]
+        self._draw_artists()
+
+    def update(self) -> None:
+        """Redraw only the artists, or the whole figure if it was never drawn."""
+        canvas = self.fig.canvas
+        if self.background is None:
+            canvas.draw_idle()
+            return
+        canvas.restore_region(self.background)  # type: ignore[attr-defined]
+        self._draw_artists()
+        canvas.blit(self.fig.bbox)
+        canvas.flush_events()
+
+    @contextmanager
+    def static(self) -> Iterator[None]:
+        """Temporarily make the artists static, e.g. so that ``savefig`` includes them."""
+        artists = self.artists()
+        for artist in artists:
+            artist.set_animated(False)
+        try:
+            yield
+        finally:
+            for artist in artists:
+                artist.set_animated(True)
+
+    def _draw_artists(self) -> None:
+        for artist in self.artists():
+            self.fig.draw_artist(artist)
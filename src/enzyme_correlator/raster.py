@@ -0,0 +1,334 @@
+"""
+Raster export of correlation matrices too large for a figure.
+
+Saving the heatmap figure renders every cell label and, for vector formats,
+every cell as a shape. The functions here color the matrix straight from the
+array instead, with the ``bwr`` colormap on [-1, 1] and the grey of undefined
+and low-support cells used by
+:func:`~enzyme_correlator.plotting.draw_correlation_matrix`, one pixel per cell.
+
+The matrix is read in bands of rows and the images are written as they are
+produced, so memory is bounded by one band whatever the size of the panel:
+
+- :func:`write_heatmap_png` streams one PNG image, band by band.
+- :func:`write_heatmap_tiles` cuts the image into square tiles, and as a
+  pyramid adds coarser levels that each halve the resolution of the one
+  below, down to a single tile.
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import struct
+import zlib
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, BinaryIO
+
+import numpy as np
+
+from enzyme_correlator.analysis import DISPLAY_DECIMALS
+from enzyme_correlator.correlation import DEFAULT_TILE_SIZE, Correlations
+from enzyme_correlator.partners import matrix_row_bands
+from enzyme_correlator.plotting import MIN_SUPPORT
+
+__all__ = [
+    "PNG_TILE_SIZE",
+    "PngWriter",
+    "colorize",
+    "heatmap_bands",
+    "write_heatmap_png",
+    "write_heatmap_tiles",
+]
+
+PNG_TILE_SIZE = 256
+"""Side length in pixels of the tiles written by :func:`write_heatmap_tiles`."""
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# higher levels shrink heatmaps by little more than a tenth at several times the cost
+_PNG_COMPRESSION = 1
+_COLORS = 256
+
+Pixels = np.ndarray[Any, np.dtype[np.uint8]]
+"""Rows x columns x RGB image block."""
+
+
+class PngWriter:
+    """Streaming writer of 8-bit RGB PNG images.
+
+    Scanlines are compressed as they are written, so the image never has to
+    exist in memory at once.
+    """
+
+    def __init__(self, path: str | os.PathLike[str], width: int, height: int) -> None:
+        """Open ``path`` and write the image header.
+
+        Args:
+            path: Destination file, overwritten if it exists.
+            width: Image width in pixels.
+            height: Image height in pixels.
+        """
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        self._compressor = zlib.compressobj(_PNG_COMPRESSION)
+        self._stream: BinaryIO = open(path, "wb")  # noqa: SIM115
+        self._stream.write(_PNG_SIGNATURE)
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+    def __enter__(self) -> PngWriter:
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, *_exc: object) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            # leave the incomplete file behind without masking the error
+            self._stream.close()
+
+    def _chunk(self, kind: bytes, data: bytes) -> None:
+        self._stream.write(struct.pack(">I", len(data)) + kind + data)
+        self._stream.write(struct.pack(">I", zlib.crc32(kind + data)))
+
+    def write_rows(self, pixels: Pixels) -> None:
+        """Append rows x ``width`` x 3 pixels below the rows written so far.
+
+        Raises:
+            ValueError: If the block does not fit the image.
+        """
+        rows = len(pixels)
+        if pixels.shape[1:] != (self.width, 3) or self.rows_written + rows > self.height:
+            raise ValueError("pixel block does not fit the image")
+        # every scanline starts with filter type 0 (none)
+        lines = np.zeros((rows, 1 + 3 * self.width), dtype=np.uint8)
+        lines[:, 1:] = pixels.reshape(rows, -1)
+        data = self._compressor.compress(lines.tobytes())
+        if data:
+            self._chunk(b"IDAT", data)
+        self.rows_written += rows
+
+    def close(self) -> None:
+        """Finish the image and close the file.
+
+        Raises:
+            ValueError: If fewer rows than the image height were written.
+        """
+        if self._stream.closed:
+            return
+        try:
+            if self.rows_written != self.height:
+                raise ValueError(f"wrote {self.rows_written} of {self.height} image rows")
+            self._chunk(b"IDAT", self._compressor.flush())
+            self._chunk(b"IEND", b"")
+        finally:
+            self._stream.close()
+
+
+@functools.cache
+def _palette() -> tuple[Pixels, Pixels]:
+    """Return the RGB colors of the heatmap colormap and its grey for undefined cells."""
+    from matplotlib import colormaps
+
+    cmap = colormaps["bwr"].with_extremes(bad="lightgrey")
+    colors: Pixels = cmap(np.arange(_COLORS), bytes=True)[:, :3]
+    bad: Pixels = cmap(np.array([np.nan]), bytes=True)[0, :3]
+    return colors, bad
+
+
+def colorize(values: np.ndarray[Any, np.dtype[Any]]) -> Pixels:
+    """Color correlations like the heatmap; NaN cells are grey.
+
+    Values are binned into the colormap exactly as matplotlib does for the
+    color limits [-1, 1].
+    """
+    colors, bad = _palette()
+    undefined = np.isnan(values)
+    scaled = (np.where(undefined, 0.0, values) + 1.0) / 2.0 * _COLORS
+    pixels: Pixels = colors[np.clip(scaled, 0, _COLORS - 1).astype(np.intp)]
+    pixels[undefined] = bad
+    return pixels
+
+
+def heatmap_bands(
+    correlations: Correlations,
+    lower_triangle_only: bool = False,
+    support: np.ndarray[Any, np.dtype[Any]] | None = None,
+    min_support: int = MIN_SUPPORT,
+    band_size: int = DEFAULT_TILE_SIZE,
+) -> Iterator[np.ndarray[Any, np.dtype[np.float32]]]:
+    """Read the displayed values of a matrix in bands of ``band_size`` rows.
+
+    Values are rounded as in the heatmap, the upper triangle is zero when
+    only the lower one is shown, and low-support cells are NaN.
+
+    Args:
+        correlations: Dense, memory-mapped or condensed matrix.
+        lower_triangle_only: Show only the lower triangle.
+        support: Substrates shared by each enzyme pair.
+        min_support: Fewest shared substrates of a cell drawn in color.
+        band_size: Rows read at once.
+    """
+    for start, block in matrix_row_bands(correlations, band_size=band_size):
+        values = np.round(block, DISPLAY_DECIMALS).astype(np.float32)
+        upper = np.arange(values.shape[1])[None, :] > np.arange(start, start + len(values))[:, None]
+        if lower_triangle_only:
+            values[upper] = 0.0
+        if support is not None:
+            low_support = np.asarray(support[start : start + len(values)]) < min_support
+            if lower_triangle_only:
+                low_support &= ~upper
+            values[low_support] = np.nan
+        yield values
+
+
+def write_heatmap_png(
+    correlations: Correlations,
+    path: str | os.PathLike[str],
+    lower_triangle_only: bool = False,
+    support: np.ndarray[Any, np.dtype[Any]] | None = None,
+    min_support: int = MIN_SUPPORT,
+    scale: int = 1,
+    band_size: int = PNG_TILE_SIZE,
+) -> tuple[int, int]:
+    """Render the heatmap of a correlation matrix into one PNG image, band by band.
+
+    Args:
+        correlations: Dense, memory-mapped or condensed matrix.
+        path: Destination file, overwritten if it exists.
+        lower_triangle_only: Show only the lower triangle.
+        support: Substrates shared by each enzyme pair.
+        min_support: Fewest shared substrates of a cell drawn in color.
+        scale: Pixels per cell along each axis.
+        band_size: Matrix rows rendered at once.
+
+    Returns:
+        The width and height of the image in pixels.
+
+    Raises:
+        ValueError: If ``scale`` is smaller than one.
+    """
+    if scale < 1:
+        raise ValueError("scale must be at least one pixel per cell")
+    side = correlations.shape[0] * scale
+    with PngWriter(path, side, side) as writer:
+        for values in heatmap_bands(
+            correlations, lower_triangle_only, support, min_support, band_size
+        ):
+            pixels = colorize(values)
+            if scale > 1:
+                pixels = pixels.repeat(scale, axis=0).repeat(scale, axis=1)
+            writer.write_rows(pixels)
+    return side, side
+
+
+def _halve(values: np.ndarray[Any, np.dtype[np.float32]]) -> np.ndarray[Any, np.dtype[np.float32]]:
+    """Average 2 x 2 blocks of cells, ignoring NaN cells; odd edges are padded."""
+    rows, columns = values.shape
+    padded = np.full((rows + rows % 2, columns + columns % 2), np.nan, dtype=np.float32)
+    padded[:rows, :columns] = values
+    blocks = padded.reshape(len(padded) // 2, 2, padded.shape[1] // 2, 2)
+    defined = ~np.isnan(blocks)
+    counts = defined.sum(axis=(1, 3))
+    sums = np.where(defined, blocks, 0.0).sum(axis=(1, 3))
+    with np.errstate(invalid="ignore"):
+        halved: np.ndarray[Any, np.dtype[np.float32]] = (sums / counts).astype(np.float32)
+    return halved
+
+
+class _TileLevel:
+    """One resolution of a tile pyramid, written row of tiles by row of tiles."""
+
+    def __init__(self, directory: Path, tile_size: int, coarser: _TileLevel | None) -> None:
+        self.directory = directory
+        self.tile_size = tile_size
+        self.coarser = coarser
+        self.pending: list[np.ndarray[Any, np.dtype[np.float32]]] = []
+        self.pending_rows = 0
+        self.tile_row = 0
+        directory.mkdir(parents=True, exist_ok=True)
+
+    def add(self, values: np.ndarray[Any, np.dtype[np.float32]]) -> None:
+        """Buffer rows of values and write every full row of tiles."""
+        self.pending.append(values)
+        self.pending_rows += len(values)
+        while self.pending_rows >= self.tile_size:
+            buffered = np.concatenate(self.pending)
+            self._emit(buffered[: self.tile_size])
+            rest = buffered[self.tile_size :]
+            self.pending = [rest] if len(rest) else []
+            self.pending_rows = len(rest)
+
+    def finish(self) -> None:
+        """Write the last, partial row of tiles and finish the coarser levels."""
+        if self.pending_rows:
+            self._emit(np.concatenate(self.pending))
+            self.pending = []
+            self.pending_rows = 0
+        if self.coarser is not None:
+            self.coarser.finish()
+
+    def _emit(self, values: np.ndarray[Any, np.dtype[np.float32]]) -> None:
+        pixels = colorize(values)
+        for tile_column, start in enumerate(range(0, values.shape[1], self.tile_size)):
+            tile = np.ascontiguousarray(pixels[:, start : start + self.tile_size])
+            path = self.directory / f"{self.tile_row}_{tile_column}.png"
+            with PngWriter(path, tile.shape[1], len(tile)) as writer:
+                writer.write_rows(tile)
+        self.tile_row += 1
+        if self.coarser is not None:
+            self.coarser.add(_halve(values))
+
+
+def write_heatmap_tiles(
+    correlations: Correlations,
+    directory: str | os.PathLike[str],
+    tile_size: int = PNG_TILE_SIZE,
+    pyramid: bool = False,
+    lower_triangle_only: bool = False,
+    support: np.ndarray[Any, np.dtype[Any]] | None = None,
+    min_support: int = MIN_SUPPORT,
+) -> int:
+    """Render the heatmap of a correlation matrix into square PNG tiles.
+
+    Tiles are written to ``<directory>/<level>/<row>_<column>.png``. Level
+    ``0`` has one pixel per cell; with ``pyramid`` every further level
+    averages 2 x 2 cells of the one below, ignoring undefined cells, until
+    the whole matrix fits into one tile. Tiles on the right and bottom edges
+    may be smaller than ``tile_size``.
+
+    Memory is bounded by ``tile_size`` rows of the matrix per level.
+
+    Args:
+        correlations: Dense, memory-mapped or condensed matrix.
+        directory: Directory receiving the levels.
+        tile_size: Side length of the tiles in pixels.
+        pyramid: Also write the coarser levels.
+        lower_triangle_only: Show only the lower triangle.
+        support: Substrates shared by each enzyme pair.
+        min_support: Fewest shared substrates of a cell drawn in color.
+
+    Returns:
+        The number of levels written.
+
+    Raises:
+        ValueError: If ``tile_size`` is not positive, or odd for a pyramid.
+    """
+    if tile_size < 1 or (pyramid and tile_size % 2):
+        raise ValueError("tile_size must be positive, and even for a pyramid")
+    levels = 1
+    side = correlations.shape[0]
+    while pyramid and side > tile_size:
+        side = -(-side // 2)
+        levels += 1
+    root = Path(directory)
+    level: _TileLevel | None = None
+    for index in reversed(range(levels)):
+        level = _TileLevel(root / str(index), tile_size, level)
+    assert level is not None
+    for values in heatmap_bands(
+        correlations, lower_triangle_only, support, min_support, band_size=tile_size
+    ):
+        level.add(values)
+    level.finish()
+    return levels
@@ -0,0 +1,202 @@
+"""
+Correlations over a user-chosen subset of substrates.
+
+Pearson correlation only depends on the number of observations, the column
+sums and the cross-product matrix, and each of those is a sum over substrates.
+:class:`SubstrateSelection` keeps these sufficient statistics for the included
+substrates, so excluding or re-adding a substrate subtracts or adds its own
+contribution in O(n^2) instead of recomputing the matrix from all m substrates.
+With missing activities the statistics become the pairwise-complete
+:class:`~enzyme_correlator.correlation.PairwiseMoments`, which add up over
+substrates just the same.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from enzyme_correlator.analysis import (
+    DEFAULT_CUTOFF,
+    AnalysisResult,
+    histogram_counts,
+)
+from enzyme_correlator.correlation import (
+    RELATIVE_VARIANCE_FLOOR,
+    PairwiseMoments,
+    overlap_counts,
+    pairwise_moments,
+    pearson_from_moments,
+)
+from enzyme_correlator.grouping import group_enzymes
+
+__all__ = ["SubstrateSelection"]
+
+
+class SubstrateSelection:
+    """Correlation matrix of a panel restricted to its included substrates.
+
+    All substrates start out included. The data are centered and scaled with
+    the statistics of the full panel first, which leaves every correlation
+    unchanged but keeps the running sums well conditioned.
+    """
+
+    def __init__(self, df: pd.DataFrame) -> None:
+        """Initialize the selection with every substrate included.
+
+        Args:
+            df: Substrates x enzymes activity frame.
+        """
+        self.df = df
+        self.substrates: tuple[str, ...] = tuple(str(substrate) for substrate in df.index)
+        self.enzyme_names: tuple[str, ...] = tuple(str(enzyme) for enzyme in df.columns)
+        self._positions: dict[str, list[int]] = {}
+        for position, substrate in enumerate(self.substrates):
+            self._positions.setdefault(substrate, []).append(position)
+
+        data = df.to_numpy(dtype=np.float64)
+        present = ~np.isnan(data)
+        count = present.sum(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            center = np.where(present, data, 0.0).sum(axis=0) / count
+            scale = np.sqrt((np.where(present, data - center, 0.0) ** 2).sum(axis=0) / count)
+        center[np.isnan(center)] = 0.0
+        scale[~(scale > 0)] = 1.0
+        self._data: np.ndarray[Any, np.dtype[np.float64]] = (data - center) / scale
+        self._variance_floor = RELATIVE_VARIANCE_FLOOR * len(self.substrates)
+
+        self.included: np.ndarray[Any, np.dtype[np.bool_]] = np.ones(
+            len(self.substrates), dtype=bool
+        )
+        self._moments: PairwiseMoments | None = None
+        if not present.all():
+            self._moments = pairwise_moments(self._data, self._data)
+            return
+        self._sums: np.ndarray[Any, np.dtype[np.float64]] = self._data.sum(axis=0)
+        self._products: np.ndarray[Any, np.dtype[np.float64]] = self._data.T @ self._data
+
+    @property
+    def included_substrates(self) -> list[str]:
+        """Names of the included substrates in panel order."""
+        return [name for name, keep in zip(self.substrates, self.included.tolist()) if keep]
+
+    def _lookup(self, substrates: Iterable[str]) -> list[int]:
+        positions = []
+        for substrate in substrates:
+            if substrate not in self._positions:
+                raise KeyError(f"unknown substrate {substrate!r}")
+            positions.extend(self._positions[substrate])
+        return positions
+
+    def _toggle(self, positions: list[int], include: bool) -> None:
+        changed = np.array(
+            [position for position in positions if self.included[position] != include],
+            dtype=np.intp,
+        )
+        if len(changed) == 0:
+            return
+        rows = self._data[changed]
+        sign = 1.0 if include else -1.0
+        if self._moments is not None:
+            for total, part in zip(self._moments, pairwise_moments(rows, rows)):
+                total += sign * part
+        else:
+            self._sums += sign * rows.sum(axis=0)
+            self._products += sign * (rows.T @ rows)
+        self.included[changed] = include
+
+    def exclude(self, *substrates: str) -> None:
+        """Leave substrates out of the correlation.
+
+        Raises:
+            KeyError: If a substrate is not part of the panel.
+        """
+        self._toggle(self._lookup(substrates), include=False)
+
+    def include(self, *substrates: str) -> None:
+        """Take previously excluded substrates back into the correlation.
+
+        Raises:
+            KeyError: If a substrate is not part of the panel.
+        """
+        self._toggle(self._lookup(substrates), include=True)
+
+    def select(self, substrates: Iterable[str]) -> None:
+        """Include exactly the given substrates and exclude all others.
+
+        Raises:
+            KeyError: If a substrate is not part of the panel.
+        """
+        keep = np.zeros(len(self.substrates), dtype=bool)
+        keep[self._lookup(substrates)] = True
+        self._toggle(np.flatnonzero(~keep).tolist(), include=False)
+        self._toggle(np.flatnonzero(keep).tolist(), include=True)
+
+    def frame(self) -> pd.DataFrame:
+        """Return the activity frame restricted to the included substrates."""
+        frame: pd.DataFrame = self.df.loc[self.included]
+        return frame
+
+    def correlations(self) -> np.ndarray[Any, np.dtype[np.float64]]:
+        """Compute the Pearson correlation matrix over the included substrates.
+
+        Enzymes that are constant over the included substrates, and every
+        enzyme when fewer than two substrates are included, get NaN
+        correlations, as with :func:`~enzyme_correlator.correlation.pearson_matrix`.
+        With missing activities, each pair is correlated over the included
+        substrates where both enzymes were measured.
+
+        Returns:
+            The enzymes x enzymes correlation matrix.
+        """
+        count = int(self.included.sum())
+        n = len(self.enzyme_names)
+        if count < 2:
+            return np.full((n, n), np.nan)
+        if self._moments is not None:
+            return pearson_from_moments(self._moments)
+        covariance = self._products - np.outer(self._sums, self._sums) / count
+        variance = np.diag(covariance).copy()
+        variance[variance <= self._variance_floor] = np.nan
+        scale = np.sqrt(variance)
+        matrix: np.ndarray[Any, np.dtype[np.float64]] = covariance / np.outer(scale, scale)
+        np.clip(matrix, -1.0, 1.0, out=matrix)
+        return matrix
+
+    def overlap(self) -> np.ndarray[Any, np.dtype[np.int32]] | None:
+        """Count the included substrates shared by each enzyme pair.
+
+        Returns:
+            The enzymes x enzymes overlap counts, or None when no activity is
+            missing and every pair shares all included substrates.
+        """
+        if self._moments is None:
+            return None
+        return overlap_counts(self.frame().to_numpy(dtype=np.float64))
+
+    def analyze(
+        self, cutoff: float = DEFAULT_CUTOFF, lower_triangle_only: bool = False
+    ) -> AnalysisResult:
+        """Run the full analysis over the included substrates.
+
+        Args:
+            cutoff: Grouping cutoff.
+            lower_triangle_only: Leave the strict upper triangle of the display matrix at zero.
+
+        Returns:
+            The correlations, histogram counts and grouping.
+        """
+        correlations = self.correlations()
+        return AnalysisResult(
+            df=self.frame(),
+            enzyme_names=self.enzyme_names,
+            correlations=correlations,
+            histogram_counts=histogram_counts(correlations),
+            grouping=group_enzymes(correlations, self.enzyme_names, cutoff),
+            cutoff=cutoff,
+            lower_triangle_only=lower_triangle_only,
+            overlap=self.overlap(),
+        )
@@ -0,0 +1,398 @@
+"""
+Permutation p-values and bootstrap confidence intervals for correlations.
+
+With only a handful of substrates per enzyme, high correlations often arise by
+chance. :func:`assess_significance` attaches two resampling statistics to the
+correlation matrix and to every enzyme group:
+
+- Permutation p-values: every column is shuffled independently, which breaks
+  all pairings at once, and each observed correlation is compared with the
+  correlations of the shuffled data. For a group, the statistic is the mean
+  correlation over its enzyme pairs.
+- Bootstrap confidence intervals: substrates are drawn with replacement and
+  the correlations are recomputed on every resample.
+
+Resamples are correlated in batches with one stacked matrix product, and the
+matrix is split into row bands that run on a process pool. Every resample
+draws from its own generator seeded with ``(seed, resample)``, so the results
+only depend on the seed, never on the number of processes or the batching.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from enzyme_correlator.correlation import (
+    PARALLEL_MIN_WORK,
+    RELATIVE_VARIANCE_FLOOR,
+    correlate,
+    pairwise_moments,
+    pearson_equivalent,
+    pearson_from_moments,
+    process_pool,
+    rank_columns,
+)
+
+__all__ = [
+    "DEFAULT_CONFIDENCE",
+    "DEFAULT_RESAMPLES",
+    "GroupSignificance",
+    "SignificanceResult",
+    "assess_significance",
+]
+
+DEFAULT_RESAMPLES = 1000
+DEFAULT_CONFIDENCE = 0.95
+RESAMPLE_BATCH_SIZE = 32
+# Resampled correlations a bootstrap band keeps for its quantiles (float32).
+_BAND_VALUES = 2**24
+_PERMUTATION_STREAM = 0
+_BOOTSTRAP_STREAM = 1
+
+
+@dataclass
+class GroupSignificance:
+    """Resampling statistics of the mean correlation within one enzyme group."""
+
+    enzymes: list[str]
+    mean_correlation: float
+    p_value: float
+    interval: tuple[float, float]
+
+
+@dataclass
+class SignificanceResult:
+    """Permutation p-values and bootstrap intervals of a correlation matrix."""
+
+    method: str
+    resamples: int
+    confidence: float
+    seed: int
+    correlations: np.ndarray[Any, np.dtype[np.float64]]
+    p_values: np.ndarray[Any, np.dtype[np.float64]]
+    lower: np.ndarray[Any, np.dtype[np.float64]]
+    upper: np.ndarray[Any, np.dtype[np.float64]]
+    groups: dict[int, GroupSignificance] = field(default_factory=dict)
+
+
+def _batch_correlations(
+    blocks: np.ndarray[Any, np.dtype[np.float64]], start: int, stop: int
+) -> np.ndarray[Any, np.dtype[np.float64]]:
+    """Correlate rows ``start .. stop - 1`` with columns ``0 .. stop - 1`` of every block.
+
+    Args:
+        blocks: Resamples x observations x variables.
+        start: First matrix row.
+        stop: End of the matrix rows and columns.
+
+    Returns:
+        Resamples x band rows x ``stop`` correlations, NaN for columns that
+        are constant within a resample.
+    """
+    if np.isnan(blocks).any():
+        return np.stack(
+            [
+                pearson_from_moments(pairwise_moments(block[:, start:stop], block[:, :stop]))
+                for block in blocks
+            ]
+        )
+    columns = blocks[:, :, :stop]
+    centered = columns - columns.mean(axis=1, keepdims=True)
+    squares = (centered * centered).sum(axis=1, keepdims=True)
+    constant = squares <= RELATIVE_VARIANCE_FLOOR * (columns * columns).sum(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        standardized = np.where(constant, np.nan, centered / np.sqrt(squares))
+    values: np.ndarray[Any, np.dtype[np.float64]] = np.matmul(
+        standardized[:, :, start:stop].transpose(0, 2, 1), standardized
+    )
+    np.clip(values, -1.0, 1.0, out=values)
+    return values
+
+
+def _group_totals(
+    values: np.ndarray[Any, np.dtype[np.float64]],
+    labels: np.ndarray[Any, np.dtype[np.intp]],
+    group_count: int,
+    start: int,
+    stop: int,
+) -> tuple[np.ndarray[Any, np.dtype[np.float64]], np.ndarray[Any, np.dtype[np.float64]]]:
+    """Sum the defined strict-lower correlations of every group within a band.
+
+    Returns:
+        Per resample and group, the sum of the correlations and their number.
+    """
+    membership = np.zeros((stop, group_count))
+    grouped = np.flatnonzero(labels[:stop] >= 0)
+    membership[grouped, labels[grouped]] = 1.0
+    below = np.arange(stop)[None, :] < np.arange(start, stop)[:, None]
+    defined = below & ~np.isnan(values)
+    sums = (np.where(defined, values, 0.0) @ membership * membership[start:stop]).sum(axis=1)
+    counts = (defined @ membership * membership[start:stop]).sum(axis=1)
+    return sums, counts
+
+
+def _permutation(data: np.ndarray[Any, np.dtype[np.float64]], seed: int, resample: int) -> Any:
+    rng = np.random.default_rng((seed, _PERMUTATION_STREAM, resample))
+    m, n = data.shape
+    order = rng.permuted(np.broadcast_to(np.arange(m)[:, None], (m, n)), axis=0)
+    return np.take_along_axis(data, order, axis=0)
+
+
+def _bootstrap(
+    data: np.ndarray[Any, np.dtype[np.float64]], seed: int, resample: int, ranked: bool
+) -> Any:
+    rng = np.random.default_rng((seed, _BOOTSTRAP_STREAM, resample))
+    sample = data[rng.integers(0, len(data), len(data))]
+    return rank_columns(sample) if ranked else sample
+
+
+def _permutation_band(
+    data: np.ndarray[Any, np.dtype[np.float64]],
+    observed: np.ndarray[Any, np.dtype[np.float64]],
+    labels: np.ndarray[Any, np.dtype[np.intp]],
+    group_count: int,
+    seed: int,
+    resamples: int,
+    start: int,
+    stop: int,
+) -> tuple[
+    np.ndarray[Any, np.dtype[np.int64]],
+    np.ndarray[Any, np.dtype[np.float64]],
+    np.ndarray[Any, np.dtype[np.float64]],
+]:
+    """Count the permutations at least as extreme as the observed band.
+
+    Returns:
+        The exceedance counts of the band, and the per-permutation group sums
+        and pair counts.
+    """
+    threshold = np.abs(observed[start:stop, :stop]) - 1e-12
+    exceed = np.zeros(threshold.shape, dtype=np.int64)
+    sums = np.zeros((resamples, group_count))
+    counts = np.zeros((resamples, group_count))
+    for first in range(0, resamples, RESAMPLE_BATCH_SIZE):
+        batch = range(first, min(first + RESAMPLE_BATCH_SIZE, resamples))
+        blocks = np.stack([_permutation(data, seed, resample) for resample in batch])
+        values = _batch_correlations(blocks, start, stop)
+        with np.errstate(invalid="ignore"):
+            exceed += (np.abs(values) >= threshold).sum(axis=0)
+        sums[batch.start : batch.stop], counts[batch.start : batch.stop] = _group_totals(
+            values, labels, group_count, start, stop
+        )
+    return exceed, sums, counts
+
+
+def _nan_quantiles(
+    values: np.ndarray[Any, np.dtype[Any]], quantiles: Sequence[float]
+) -> list[np.ndarray[Any, np.dtype[np.float64]]]:
+    """Linearly interpolated quantiles along axis 0, ignoring NaN."""
+    ordered = np.sort(values, axis=0)
+    valid = (~np.isnan(ordered)).sum(axis=0)
+    results = []
+    for quantile in quantiles:
+        position = quantile * np.maximum(valid - 1, 0)
+        below = np.floor(position).astype(np.intp)
+        above = np.minimum(below + 1, np.maximum(valid - 1, 0))
+        fraction = position - below
+        low = np.take_along_axis(ordered, below[None], axis=0)[0].astype(np.float64)
+        high = np.take_along_axis(ordered, above[None], axis=0)[0].astype(np.float64)
+        result = low + fraction * (high - low)
+        result[valid == 0] = np.nan
+        results.append(result)
+    return results
+
+
+def _bootstrap_band(
+    data: np.ndarray[Any, np.dtype[np.float64]],
+    ranked: bool,
+    labels: np.ndarray[Any, np.dtype[np.intp]],
+    group_count: int,
+    seed: int,
+    resamples: int,
+    confidence: float,
+    start: int,
+    stop: int,
+) -> tuple[
+    np.ndarray[Any, np.dtype[np.float64]],
+    np.ndarray[Any, np.dtype[np.float64]],
+    np.ndarray[Any, np.dtype[np.float64]],
+    np.ndarray[Any, np.dtype[np.float64]],
+]:
+    """Compute the bootstrap intervals of a band.
+
+    Returns:
+        The lower and upper interval bounds of the band, and the
+        per-resample group sums and pair counts.
+    """
+    values = np.empty((resamples, stop - start, stop), dtype=np.float32)
+    sums = np.zeros((resamples, group_count))
+    counts = np.zeros((resamples, group_count))
+    for first in range(0, resamples, RESAMPLE_BATCH_SIZE):
+        batch = range(first, min(first + RESAMPLE_BATCH_SIZE, resamples))
+        blocks = np.stack([_bootstrap(data, seed, resample, ranked) for resample in batch])
+        correlations = _batch_correlations(blocks, start, stop)
+        values[batch.start : batch.stop] = correlations
+        sums[batch.start : batch.stop], counts[batch.start : batch.stop] = _group_totals(
+            correlations, labels, group_count, start, stop
+        )
+    tail = (1 - confidence) / 2
+    lower, upper = _nan_quantiles(values, (tail, 1 - tail))
+    return lower, upper, sums, counts
+
+
+def _mirror(lower: np.ndarray[Any, np.dtype[np.float64]]) -> None:
+    """Copy the strict lower triangle of a square matrix onto its upper triangle."""
+    upper = np.triu_indices(len(lower), k=1)
+    lower[upper] = lower.T[upper]
+
+
+def assess_significance(
+    df: pd.DataFrame,
+    grouping: Mapping[int, Sequence[str]] | None = None,
+    method: str = "pearson",
+    resamples: int = DEFAULT_RESAMPLES,
+    confidence: float = DEFAULT_CONFIDENCE,
+    seed: int = 0,
+    jobs: int = 1,
+) -> SignificanceResult:
+    """Attach permutation p-values and bootstrap intervals to the correlations.
+
+    P-values are two-sided for single correlations and one-sided (mean
+    correlation at least as high) for groups, with the usual ``+ 1``
+    correction so that they are never zero.
+
+    Args:
+        df: Substrates x enzymes activity frame, NaN where missing.
+        grouping: Enzyme groups, e.g. from
+            :func:`~enzyme_correlator.grouping.group_enzymes`.
+        method: ``"pearson"``, or ``"spearman"`` for data without missing values.
+        resamples: Number of permutations and of bootstrap resamples.
+        confidence: Coverage of the bootstrap intervals.
+        seed: Seed of the resampling; equal seeds give equal results.
+        jobs: Number of worker processes, only started for at least
+            :data:`~enzyme_correlator.correlation.PARALLEL_MIN_WORK` pairs
+            times observations times resamples.
+
+    Returns:
+        The correlations with their p-values, intervals and group statistics.
+
+    Raises:
+        ValueError: If the method cannot be resampled as a batched matrix
+            product, or if ``resamples`` or ``confidence`` are out of range.
+    """
+    if resamples < 1:
+        raise ValueError(f"resamples must be positive, got {resamples}")
+    if not 0 < confidence < 1:
+        raise ValueError(f"confidence must lie between 0 and 1, got {confidence}")
+    data = df.to_numpy(dtype=np.float64)
+    permuted_data = pearson_equivalent(data, method) if method != "kendall" else None
+    if permuted_data is None:
+        raise ValueError(
+            f"{method.capitalize()} correlation of this data cannot be resampled; "
+            "use Pearson, or Spearman without missing values"
+        )
+    n = data.shape[1]
+    correlations = correlate(data, method=method)
+
+    enzyme_names = [str(enzyme) for enzyme in df.columns]
+    positions = {name: position for position, name in reversed(list(enumerate(enzyme_names)))}
+    groups = dict(grouping or {})
+    labels = np.full(n, -1, dtype=np.intp)
+    for label, enzymes in enumerate(groups.values()):
+        labels[[positions[enzyme] for enzyme in enzymes]] = label
+
+    band_rows = max(1, _BAND_VALUES // (resamples * max(n, 1)))
+    bands = [(start, min(start + band_rows, n)) for start in range(0, n, band_rows)]
+    tasks: list[tuple[Callable[..., Any], tuple[Any, ...]]] = []
+    for start, stop in bands:
+        tasks.append(
+            (
+                _permutation_band,
+                (permuted_data, correlations, labels, len(groups), seed, resamples, start, stop),
+            )
+        )
+        tasks.append(
+            (
+                _bootstrap_band,
+                (
+                    data,
+                    method == "spearman",
+                    labels,
+                    len(groups),
+                    seed,
+                    resamples,
+                    confidence,
+                    start,
+                    stop,
+                ),
+            )
+        )
+
+    work = n * (n - 1) // 2 * len(data) * resamples
+    if jobs <= 1 or len(tasks) < 2 or work < PARALLEL_MIN_WORK:
+        outcomes = [function(*arguments) for function, arguments in tasks]
+    else:
+        from concurrent.futures import Future
+
+        with process_pool(min(jobs, len(tasks))) as executor:
+            futures: list[Future[Any]] = [
+                executor.submit(function, *arguments) for function, arguments in tasks
+            ]
+            outcomes = [future.result() for future in futures]
+
+    exceed = np.zeros((n, n))
+    lower = np.zeros((n, n))
+    upper = np.zeros((n, n))
+    permuted_sums = np.zeros((resamples, len(groups)))
+    permuted_counts = np.zeros((resamples, len(groups)))
+    bootstrap_sums = np.zeros((resamples, len(groups)))
+    bootstrap_counts = np.zeros((resamples, len(groups)))
+    for (start, stop), permuted, bootstrapped in zip(bands, outcomes[::2], outcomes[1::2]):
+        exceed[start:stop, :stop] = permuted[0]
+        permuted_sums += permuted[1]
+        permuted_counts += permuted[2]
+        lower[start:stop, :stop] = bootstrapped[0]
+        upper[start:stop, :stop] = bootstrapped[1]
+        bootstrap_sums += bootstrapped[2]
+        bootstrap_counts += bootstrapped[3]
+    for matrix in (exceed, lower, upper):
+        _mirror(matrix)
+    p_values = (exceed + 1) / (resamples + 1)
+    p_values[np.isnan(correlations)] = np.nan
+    np.fill_diagonal(p_values, np.nan)
+
+    observed_sums, observed_counts = _group_totals(correlations[None], labels, len(groups), 0, n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        observed_means = observed_sums[0] / observed_counts[0]
+        permuted_means = permuted_sums / permuted_counts
+        bootstrap_means = bootstrap_sums / bootstrap_counts
+        group_p_values = ((permuted_means >= observed_means - 1e-12).sum(axis=0) + 1) / (
+            resamples + 1
+        )
+    tail = (1 - confidence) / 2
+    group_lower, group_upper = _nan_quantiles(bootstrap_means, (tail, 1 - tail))
+
+    return SignificanceResult(
+        method=method,
+        resamples=resamples,
+        confidence=confidence,
+        seed=seed,
+        correlations=correlations,
+        p_values=p_values,
+        lower=lower,
+        upper=upper,
+        groups={
+            group: GroupSignificance(
+                enzymes=list(enzymes),
+                mean_correlation=float(observed_means[label]),
+                p_value=float(group_p_values[label]),
+                interval=(float(group_lower[label]), float(group_upper[label])),
+            )
+            for label, (group, enzymes) in enumerate(groups.items())
+        },
+    )
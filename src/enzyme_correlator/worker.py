@@ -0,0 +1,116 @@
+"""
+Background worker that only computes the most recent request.
+
+Interactive controls such as the cutoff slider fire far more often than a
+large dataset can be regrouped. :class:`CoalescingWorker` runs the work on one
+background thread and keeps a single pending slot: a new request replaces a
+pending one that has not started yet, so dragging a slider computes only the
+value it comes to rest on. Finished results are picked up with
+:meth:`CoalescingWorker.result` from the thread that owns the display, which
+for Tk is a callback scheduled with ``after``.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable
+from typing import Generic, TypeVar
+
+__all__ = ["CoalescingWorker"]
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class CoalescingWorker(Generic[T, R]):
+    """Run ``function`` on a background thread, dropping stale requests."""
+
+    def __init__(self, function: Callable[[T], R]) -> None:
+        """Initialize the worker; the thread starts on the first request.
+
+        Args:
+            function: Computation to run for every request that is not
+                superseded before it starts.
+        """
+        self.function = function
+        self._condition = threading.Condition()
+        self._pending: tuple[T] | None = None
+        self._finished: tuple[T, R] | None = None
+        self._failure: BaseException | None = None
+        self._busy = False
+        self._closed = False
+        self._thread: threading.Thread | None = None
+
+    def submit(self, request: T) -> None:
+        """Queue ``request``, replacing a pending request that has not started."""
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("worker is closed")
+            self._pending = (request,)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+
+    def result(self) -> tuple[T, R] | None:
+        """Return the latest finished ``(request, result)`` once, or None.
+
+        Raises:
+            BaseException: The error raised by ``function``, if the latest
+                computation failed.
+        """
+        with self._condition:
+            finished, self._finished = self._finished, None
+            failure, self._failure = self._failure, None
+        if failure is not None:
+            raise failure
+        return finished
+
+    @property
+    def idle(self) -> bool:
+        """Whether no request is pending or running."""
+        with self._condition:
+            return self._pending is None and not self._busy
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until the worker is idle.
+
+        Returns:
+            Whether the worker became idle before the timeout.
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._pending is None and not self._busy, timeout
+            )
+
+    def close(self) -> None:
+        """Stop the thread after the running computation; pending requests are dropped."""
+        with self._condition:
+            self._closed = True
+            self._pending = None
+            self._condition.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending is not None or self._closed)
+                if self._closed:
+                    return
+                assert self._pending is not None
+                (request,) = self._pending
+                self._pending = None
+                self._busy = True
+            try:
+                outcome = self.function(request)
+            except Exception as error:  # noqa: BLE001 - handed to the caller of result()
+                with self._condition:
+                    self._failure = error
+                    self._finished = None
+            else:
+                with self._condition:
+                    self._finished = (request, outcome)
+                    self._failure = None
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
@@ -0,0 +1,248 @@
+"""Tests for the display-free analysis core."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from enzyme_correlator.analysis import (
+    AnalysisResult,
+    analyze_file,
+    bin_correlations,
+    correlation_matrix,
+    histogram_axis,
+    histogram_counts,
+    histogram_values,
+    read_activity_csv,
+)
+from enzyme_correlator.correlation import CondensedMatrix
+
+SAMPLE_CSV = """;Substrate1;Substrate2;Substrate3;Substrate4
+Enzyme1;0,90;0,85;0,80;0,75
+Enzyme2;0,88;0,92;0,78;0,82
+Enzyme3;0,20;0,25;0,30;0,35
+Enzyme4;0,91;0,87;0,83;0,79
+"""
+
+
+@pytest.fixture
+def sample_csv_path(tmp_path: Path) -> Path:
+    """Write the sample export to a temporary file."""
+    path = tmp_path / "sample.csv"
+    path.write_text(SAMPLE_CSV)
+    return path
+
+
+class TestReadActivityCsv:
+    """Tests for the read_activity_csv function."""
+
+    def test_layout_is_substrates_by_enzymes(self, sample_csv_path: Path) -> None:
+        """Test that substrates become rows and enzymes become columns."""
+        df = read_activity_csv(sample_csv_path)
+
+        assert list(df.columns) == ["Enzyme1", "Enzyme2", "Enzyme3", "Enzyme4"]
+        assert list(df.index) == ["Substrate1", "Substrate2", "Substrate3", "Substrate4"]
+
+    def test_decimal_comma(self, sample_csv_path: Path) -> None:
+        """Test that comma decimal separators are converted."""
+        df = read_activity_csv(sample_csv_path)
+
+        assert df.loc["Substrate2", "Enzyme2"] == pytest.approx(0.92)
+
+
+class TestHistogramValues:
+    """Tests for the histogram helpers."""
+
+    def test_lower_triangle_row_major(self) -> None:
+        """Test that values are collected row by row below the diagonal."""
+        matrix = np.array([[1.0, 0.0, 0.0], [0.1, 1.0, 0.0], [0.2, 0.3, 1.0]])
+
+        np.testing.assert_array_equal(histogram_values(matrix), [0.1, 0.2, 0.3])
+
+    def test_axis_covers_unit_interval(self) -> None:
+        """Test that bin edges run from -1 to 1."""
+        axis = histogram_axis()
+
+        assert axis[0] == pytest.approx(-1.0)
+        assert axis[-1] == pytest.approx(1.0)
+
+
+class TestBinCorrelations:
+    """Tests for the bin_correlations function."""
+
+    def test_rounded_and_nan_skipped(self) -> None:
+        """Test that values are rounded before binning and NaN is not counted."""
+        counts = bin_correlations(np.array([0.854, 0.856, np.nan]))
+
+        assert counts.sum() == 2
+        assert counts.dtype == np.int64
+        assert (
+            np.flatnonzero(counts).tolist()
+            == np.flatnonzero(np.histogram([0.85, 0.86], bins=histogram_axis())[0]).tolist()
+        )
+
+
+class TestHistogramCounts:
+    """Tests for the histogram_counts function."""
+
+    def test_matches_binning_all_values(self) -> None:
+        """Test that tiled counting equals binning the rounded lower triangle at once."""
+        rng = np.random.default_rng(3)
+        matrix = np.corrcoef(rng.random((25, 6)))
+        expected, _ = np.histogram(np.round(histogram_values(matrix), 2), bins=histogram_axis())
+
+        np.testing.assert_array_equal(histogram_counts(matrix, tile_size=4), expected)
+
+    def test_condensed_matrix(self) -> None:
+        """Test that condensed float32 values are counted like the dense matrix."""
+        rng = np.random.default_rng(3)
+        matrix = np.corrcoef(rng.random((25, 6)))
+
+        counts = histogram_counts(CondensedMatrix.from_dense(matrix), tile_size=4)
+
+        np.testing.assert_array_equal(counts, histogram_counts(matrix))
+
+    def test_nan_not_counted(self) -> None:
+        """Test that undefined correlations are skipped."""
+        matrix = np.array([[1.0, np.nan], [np.nan, 1.0]])
+
+        assert histogram_counts(matrix).sum() == 0
+
+
+class TestAnalyzeFile:
+    """Tests for the analyze_file function."""
+
+    def test_result_fields(self, sample_csv_path: Path) -> None:
+        """Test that the analysis carries matrix, histogram and grouping."""
+        result = analyze_file(sample_csv_path, cutoff=0.85)
+
+        assert isinstance(result, AnalysisResult)
+        assert result.enzyme_names == ("Enzyme1", "Enzyme2", "Enzyme3", "Enzyme4")
+        assert result.correlation_matrix.shape == (4, 4)
+        assert result.histogram_counts.sum() == 6
+        assert not result.out_of_core
+        np.testing.assert_array_equal(
+            result.correlation_matrix, correlation_matrix(read_activity_csv(sample_csv_path))
+        )
+
+    def test_out_of_core(self, sample_csv_path: Path, tmp_path: Path) -> None:
+        """Test that the out-of-core mode gives the same results from a memory-mapped matrix."""
+        in_memory = analyze_file(sample_csv_path, cutoff=0.85)
+
+        result = analyze_file(
+            sample_csv_path, cutoff=0.85, matrix_path=tmp_path / "corr.npy", tile_size=3
+        )
+
+        assert result.out_of_core
+        assert (tmp_path / "corr.npy").is_file()
+        np.testing.assert_array_equal(result.correlation_matrix, in_memory.correlation_matrix)
+        np.testing.assert_array_equal(result.histogram_counts, in_memory.histogram_counts)
+        assert result.grouping == in_memory.grouping
+
+    def test_compact(self, sample_csv_path: Path) -> None:
+        """Test that compact storage keeps a condensed matrix with the same results."""
+        in_memory = analyze_file(sample_csv_path, cutoff=0.85)
+
+        result = analyze_file(sample_csv_path, cutoff=0.85, compact=True)
+
+        assert isinstance(result.correlations, CondensedMatrix)
+        np.testing.assert_array_equal(result.correlation_matrix, in_memory.correlation_matrix)
+        np.testing.assert_array_equal(result.histogram_counts, in_memory.histogram_counts)
+        assert result.grouping == in_memory.grouping
+
+    def test_compact_and_out_of_core_exclusive(self, sample_csv_path: Path, tmp_path: Path) -> None:
+        """Test that compact storage cannot be combined with a matrix file."""
+        with pytest.raises(ValueError, match="compact"):
+            analyze_file(sample_csv_path, compact=True, matrix_path=tmp_path / "corr.npy")
+
+    def test_rank_methods(self, sample_csv_path: Path) -> None:
+        """Test that the method selects the correlation engine of the analysis."""
+        df = read_activity_csv(sample_csv_path)
+
+        for method in ("spearman", "kendall"):
+            result = analyze_file(sample_csv_path, method=method)
+
+            np.testing.assert_array_equal(
+                result.correlation_matrix, correlation_matrix(df, method=method)
+            )
+
+    def test_spearman_in_compact_and_out_of_core(
+        self, sample_csv_path: Path, tmp_path: Path
+    ) -> None:
+        """Test that Spearman gives the same results in every storage mode."""
+        in_memory = analyze_file(sample_csv_path, method="spearman")
+
+        compact = analyze_file(sample_csv_path, method="spearman", compact=True)
+        tiled = analyze_file(
+            sample_csv_path, method="spearman", matrix_path=tmp_path / "corr.npy", tile_size=3
+        )
+
+        for result in (compact, tiled):
+            np.testing.assert_array_equal(result.correlation_matrix, in_memory.correlation_matrix)
+            assert result.grouping == in_memory.grouping
+
+    def test_kendall_only_in_memory(self, sample_csv_path: Path, tmp_path: Path) -> None:
+        """Test that Kendall's tau rejects compact and out-of-core storage."""
+        with pytest.raises(ValueError, match="Kendall"):
+            analyze_file(sample_csv_path, method="kendall", compact=True)
+        with pytest.raises(ValueError, match="Kendall"):
+            analyze_file(sample_csv_path, method="kendall", matrix_path=tmp_path / "corr.npy")
+
+    def test_missing_activities(self, tmp_path: Path) -> None:
+        """Test that blank cells are left out pair by pair and overlaps are reported."""
+        path = tmp_path / "gaps.csv"
+        path.write_text(";S1;S2;S3;S4\nE1;1;2;3;4\nE2;2;;6;8,5\nE3;4;3;;1\nE4;;;1;\n")
+
+        result = analyze_file(path)
+
+        expected = read_activity_csv(path).corr().to_numpy().round(2)
+        np.testing.assert_array_equal(result.correlation_matrix, expected)
+        assert result.overlap is not None
+        assert result.overlap[0, 1] == 3
+        assert result.overlap[3, 3] == 1
+        assert analyze_file(path, compact=True).overlap is None
+
+    def test_spearman_with_gaps_only_in_memory(self, tmp_path: Path) -> None:
+        """Test that Spearman with missing activities rejects compact storage."""
+        path = tmp_path / "gaps.csv"
+        path.write_text(";S1;S2;S3\nE1;1;2;3\nE2;2;;6\n")
+
+        with pytest.raises(ValueError, match="Spearman"):
+            analyze_file(path, method="spearman", compact=True)
+        assert analyze_file(path, method="spearman").overlap is not None
+
+    def test_unknown_method(self, sample_csv_path: Path) -> None:
+        """Test that an unknown correlation method is rejected."""
+        with pytest.raises(ValueError, match="unknown correlation method"):
+            analyze_file(sample_csv_path, method="distance")
+
+    def test_core_does_not_import_tkinter(self) -> None:
+        """Test that the analysis core and batch CLI can be imported without tkinter."""
+        code = (
+            "import sys, enzyme_correlator, enzyme_correlator.batch; "
+            "sys.exit('tkinter' in sys.modules)"
+        )
+        completed = subprocess.run([sys.executable, "-c", code], check=False)
+
+        assert completed.returncode == 0
+
+    @pytest.mark.parametrize(
+        ("statement", "unloaded"),
+        [
+            ("import enzyme_correlator", ("numpy", "pandas", "matplotlib", "tkinter")),
+            ("from enzyme_correlator import pearson_matrix", ("pandas", "matplotlib")),
+            ("import enzyme_correlator.batch", ("matplotlib", "tkinter")),
+        ],
+    )
+    def test_heavy_dependencies_load_lazily(
+        self, statement: str, unloaded: tuple[str, ...]
+    ) -> None:
+        """Test that imports only load the dependencies their names need."""
+        code = f"import sys; {statement}; sys.exit(any(m in sys.modules for m in {unloaded!r}))"
+        completed = subprocess.run([sys.executable, "-c", code], check=False)
+
+        assert completed.returncode == 0
@@ -0,0 +1,208 @@
+"""Tests for the headless batch command line."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+from PIL import Image
+
+from enzyme_correlator.analysis import analyze_file, correlation_matrix, read_activity_csv
+from enzyme_correlator.batch import compare, main
+from enzyme_correlator.significance import assess_significance
+
+SAMPLE_CSV = """;Substrate1;Substrate2;Substrate3;Substrate4
+Enzyme1;0,90;0,85;0,80;0,75
+Enzyme2;0,88;0,92;0,78;0,82
+Enzyme3;0,20;0,25;0,30;0,35
+Enzyme4;0,91;0,87;0,83;0,79
+"""
+
+
+@pytest.fixture
+def input_dir(tmp_path: Path) -> Path:
+    """Create a directory holding two sample exports."""
+    directory = tmp_path / "plates"
+    directory.mkdir()
+    for name in ("plate1", "plate2"):
+        (directory / f"{name}.csv").write_text(SAMPLE_CSV)
+    return directory
+
+
+class TestBatchMain:
+    """Tests for the batch entry point."""
+
+    def test_writes_all_outputs(self, input_dir: Path, tmp_path: Path) -> None:
+        """Test that every input gets a matrix, a grouping and two figures."""
+        output_dir = tmp_path / "out"
+
+        main([str(input_dir), "-o", str(output_dir), "-j", "1"])
+
+        for name in ("plate1", "plate2"):
+            for suffix in (
+                "_correlation.csv",
+                "_grouping.csv",
+                "_correlation.png",
+                "_histogram.png",
+            ):
+                assert (output_dir / f"{name}{suffix}").is_file()
+
+    def test_matrix_csv_uses_input_format(self, input_dir: Path, tmp_path: Path) -> None:
+        """Test that the written matrix is semicolon-delimited with decimal commas."""
+        output_dir = tmp_path / "out"
+
+        main([str(input_dir), "-o", str(output_dir), "-j", "1", "--no-plots"])
+
+        lines = (output_dir / "plate1_correlation.csv").read_text().splitlines()
+        assert lines[0] == ";Enzyme1;Enzyme2;Enzyme3;Enzyme4"
+        assert lines[1].startswith("Enzyme1;1,0;")
+        assert not (output_dir / "plate1_correlation.png").exists()
+
+    def test_out_of_core(self, input_dir: Path, tmp_path: Path) -> None:
+        """Test that out-of-core mode writes a memory-mappable matrix instead of a CSV."""
+        output_dir = tmp_path / "out"
+
+        main(
+            [str(input_dir), "-o", str(output_dir), "-j", "1", "--out-of-core", "--tile-size", "2"]
+        )
+
+        matrix = np.load(output_dir / "plate1_correlation.npy", mmap_mode="r")
+        assert matrix.shape == (4, 4)
+        assert (output_dir / "plate1_grouping.csv").is_file()
+        assert (output_dir / "plate1_histogram.png").is_file()
+        assert not (output_dir / "plate1_correlation.csv").exists()
+        assert not (output_dir / "plate1_correlation.png").exists()
+
+    def test_method(self, input_dir: Path, tmp_path: Path) -> None:
+        """Test that the selected method's matrix is written."""
+        output_dir = tmp_path / "out"
+
+        main([str(input_dir), "-o", str(output_dir), "-j", "1", "--no-plots", "-m", "kendall"])
+
+        matrix = pd.read_csv(
+            output_dir / "plate1_correlation.csv", sep=";", decimal=",", index_col=0
+        )
+        expected = correlation_matrix(read_activity_csv(input_dir / "plate1.csv"), method="kendall")
+        np.testing.assert_array_equal(matrix.to_numpy(), expected)
+
+    def test_significance(self, input_dir: Path, tmp_path: Path) -> None:
+        """Test that resampling writes one row of group statistics per group."""
+        output_dir = tmp_path / "out"
+
+        main([str(input_dir), "-o", str(output_dir), "-j", "1", "--no-plots", "--resamples", "50"])
+
+        table = pd.read_csv(output_dir / "plate1_significance.csv", sep=";", decimal=",")
+        assert list(table.columns) == [
+            "Group",
+            "Enzymes",
+            "Mean correlation",
+            "P-value",
+            "Lower",
+            "Upper",
+        ]
+        assert len(table) == 1
+        assert 0 < table.loc[0, "P-value"] <= 1
+
+    def test_edge_list(self, input_dir: Path, tmp_path: Path) -> None:
+        """Test that the pairs reaching the cutoff are written as an edge list."""
+        output_dir = tmp_path / "out"
+
+        main([str(input_dir), "-o", str(output_dir), "-j", "1", "--no-plots", "--edges"])
+
+        edges = pd.read_csv(output_dir / "plate1_edges.csv", sep=";", decimal=",")
+        assert list(edges.columns) == ["Source", "Target", "Correlation"]
+        grouping = pd.read_csv(output_dir / "plate1_grouping.csv", sep=";")
+        assert set(edges["Source"]) | set(edges["Target"]) == set(grouping["Enzyme"])
+        assert (edges["Correlation"] >= 0.85).all()
+
+    def test_raster_heatmap(self, input_dir: Path, tmp_path: Path) -> None:
+        """Test that --raster colors one pixel per cell, also out of core."""
+        output_dir = tmp_path / "out"
+
+        main([str(input_dir), "-o", str(output_dir), "-j", "1", "--raster", "--out-of-core"])
+
+        with Image.open(output_dir / "plate1_correlation.png") as image:
+            enzymes = len(pd.read_csv(input_dir / "plate1.csv", sep=";", index_col=0))
+            assert image.size == (enzymes, enzymes)
+
+    def test_compare(
+        self, input_dir: Path, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Test that compared files get their results and a joint membership table."""
+        output_dir = tmp_path / "out"
+
+        main([str(input_dir), "-o", str(output_dir), "-j", "2", "--no-plots", "--compare"])
+
+        membership = pd.read_csv(output_dir / "comparison.csv", sep=";", index_col="Enzyme")
+        assert list(membership.columns) == ["plate1", "plate2"]
+        assert (membership["plate1"] == membership["plate2"]).all()
+        assert (output_dir / "plate2_grouping.csv").is_file()
+        assert "Enzymes whose group-mates differ: 0" in capsys.readouterr().out
+
+    def test_compare_returns_report(
+        self, input_dir: Path, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Test that the library function returns the comparison instead of printing it."""
+        comparison, written = compare(sorted(input_dir.glob("*.csv")), tmp_path, plots=False)
+
+        assert comparison.labels == ("plate1", "plate2")
+        assert tmp_path / "comparison.csv" in written
+        assert capsys.readouterr().out == ""
+
+    def test_resamples_use_jobs(self, input_dir: Path, tmp_path: Path) -> None:
+        """Test that a single file spreads its resamples over the requested workers."""
+        with patch(
+            "enzyme_correlator.batch.assess_significance", wraps=assess_significance
+        ) as mock_assess:
+            main(
+                [str(input_dir), "-o", str(tmp_path), "--pattern", "plate1.csv"]
+                + ["-j", "3", "--no-plots", "--resamples", "5"]
+            )
+
+        assert mock_assess.call_args.kwargs["jobs"] == 3
+        assert (tmp_path / "plate1_significance.csv").is_file()
+
+    def test_matrix_uses_jobs(self, input_dir: Path, tmp_path: Path) -> None:
+        """Test that a single file computes its rank correlations on the requested workers."""
+        with patch("enzyme_correlator.batch.analyze_file", wraps=analyze_file) as mock_analyze:
+            main(
+                [str(input_dir), "-o", str(tmp_path), "--pattern", "plate1.csv"]
+                + ["-j", "3", "--no-plots", "--method", "kendall"]
+            )
+
+        assert mock_analyze.call_args.kwargs["jobs"] == 3
+
+    def test_compare_resamples_use_jobs(self, input_dir: Path, tmp_path: Path) -> None:
+        """Test that compared files compute their resamples on the requested workers."""
+        with patch(
+            "enzyme_correlator.batch.assess_significance", wraps=assess_significance
+        ) as mock_assess:
+            compare(sorted(input_dir.glob("*.csv")), tmp_path, plots=False, resamples=5, jobs=2)
+
+        assert [call.kwargs["jobs"] for call in mock_assess.call_args_list] == [2, 2]
+
+    def test_compare_rejects_out_of_core(self, input_dir: Path) -> None:
+        """Test that comparison needs in-memory matrices."""
+        with pytest.raises(SystemExit):
+            main([str(input_dir), "--compare", "--out-of-core"])
+
+    def test_parallel_workers(self, input_dir: Path) -> None:
+        """Test that files are processed in a process pool and written to the default directory."""
+        main([str(input_dir), "-j", "2", "--no-plots"])
+
+        assert (input_dir / "results" / "plate2_grouping.csv").is_file()
+
+    def test_failures_exit_nonzero(self, input_dir: Path, tmp_path: Path) -> None:
+        """Test that a malformed file is reported and fails the run."""
+        (input_dir / "broken.csv").write_text(";S1\nEnzyme1;not a number\n")
+
+        with pytest.raises(SystemExit, match="1 of 3 files failed"):
+            main([str(input_dir), "-o", str(tmp_path / "out"), "-j", "1", "--no-plots"])
+
+    def test_empty_directory(self, tmp_path: Path) -> None:
+        """Test that a directory without matching files is an error."""
+        with pytest.raises(SystemExit, match="No files matching"):
+            main([str(tmp_path)])
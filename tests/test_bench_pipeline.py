@@ -0,0 +1,113 @@
+"""Tests for the pipeline benchmark harness."""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import sys
+from pathlib import Path
+from types import ModuleType
+
+import pytest
+
+from enzyme_correlator.parsing import read_activity_csv
+
+
+@pytest.fixture(scope="module")
+def bench() -> ModuleType:
+    """Import ``benchmarks/bench_pipeline.py``, which is not part of the package."""
+    path = Path(__file__).parents[1] / "benchmarks" / "bench_pipeline.py"
+    spec = importlib.util.spec_from_file_location("bench_pipeline", path)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def report(bench: ModuleType, tmp_path: Path) -> Path:
+    """Results of the default stages on a 10 x 5 panel."""
+    output = tmp_path / "results.json"
+    bench.main(
+        ["--enzymes", "10", "--substrates", "5", "--repeat", "1", "--no-startup"]
+        + ["--output", str(output)]
+    )
+    return output
+
+
+class TestWritePanel:
+    """Tests for the write_panel function."""
+
+    def test_reads_as_export(self, bench: ModuleType, tmp_path: Path) -> None:
+        """Test that the synthetic panel parses like a plate reader export."""
+        bench.write_panel(tmp_path / "panel.csv", enzymes=12, substrates=4)
+
+        df = read_activity_csv(tmp_path / "panel.csv")
+
+        assert df.shape == (4, 12)
+        assert df.columns[0] == "Enzyme1"
+        assert not df.isna().any().any()
+
+
+class TestMain:
+    """Tests for the benchmark command line."""
+
+    def test_report_schema(self, bench: ModuleType, report: Path) -> None:
+        """Test that every default stage is recorded with its time and peak memory."""
+        saved = json.loads(report.read_text())
+
+        assert saved["metadata"]["preset"] == "custom"
+        assert saved["metadata"]["skipped"] == []
+        assert [record["stage"] for record in saved["results"]] == list(bench.STAGES)
+        for record in saved["results"]:
+            assert set(record) == {"enzymes", "substrates", "stage", "seconds", "peak_bytes"}
+            assert (record["enzymes"], record["substrates"]) == (10, 5)
+            assert record["seconds"] >= 0
+            assert record["peak_bytes"] >= 0
+
+    def test_baseline_regression_flagged(
+        self, bench: ModuleType, report: Path, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Test that a stage using far more memory than the baseline fails the run."""
+        saved = json.loads(report.read_text())
+        for record in saved["results"]:
+            record["peak_bytes"] = 0
+        baseline = tmp_path / "baseline.json"
+        baseline.write_text(json.dumps(saved))
+
+        with pytest.raises(SystemExit) as exc_info:
+            bench.main(
+                ["--enzymes", "10", "--substrates", "5", "--repeat", "1", "--no-startup"]
+                + ["--skip", "plot_correlation", "--baseline", str(baseline)]
+            )
+
+        assert exc_info.value.code == 1
+        assert "REGRESSION compute_correlation_matrix (10 x 5)" in capsys.readouterr().err
+
+    def test_full_excludes_panel_sizes(self, bench: ModuleType) -> None:
+        """Test that --full cannot be combined with explicit panel sizes."""
+        with pytest.raises(SystemExit):
+            bench.main(["--full", "--enzymes", "10"])
+
+
+class TestCompare:
+    """Tests for the compare function."""
+
+    def test_tolerance(self, bench: ModuleType) -> None:
+        """Test that only increases beyond the tolerance of measurable stages are reported."""
+        record = {"enzymes": 10, "substrates": 5, "stage": "sort_into_groups"}
+        baseline = [{**record, "seconds": 0.1, "peak_bytes": 2**20}]
+
+        assert bench.compare([{**record, "seconds": 0.12, "peak_bytes": 2**20}], baseline) == []
+        assert bench.compare([{**record, "seconds": 0.2, "peak_bytes": 2**20}], baseline) == [
+            "sort_into_groups (10 x 5): 0.1000 s -> 0.2000 s"
+        ]
+        assert len(bench.compare([{**record, "seconds": 0.1, "peak_bytes": 2**21}], baseline)) == 1
+
+    def test_noise_and_new_stages_ignored(self, bench: ModuleType) -> None:
+        """Test that stages too fast to time or missing from the baseline are not flagged."""
+        record = {"enzymes": 10, "substrates": 5, "stage": "compute_histogram", "peak_bytes": 0}
+
+        assert bench.compare([{**record, "seconds": 0.004}], [{**record, "seconds": 0.001}]) == []
+        assert bench.compare([{**record, "seconds": 1.0}], []) == []
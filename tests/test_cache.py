@@ -0,0 +1,141 @@
+"""Tests for the on-disk result cache."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from enzyme_correlator.cache import ResultCache, default_cache_dir, file_digest
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> ResultCache:
+    """Create a cache in a temporary directory."""
+    return ResultCache(tmp_path / "cache")
+
+
+@pytest.fixture
+def data_file(tmp_path: Path) -> Path:
+    """Create a small input file."""
+    path = tmp_path / "plate.csv"
+    path.write_text(";S1\nE1;1,0\n")
+    return path
+
+
+class TestCacheKey:
+    """Tests for cache keys."""
+
+    def test_key_depends_on_content_and_settings(self, cache: ResultCache, data_file: Path) -> None:
+        """Test that keys change with file content and with settings."""
+        key = cache.key(data_file, lower_triangle_only=False)
+
+        assert key == cache.key(data_file, lower_triangle_only=False)
+        assert key != cache.key(data_file, lower_triangle_only=True)
+        data_file.write_text(";S1\nE1;2,0\n")
+        assert key != cache.key(data_file, lower_triangle_only=False)
+
+    def test_file_digest_ignores_path(self, tmp_path: Path, data_file: Path) -> None:
+        """Test that the digest only depends on the file content."""
+        copy = tmp_path / "copy.csv"
+        copy.write_bytes(data_file.read_bytes())
+
+        assert file_digest(copy) == file_digest(data_file)
+
+    def test_default_dir_override(self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+        """Test that the environment variable selects the cache directory."""
+        monkeypatch.setenv("ENZYME_CORRELATOR_CACHE_DIR", str(tmp_path))
+
+        assert default_cache_dir() == tmp_path
+
+
+class TestResultCache:
+    """Tests for the ResultCache class."""
+
+    def test_round_trip_is_memory_mapped(self, cache: ResultCache) -> None:
+        """Test that stored arrays come back memory-mapped with their metadata."""
+        matrix = np.arange(9, dtype=np.float64).reshape(3, 3)
+
+        cache.store("k", {"matrix": matrix}, {"names": ["a", "b", "c"]})
+        entry = cache.load("k")
+
+        assert entry is not None
+        assert isinstance(entry.arrays["matrix"], np.memmap)
+        np.testing.assert_array_equal(entry.arrays["matrix"], matrix)
+        assert entry.metadata == {"names": ["a", "b", "c"]}
+
+    def test_miss(self, cache: ResultCache) -> None:
+        """Test that an unknown key is a miss."""
+        assert cache.load("missing") is None
+
+    def test_invalidate_and_clear(self, cache: ResultCache) -> None:
+        """Test that entries can be removed one by one or all at once."""
+        cache.store("a", {"x": np.zeros(2)})
+        cache.store("b", {"x": np.zeros(2)})
+
+        assert cache.invalidate("a")
+        assert not cache.invalidate("a")
+        assert cache.load("a") is None
+        cache.clear()
+        assert cache.load("b") is None
+        assert cache.size() == 0
+
+    def test_lru_eviction(self, tmp_path: Path) -> None:
+        """Test that the least recently used entry is evicted first."""
+        entry_bytes = np.zeros(1000).nbytes
+        cache = ResultCache(tmp_path / "cache", size_limit=int(2.5 * entry_bytes) + 1024)
+        cache.store("a", {"x": np.zeros(1000)})
+        cache.store("b", {"x": np.zeros(1000)})
+        os.utime(cache.directory / "a" / "meta.json", (1, 1))
+        os.utime(cache.directory / "b" / "meta.json", (2, 2))
+        assert cache.load("a") is not None
+
+        cache.store("c", {"x": np.zeros(1000)})
+
+        assert cache.load("a") is not None
+        assert cache.load("b") is None
+        assert cache.load("c") is not None
+        assert cache.size() <= cache.size_limit
+
+    def test_entries_in_use_survive_eviction(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a mapped entry Windows cannot delete is skipped and still counted."""
+        entry_bytes = np.zeros(1000).nbytes
+        cache = ResultCache(tmp_path / "cache", size_limit=int(2.5 * entry_bytes) + 1024)
+        cache.store("a", {"x": np.zeros(1000)})
+        cache.store("b", {"x": np.zeros(1000)})
+        os.utime(cache.directory / "a" / "meta.json", (1, 1))
+        os.utime(cache.directory / "b" / "meta.json", (2, 2))
+        held = cache.load("a")
+        mapped = {"a"}
+        unlink = Path.unlink
+
+        def refuse_mapped(path: Path, missing_ok: bool = False) -> None:
+            if path.parent.name in mapped and path.suffix == ".npy":
+                raise PermissionError(f"{path} is in use")
+            unlink(path, missing_ok=missing_ok)
+
+        monkeypatch.setattr(Path, "unlink", refuse_mapped)
+
+        cache.store("c", {"x": np.zeros(1000)})
+
+        assert held is not None
+        assert cache.load("a") is not None
+        assert cache.load("b") is None
+        assert cache.size() <= cache.size_limit
+        assert cache.clear() == 1
+        assert cache.load("c") is None
+        mapped.clear()
+        assert cache.clear() == 0
+        assert cache.size() == 0
+
+    def test_oversized_entry_not_stored(self, tmp_path: Path) -> None:
+        """Test that an entry larger than the whole cache is skipped."""
+        cache = ResultCache(tmp_path / "cache", size_limit=100)
+
+        cache.store("big", {"x": np.zeros(1000)})
+
+        assert cache.load("big") is None
@@ -0,0 +1,157 @@
+"""Tests for the side-by-side comparison of several datasets."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from enzyme_correlator.analysis import analyze
+from enzyme_correlator.comparison import (
+    DatasetComparison,
+    compare_datasets,
+    compare_files,
+    correlate_datasets,
+    format_comparison,
+)
+from enzyme_correlator.correlation import correlate
+
+
+@pytest.fixture
+def plates() -> list[pd.DataFrame]:
+    """Three plates of one panel; B leaves the group of A on the last, which misses D."""
+    substrates = [f"S{i}" for i in range(5)]
+    base = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
+    first = pd.DataFrame(
+        {"A": base, "B": base * 2, "C": base[::-1], "D": [1.0, 3.0, 2.0, 5.0, 4.0]},
+        index=substrates,
+    )
+    second = first.copy()
+    second.iloc[0, 3] = np.nan
+    third = first.drop(columns="D")
+    third["B"] = [5.0, 1.0, 4.0, 2.0, 3.0]
+    return [first, second, third]
+
+
+@pytest.fixture
+def comparison(plates: list[pd.DataFrame]) -> DatasetComparison:
+    """The three plates compared at a cutoff of 0.9."""
+    return compare_datasets(plates, ["p1", "p2", "p3"], cutoff=0.9)
+
+
+class TestCorrelateDatasets:
+    """Tests for the correlate_datasets function."""
+
+    @pytest.mark.parametrize("method", ["pearson", "spearman", "kendall"])
+    def test_shared_memory_workers(self, method: str, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that matrices computed by the shared-memory workers match in-process ones."""
+        monkeypatch.setattr("enzyme_correlator.comparison.PARALLEL_MIN_WORK", 0)
+        rng = np.random.default_rng(2)
+        arrays = [rng.random((8, 6)), rng.random((5, 9))]
+        arrays[1][2, 4] = np.nan
+
+        matrices = correlate_datasets(arrays, method=method, jobs=2)
+
+        for data, matrix in zip(arrays, matrices):
+            np.testing.assert_allclose(matrix, correlate(data, method))
+
+    def test_lower_triangle(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that the workers honour lower_triangle_only."""
+        monkeypatch.setattr("enzyme_correlator.comparison.PARALLEL_MIN_WORK", 0)
+        arrays = [np.random.default_rng(3).random((6, 4))] * 2
+
+        matrices = correlate_datasets(arrays, lower_triangle_only=True, jobs=2)
+
+        np.testing.assert_array_equal(matrices[1], np.tril(matrices[1]))
+
+    def test_small_datasets_stay_in_process(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that no worker processes are started for little work."""
+
+        def no_pool(jobs: int) -> None:
+            raise AssertionError(f"started {jobs} workers")
+
+        monkeypatch.setattr("enzyme_correlator.comparison.process_pool", no_pool)
+        arrays = [np.random.default_rng(4).random((6, 5))] * 2
+
+        matrices = correlate_datasets(arrays, jobs=4)
+
+        np.testing.assert_allclose(matrices[0], correlate(arrays[0]))
+
+    def test_unknown_method(self) -> None:
+        """Test that an unknown method is rejected before any worker starts."""
+        with pytest.raises(ValueError, match="unknown correlation method"):
+            correlate_datasets([np.ones((3, 3))], method="distance", jobs=2)
+
+
+class TestDatasetComparison:
+    """Tests for the DatasetComparison class."""
+
+    def test_results_match_single_analyses(
+        self, plates: list[pd.DataFrame], comparison: DatasetComparison
+    ) -> None:
+        """Test that every dataset is analyzed as on its own."""
+        for df, label in zip(plates, comparison.labels):
+            expected = analyze(df, cutoff=0.9)
+            assert comparison[label].grouping == expected.grouping
+            np.testing.assert_allclose(comparison[label].correlations, expected.correlations)
+
+    def test_membership(self, comparison: DatasetComparison) -> None:
+        """Test the group table with ungrouped and unmeasured enzymes."""
+        membership = comparison.membership()
+
+        assert list(membership.index) == ["A", "B", "C", "D"]
+        assert membership["p1"].tolist() == [0, 0, -1, -1]
+        assert membership["p3"].tolist()[:3] == [-1, -1, -1]
+        assert membership["p3"].isna().tolist() == [False, False, False, True]
+
+    def test_changed_enzymes(self, comparison: DatasetComparison) -> None:
+        """Test that only enzymes with different group-mates are reported."""
+        changed = comparison.changed_enzymes()
+
+        assert set(changed) == {"A", "B"}
+        assert changed["A"] == (frozenset("B"), frozenset("B"), frozenset())
+
+    def test_consistent_groups(self, plates: list[pd.DataFrame]) -> None:
+        """Test that groups found in every dataset are listed."""
+        comparison = compare_datasets(plates[:2], cutoff=0.9)
+
+        assert comparison.consistent_groups() == [("A", "B")]
+        assert comparison.changed_enzymes() == {}
+
+    def test_duplicate_labels(self, plates: list[pd.DataFrame]) -> None:
+        """Test that datasets need distinct labels."""
+        with pytest.raises(ValueError, match="label"):
+            compare_datasets(plates[:2], ["p1", "p1"])
+
+
+class TestCompareFiles:
+    """Tests for the compare_files function."""
+
+    def test_labels_from_file_names(self, plates: list[pd.DataFrame], tmp_path: Path) -> None:
+        """Test that files are read, labelled by name and correlated in parallel."""
+        paths = []
+        for name, df in zip(["plate1", "plate2"], plates):
+            path = tmp_path / f"{name}.csv"
+            df.T.to_csv(path, sep=";", decimal=",")
+            paths.append(path)
+
+        comparison = compare_files(paths, cutoff=0.9, jobs=2)
+
+        assert comparison.labels == ("plate1", "plate2")
+        assert comparison["plate2"].enzyme_names == ("A", "B", "C", "D")
+
+
+class TestFormatComparison:
+    """Tests for the format_comparison function."""
+
+    def test_summary(self, comparison: DatasetComparison) -> None:
+        """Test that the summary lists the datasets and the changed enzymes."""
+        text = format_comparison(comparison)
+
+        lines = text.splitlines()
+        assert lines[0] == "3 datasets: p1, p2, p3"
+        assert "Groups found in every dataset: 0" in lines
+        assert "Enzymes whose group-mates differ: 2" in lines
+        assert "  A: p1: B; p2: B; p3: ungrouped" in lines
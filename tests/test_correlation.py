@@ -0,0 +1,446 @@
+"""Tests for the vectorized correlation engines."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from enzyme_correlator.correlation import (
+    CondensedMatrix,
+    condensed_index,
+    correlate,
+    kendall_matrix,
+    lower_tiles,
+    overlap_counts,
+    pairwise_moments,
+    pearson_condensed,
+    pearson_equivalent,
+    pearson_matrix,
+    pearson_matrix_tiled,
+    rank_columns,
+    spearman_matrix,
+    standardize,
+    strict_lower_values,
+)
+
+
+@pytest.fixture
+def activity_block() -> np.ndarray:
+    """Create a reproducible substrates x enzymes activity block."""
+    rng = np.random.default_rng(2020)
+    return rng.random((12, 30))
+
+
+class TestStandardize:
+    """Tests for the standardize function."""
+
+    def test_columns_have_zero_mean_and_unit_norm(self, activity_block: np.ndarray) -> None:
+        """Test that every column is centered and scaled to unit norm."""
+        standardized = standardize(activity_block)
+
+        np.testing.assert_allclose(standardized.mean(axis=0), 0.0, atol=1e-12)
+        np.testing.assert_allclose(np.linalg.norm(standardized, axis=0), 1.0)
+
+    def test_constant_column_is_nan(self) -> None:
+        """Test that a zero-variance column has no defined standardization."""
+        block = np.array([[1.0, 2.0], [1.0, 3.0], [1.0, 5.0]])
+
+        standardized = standardize(block)
+
+        assert np.all(np.isnan(standardized[:, 0]))
+        assert not np.any(np.isnan(standardized[:, 1]))
+
+
+class TestPearsonMatrix:
+    """Tests for the pearson_matrix function."""
+
+    def test_matches_pandas(self, activity_block: np.ndarray) -> None:
+        """Test that the batched product reproduces pandas' Pearson correlation."""
+        expected = pd.DataFrame(activity_block).corr().to_numpy()
+
+        np.testing.assert_allclose(pearson_matrix(activity_block), expected, atol=1e-12)
+
+    @pytest.mark.parametrize(("value", "substrates"), [(0.1, 3), (0.1, 7), (0.3, 10)])
+    def test_inexact_constant_column_matches_pandas(
+        self, activity_block: np.ndarray, value: float, substrates: int
+    ) -> None:
+        """Test that a constant column whose mean rounds gets NaN, not 1 and ~0."""
+        block = activity_block[:substrates].copy()
+        block[:, 0] = value
+        expected = pd.DataFrame(block).corr().to_numpy()
+
+        matrix = pearson_matrix(block)
+
+        assert np.all(np.isnan(matrix[0]))
+        np.testing.assert_allclose(matrix, expected, atol=1e-12)
+
+    def test_values_clipped_to_unit_interval(self, activity_block: np.ndarray) -> None:
+        """Test that rounding noise never pushes values outside [-1, 1]."""
+        block = np.column_stack([activity_block[:, 0], 3 * activity_block[:, 0]])
+
+        matrix = pearson_matrix(block)
+
+        assert np.all(np.abs(matrix) <= 1.0)
+
+    def test_lower_triangle_only(self, activity_block: np.ndarray) -> None:
+        """Test that the strict upper triangle is zero when requested."""
+        matrix = pearson_matrix(activity_block, lower_triangle_only=True)
+
+        assert np.all(np.triu(matrix, k=1) == 0.0)
+        np.testing.assert_allclose(np.tril(matrix), np.tril(pearson_matrix(activity_block)))
+
+
+class TestLowerTiles:
+    """Tests for the lower_tiles function."""
+
+    def test_tiles_cover_lower_triangle_once(self) -> None:
+        """Test that every lower-triangle cell lies in exactly one tile."""
+        covered = np.zeros((10, 10), dtype=int)
+
+        for rows, columns in lower_tiles(10, tile_size=3):
+            covered[rows, columns] += 1
+
+        assert np.all(np.tril(covered) == np.tril(np.ones((10, 10), dtype=int)))
+        assert covered.max() == 1
+
+    def test_strict_lower_values(self) -> None:
+        """Test that diagonal tiles only contribute values below the diagonal."""
+        matrix = np.arange(16, dtype=np.float64).reshape(4, 4)
+
+        values = np.concatenate(
+            [strict_lower_values(matrix, rows, columns) for rows, columns in lower_tiles(4, 2)]
+        )
+
+        assert sorted(values.tolist()) == sorted(matrix[np.tril_indices(4, k=-1)].tolist())
+
+
+class TestPearsonMatrixTiled:
+    """Tests for the pearson_matrix_tiled function."""
+
+    def test_matches_in_memory_engine(self, activity_block: np.ndarray, tmp_path: Path) -> None:
+        """Test that the tiled memory-mapped matrix equals the in-memory one."""
+        matrix = pearson_matrix_tiled(activity_block, tmp_path / "corr.npy", tile_size=7)
+
+        assert isinstance(matrix, np.memmap)
+        np.testing.assert_allclose(matrix, pearson_matrix(activity_block), atol=1e-12)
+
+    def test_exactly_symmetric_on_disk(self, activity_block: np.ndarray, tmp_path: Path) -> None:
+        """Test that the stored matrix is exactly symmetric and loadable as .npy."""
+        pearson_matrix_tiled(activity_block, tmp_path / "corr.npy", tile_size=4)
+
+        stored = np.load(tmp_path / "corr.npy", mmap_mode="r")
+
+        np.testing.assert_array_equal(stored, stored.T)
+
+
+class TestCondensedMatrix:
+    """Tests for the CondensedMatrix class."""
+
+    def test_index_mapping(self) -> None:
+        """Test that condensed positions enumerate the lower triangle row by row."""
+        positions = [condensed_index(i, j) for i in range(5) for j in range(i)]
+
+        assert positions == list(range(10))
+        assert condensed_index(1, 3) == condensed_index(3, 1)
+
+    def test_round_trip(self, activity_block: np.ndarray) -> None:
+        """Test that condensing and expanding gives back the matrix in float32 precision."""
+        dense = pearson_matrix(activity_block)
+
+        condensed = CondensedMatrix.from_dense(dense)
+
+        np.testing.assert_allclose(condensed.to_dense(), dense, atol=1e-6)
+        assert condensed.nbytes < dense.nbytes / 3.5
+
+    def test_lower_triangle_only(self, activity_block: np.ndarray) -> None:
+        """Test that the upper triangle can be left at zero when expanding."""
+        condensed = CondensedMatrix.from_dense(pearson_matrix(activity_block))
+
+        dense = condensed.to_dense(np.float32, lower_triangle_only=True)
+
+        assert dense.dtype == np.float32
+        assert np.all(np.triu(dense, k=1) == 0)
+
+    def test_indexing_matches_dense(self, activity_block: np.ndarray) -> None:
+        """Test that integer and slice keys behave like on the dense matrix."""
+        dense = pearson_matrix(activity_block)
+        condensed = CondensedMatrix.from_dense(dense)
+
+        for key in [(slice(3, 9), slice(0, 30)), (4,), (slice(None), 7), (2, slice(5, None))]:
+            np.testing.assert_allclose(condensed[key], dense[key], atol=1e-6)
+        assert condensed[(5, 5)] == pytest.approx(1.0)
+        assert condensed[slice(10, 12), slice(10, 12)].shape == (2, 2)
+
+    def test_out_of_range_index(self) -> None:
+        """Test that integer keys outside the matrix raise IndexError."""
+        condensed = CondensedMatrix(np.zeros(3), np.ones(3))
+
+        with pytest.raises(IndexError):
+            condensed[3]
+
+    def test_value_count_checked(self) -> None:
+        """Test that mismatched parts raise ValueError."""
+        with pytest.raises(ValueError, match="4 x 4"):
+            CondensedMatrix(np.zeros(5), np.ones(4))
+
+
+class TestPearsonCondensed:
+    """Tests for the pearson_condensed function."""
+
+    @pytest.mark.parametrize("tile_size", [1, 7, 1024])
+    def test_matches_dense_engine(self, activity_block: np.ndarray, tile_size: int) -> None:
+        """Test that banded condensed computation equals the dense matrix."""
+        condensed = pearson_condensed(activity_block, tile_size=tile_size)
+
+        assert condensed.values.dtype == np.float32
+        np.testing.assert_allclose(condensed.to_dense(), pearson_matrix(activity_block), atol=1e-6)
+
+    def test_constant_enzyme_is_nan(self, activity_block: np.ndarray) -> None:
+        """Test that zero-variance enzymes keep NaN correlations."""
+        activity_block[:, 4] = 0.5
+
+        condensed = pearson_condensed(activity_block)
+
+        assert np.isnan(condensed[4]).all()
+        assert not np.isnan(condensed[5, 6])
+
+
+def reference_kendall(x: np.ndarray, y: np.ndarray) -> float:
+    """Compute Kendall's tau-b by comparing every pair of observations."""
+    concordant = discordant = x_only = y_only = 0
+    for i in range(len(x)):
+        for j in range(i):
+            dx, dy = np.sign(x[i] - x[j]), np.sign(y[i] - y[j])
+            if dx == 0 and dy == 0:
+                continue
+            if dx == 0:
+                x_only += 1
+            elif dy == 0:
+                y_only += 1
+            elif dx == dy:
+                concordant += 1
+            else:
+                discordant += 1
+    pairs = concordant + discordant
+    with np.errstate(invalid="ignore"):
+        return float((concordant - discordant) / np.sqrt((pairs + x_only) * (pairs + y_only)))
+
+
+@pytest.fixture
+def tied_block() -> np.ndarray:
+    """Create a block of small integers, so most columns contain ties."""
+    rng = np.random.default_rng(14)
+    return rng.integers(0, 5, (13, 9)).astype(float)
+
+
+class TestRankColumns:
+    """Tests for the rank_columns function."""
+
+    def test_ties_get_average_rank(self) -> None:
+        """Test that tied values share the mean of the ranks they occupy."""
+        ranks = rank_columns(np.array([[3.0], [1.0], [3.0], [2.0], [3.0]]))
+
+        np.testing.assert_array_equal(ranks.ravel(), [4.0, 1.0, 4.0, 2.0, 4.0])
+
+    def test_matches_pandas(self, tied_block: np.ndarray) -> None:
+        """Test that every column is ranked like pandas' average ranking."""
+        expected = pd.DataFrame(tied_block).rank().to_numpy()
+
+        np.testing.assert_array_equal(rank_columns(tied_block), expected)
+
+    def test_missing_values_are_not_ranked(self) -> None:
+        """Test that present values are ranked among themselves and NaN stays NaN."""
+        ranks = rank_columns(np.array([[1.0, 2.0], [np.nan, 1.0], [3.0, 5.0]]))
+
+        np.testing.assert_array_equal(ranks[:, 0], [1.0, np.nan, 2.0])
+        np.testing.assert_array_equal(ranks[:, 1], [2.0, 1.0, 3.0])
+
+
+class TestSpearmanMatrix:
+    """Tests for the spearman_matrix function."""
+
+    def test_matches_pandas(self, tied_block: np.ndarray) -> None:
+        """Test that Pearson on the ranks reproduces pandas' Spearman correlation."""
+        expected = pd.DataFrame(tied_block).corr(method="spearman").to_numpy()
+
+        np.testing.assert_allclose(spearman_matrix(tied_block), expected, atol=1e-12)
+
+    def test_monotonic_transform_is_perfectly_correlated(self) -> None:
+        """Test that a non-linear but monotonic relation has a coefficient of 1."""
+        x = np.linspace(0.1, 3.0, 10)
+
+        matrix = spearman_matrix(np.column_stack([x, np.exp(x), -(x**3)]))
+
+        np.testing.assert_allclose(matrix, [[1, 1, -1], [1, 1, -1], [-1, -1, 1]])
+
+
+class TestKendallMatrix:
+    """Tests for the kendall_matrix function."""
+
+    def test_matches_pairwise_reference(self, tied_block: np.ndarray) -> None:
+        """Test that tau-b with ties matches a direct count over all pairs."""
+        matrix = kendall_matrix(tied_block)
+
+        n = tied_block.shape[1]
+        for i in range(n):
+            for j in range(n):
+                expected = reference_kendall(tied_block[:, i], tied_block[:, j])
+                assert matrix[i, j] == pytest.approx(expected)
+
+    def test_without_ties(self, activity_block: np.ndarray) -> None:
+        """Test that tau is symmetric, has a unit diagonal and matches the reference."""
+        matrix = kendall_matrix(activity_block)
+
+        np.testing.assert_allclose(matrix, matrix.T)
+        np.testing.assert_allclose(np.diag(matrix), 1.0)
+        assert matrix[5, 2] == pytest.approx(
+            reference_kendall(activity_block[:, 5], activity_block[:, 2])
+        )
+
+    def test_batches_and_processes_do_not_change_result(
+        self, tied_block: np.ndarray, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that small batches and several worker processes give the same matrix."""
+        expected = kendall_matrix(tied_block)
+        monkeypatch.setattr("enzyme_correlator.correlation.PARALLEL_MIN_WORK", 0)
+
+        np.testing.assert_allclose(kendall_matrix(tied_block, batch_size=4), expected)
+        np.testing.assert_allclose(kendall_matrix(tied_block, jobs=2, batch_size=7), expected)
+
+    def test_small_data_stays_in_process(
+        self, tied_block: np.ndarray, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that no worker processes are started for little work."""
+
+        def no_pool(jobs: int) -> None:
+            raise AssertionError(f"started {jobs} workers")
+
+        monkeypatch.setattr("enzyme_correlator.correlation.process_pool", no_pool)
+
+        np.testing.assert_allclose(kendall_matrix(tied_block, jobs=8), kendall_matrix(tied_block))
+
+    def test_lower_triangle_only(self, tied_block: np.ndarray) -> None:
+        """Test that the strict upper triangle can be left at zero."""
+        matrix = kendall_matrix(tied_block, lower_triangle_only=True)
+
+        np.testing.assert_array_equal(matrix, np.tril(kendall_matrix(tied_block)))
+
+    def test_constant_column_is_nan(self) -> None:
+        """Test that a column without any order has no defined tau."""
+        block = np.array([[1.0, 2.0, 0.0], [1.0, 3.0, 1.0], [1.0, 5.0, 0.5]])
+
+        matrix = kendall_matrix(block)
+
+        assert np.all(np.isnan(matrix[0])) and np.all(np.isnan(matrix[:, 0]))
+        assert matrix[2, 1] == pytest.approx(1 / 3)
+
+
+class TestCorrelate:
+    """Tests for the correlate dispatcher."""
+
+    @pytest.mark.parametrize(
+        ("method", "engine"),
+        [("pearson", pearson_matrix), ("spearman", spearman_matrix), ("kendall", kendall_matrix)],
+    )
+    def test_dispatches_on_method(
+        self, tied_block: np.ndarray, method: str, engine: object
+    ) -> None:
+        """Test that every method name selects its engine."""
+        expected = engine(tied_block, lower_triangle_only=True)  # type: ignore[operator]
+
+        np.testing.assert_array_equal(
+            correlate(tied_block, method=method, lower_triangle_only=True), expected
+        )
+
+    def test_unknown_method(self, tied_block: np.ndarray) -> None:
+        """Test that an unknown method name is rejected."""
+        with pytest.raises(ValueError, match="unknown correlation method"):
+            correlate(tied_block, method="distance")
+
+
+@pytest.fixture
+def gapped_block() -> np.ndarray:
+    """Create a tied block with missing values, a sparse column and a nearly constant one."""
+    rng = np.random.default_rng(15)
+    block = rng.integers(0, 6, (15, 8)).astype(float)
+    block[rng.random(block.shape) < 0.25] = np.nan
+    block[:, 2] = np.nan
+    block[3, 2] = 1.0
+    block[:, 5] = 2.0
+    block[:3, 5] = [7.0, np.nan, np.nan]
+    return block
+
+
+class TestMissingValues:
+    """Tests for pairwise-complete correlation of data with missing values."""
+
+    @pytest.mark.parametrize("method", ["pearson", "spearman"])
+    def test_matches_pandas(self, gapped_block: np.ndarray, method: str) -> None:
+        """Test that every pair is correlated over the observations both columns have."""
+        expected = pd.DataFrame(gapped_block).corr(method=method).to_numpy()
+
+        np.testing.assert_allclose(
+            correlate(gapped_block, method=method), expected, atol=1e-12, equal_nan=True
+        )
+
+    def test_kendall_matches_pairwise_reference(self, gapped_block: np.ndarray) -> None:
+        """Test that Kendall's tau leaves out the observations missing from either column."""
+        matrix = kendall_matrix(gapped_block, batch_size=5)
+
+        n = gapped_block.shape[1]
+        for i in range(n):
+            for j in range(n):
+                present = ~np.isnan(gapped_block[:, i]) & ~np.isnan(gapped_block[:, j])
+                if present.sum() < 2:
+                    assert np.isnan(matrix[i, j])
+                    continue
+                expected = reference_kendall(gapped_block[present, i], gapped_block[present, j])
+                np.testing.assert_allclose(matrix[i, j], expected, equal_nan=True)
+
+    def test_spearman_in_processes(
+        self, gapped_block: np.ndarray, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that batched Spearman gives the same matrix in worker processes."""
+        monkeypatch.setattr("enzyme_correlator.correlation.PARALLEL_MIN_WORK", 0)
+        np.testing.assert_allclose(
+            spearman_matrix(gapped_block, jobs=2, batch_size=6),
+            spearman_matrix(gapped_block),
+            equal_nan=True,
+        )
+
+    def test_tiled_and_condensed(self, gapped_block: np.ndarray, tmp_path: Path) -> None:
+        """Test that tile-wise and condensed Pearson also handle missing values."""
+        expected = pearson_matrix(gapped_block)
+
+        tiled = pearson_matrix_tiled(gapped_block, tmp_path / "corr.npy", tile_size=3)
+        condensed = pearson_condensed(gapped_block, tile_size=3)
+
+        np.testing.assert_allclose(tiled, expected, equal_nan=True)
+        np.testing.assert_allclose(condensed.to_dense(), expected, atol=1e-6, equal_nan=True)
+
+    def test_overlap_counts(self) -> None:
+        """Test that each pair counts the observations present in both columns."""
+        block = np.array([[1.0, np.nan, 2.0], [2.0, 1.0, np.nan], [3.0, 2.0, 1.0]])
+
+        np.testing.assert_array_equal(overlap_counts(block), [[3, 2, 2], [2, 2, 1], [2, 1, 2]])
+
+    def test_moments_add_up_over_observations(self, gapped_block: np.ndarray) -> None:
+        """Test that the moments of two row sets sum to those of all rows."""
+        whole = pairwise_moments(gapped_block, gapped_block)
+        head = pairwise_moments(gapped_block[:6], gapped_block[:6])
+        tail = pairwise_moments(gapped_block[6:], gapped_block[6:])
+
+        for total, first, second in zip(whole, head, tail):
+            np.testing.assert_allclose(total, first + second)
+
+    def test_pearson_equivalent(self, tied_block: np.ndarray, gapped_block: np.ndarray) -> None:
+        """Test that only methods with a Pearson form get a block to correlate."""
+        np.testing.assert_array_equal(pearson_equivalent(tied_block, "pearson"), tied_block)
+        np.testing.assert_array_equal(
+            pearson_equivalent(tied_block, "spearman"), rank_columns(tied_block)
+        )
+        assert pearson_equivalent(gapped_block, "spearman") is None
+        assert pearson_equivalent(tied_block, "kendall") is None
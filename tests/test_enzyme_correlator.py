@@ -5,6 +5,7 @@ from __future__ import annotations
 import os
 import tempfile
 from collections.abc import Generator
+from pathlib import Path
 from typing import TYPE_CHECKING
 from unittest.mock import MagicMock, patch
 
@@ -16,6 +17,14 @@ if TYPE_CHECKING:
     from enzyme_correlator import EnzymeCorrelatorGUI
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Keep the result cache of every test in a temporary directory."""
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv("ENZYME_CORRELATOR_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
 @pytest.fixture
 def sample_csv_file() -> Generator[str, None, None]:
     """Create a temporary CSV file with sample enzyme data."""
@@ -37,7 +46,7 @@ Enzyme4;0,91;0,87;0,83;0,79
 @pytest.fixture
 def mock_tk() -> Generator[MagicMock, None, None]:
     """Mock tkinter for headless testing."""
-    with patch("enzyme_correlator.tk") as mock:
+    with patch("enzyme_correlator.gui.tk") as mock:
         mock_root = MagicMock()
         mock.Tk.return_value = mock_root
         mock.StringVar.return_value = MagicMock()
@@ -56,7 +65,7 @@ def mock_tk() -> Generator[MagicMock, None, None]:
 @pytest.fixture
 def mock_ttk() -> Generator[MagicMock, None, None]:
     """Mock ttk for headless testing."""
-    with patch("enzyme_correlator.ttk") as mock:
+    with patch("enzyme_correlator.gui.ttk") as mock:
         mock.Style.return_value = MagicMock()
         mock.Frame.return_value = MagicMock()
         mock.Button.return_value = MagicMock()
@@ -69,7 +78,10 @@ def gui_instance(
     mock_ttk: MagicMock,  # noqa: ARG001
 ) -> Generator[EnzymeCorrelatorGUI, None, None]:
     """Create a GUI instance with mocked tkinter."""
-    with patch("enzyme_correlator.filedialog"):
+    with (
+        patch("enzyme_correlator.gui.filedialog"),
+        patch("enzyme_correlator.gui.NavigationToolbar2Tk"),
+    ):
         from enzyme_correlator import EnzymeCorrelatorGUI
 
         mock_root = MagicMock()
@@ -172,25 +184,39 @@ class TestComputeCorrelationMatrix:
         assert np.all(matrix >= -1)
         assert np.all(matrix <= 1)
 
+    def test_correlation_matrix_matches_pairwise_series_corr(
+        self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str
+    ) -> None:
+        """Test that the vectorized engine gives the same numbers as pairwise Series.corr."""
+        gui_instance.datapath = sample_csv_file
+        gui_instance.import_data()
+        gui_instance.compute_correlation_matrix()
+
+        enzymes = gui_instance.enzyme_list
+        for i, enzyme1 in enumerate(enzymes):
+            for j, enzyme2 in enumerate(enzymes):
+                expected = round(float(enzyme1.corr(enzyme2)), 2)
+                assert gui_instance.enzyme_correlation_matrix[i][j] == expected
+
 
 class TestComputeHistogram:
     """Tests for the compute_histogram method."""
 
-    def test_histogram_list_populated(
+    def test_histogram_counts_one_per_bin(
         self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str
     ) -> None:
-        """Test that histogram list is populated."""
+        """Test that there is one count per histogram bin."""
         gui_instance.datapath = sample_csv_file
         gui_instance.import_data()
         gui_instance.compute_correlation_matrix()
         gui_instance.compute_histogram()
 
-        assert len(gui_instance.hist_list) > 0
+        assert len(gui_instance.hist_counts) == len(gui_instance.hist_axis) - 1
 
-    def test_histogram_list_lower_triangle_only(
+    def test_histogram_counts_lower_triangle_only(
         self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str
     ) -> None:
-        """Test that histogram contains only lower triangle values."""
+        """Test that histogram counts only lower triangle values."""
         gui_instance.datapath = sample_csv_file
         gui_instance.import_data()
         gui_instance.compute_correlation_matrix()
@@ -198,7 +224,23 @@ class TestComputeHistogram:
 
         n = len(gui_instance.enzyme_list)
         expected_count = n * (n - 1) // 2
-        assert len(gui_instance.hist_list) == expected_count
+        assert gui_instance.hist_counts.sum() == expected_count
+
+    def test_histogram_counts_match_binning_values(
+        self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str
+    ) -> None:
+        """Test that the counts equal binning the displayed lower-triangle values."""
+        from enzyme_correlator.analysis import histogram_values
+
+        gui_instance.datapath = sample_csv_file
+        gui_instance.import_data()
+        gui_instance.compute_correlation_matrix()
+        gui_instance.compute_histogram()
+
+        expected, _ = np.histogram(
+            histogram_values(gui_instance.enzyme_correlation_matrix), bins=gui_instance.hist_axis
+        )
+        np.testing.assert_array_equal(gui_instance.hist_counts, expected)
 
     def test_histogram_axis_range(
         self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str
@@ -262,6 +304,23 @@ class TestSortIntoGroups:
 
         assert high_cutoff_enzymes <= low_cutoff_enzymes
 
+    def test_grouping_queries_cutoff_index(
+        self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str
+    ) -> None:
+        """Test that changing the cutoff reuses the index built after the matrix."""
+        gui_instance.datapath = sample_csv_file
+        gui_instance.import_data()
+        gui_instance.compute_correlation_matrix()
+        index = gui_instance.build_cutoff_index()
+
+        gui_instance.cutoff.get = MagicMock(return_value="0.50")
+        gui_instance.sort_into_groups()
+        gui_instance.cutoff.get = MagicMock(return_value="0.99")
+        gui_instance.sort_into_groups()
+
+        assert gui_instance.cutoff_index is index
+        assert gui_instance.grouping == index.grouping(0.99)
+
 
 class TestGUICallbacks:
     """Tests for GUI callback methods."""
@@ -269,7 +328,7 @@ class TestGUICallbacks:
     def test_show_grouping_callback(
         self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str
     ) -> None:
-        """Test that show_grouping_button_callback runs without error."""
+        """Test that show_grouping_button_callback fills the group list."""
         gui_instance.datapath = sample_csv_file
         gui_instance.cutoff.get = MagicMock(return_value="0.85")
         gui_instance.import_data()
@@ -278,8 +337,31 @@ class TestGUICallbacks:
 
         gui_instance.show_grouping_button_callback()
 
-        gui_instance.grouping_label.delete.assert_called()
-        gui_instance.grouping_label.insert.assert_called()
+        assert gui_instance.group_view.shown == ["0        Enzyme1, Enzyme4"]
+        gui_instance.group_list.insert.assert_called_with(  # type: ignore[attr-defined]
+            0, "0        Enzyme1, Enzyme4"
+        )
+
+    def test_group_header_above_list(
+        self, gui_instance: EnzymeCorrelatorGUI, mock_ttk: MagicMock
+    ) -> None:
+        """Test that the column titles stay in a fixed label above the scrolling rows."""
+        mock_ttk.Label.assert_any_call(
+            gui_instance.group_frame, text="Group    Enzymes", font="TkFixedFont"
+        )
+
+    def test_group_search_callback(
+        self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str
+    ) -> None:
+        """Test that the search entry filters the group list by enzyme name."""
+        gui_instance.datapath = sample_csv_file
+        gui_instance.analyze_data()
+        gui_instance.show_grouping_button_callback()
+        gui_instance.group_search.get.return_value = "enzyme3"  # type: ignore[attr-defined]
+
+        gui_instance.group_search_callback()
+
+        assert gui_instance.group_view.shown == []
 
     def test_quit_callback(self, gui_instance: EnzymeCorrelatorGUI) -> None:
         """Test that quit_button_callback destroys root."""
@@ -292,7 +374,7 @@ class TestMainFunction:
 
     def test_main_creates_gui(self, mock_tk: MagicMock, mock_ttk: MagicMock) -> None:  # noqa: ARG002
         """Test that main() creates and runs the GUI."""
-        with patch("enzyme_correlator.filedialog"):
+        with patch("enzyme_correlator.gui.filedialog"), patch("sys.argv", ["enzyme-correlator"]):
             from enzyme_correlator import main
 
             mock_tk.Text.return_value = MagicMock()
@@ -303,6 +385,65 @@ class TestMainFunction:
             mock_tk.Tk.assert_called_once()
             mock_tk.Tk.return_value.mainloop.assert_called_once()
 
+    def test_profile_flag(self, mock_tk: MagicMock, mock_ttk: MagicMock) -> None:  # noqa: ARG002
+        """Test that --profile starts the GUI with an enabled profiler."""
+        from enzyme_correlator.gui import main
+
+        with (
+            patch("enzyme_correlator.gui.EnzymeCorrelatorGUI") as gui_class,
+            patch("enzyme_correlator.gui.logging"),
+        ):
+            main(["--profile"])
+
+        assert gui_class.call_args.kwargs["profiler"].enabled
+
+
+class TestCompactStorage:
+    """Tests for condensed float32 storage of the correlation matrix."""
+
+    def test_compact_analysis(
+        self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str
+    ) -> None:
+        """Test that histogram and grouping are computed from the condensed matrix."""
+        from enzyme_correlator.correlation import CondensedMatrix
+
+        gui_instance.datapath = sample_csv_file
+        gui_instance.import_data()
+        gui_instance.compute_correlation_matrix()
+        gui_instance.compute_histogram()
+        gui_instance.sort_into_groups()
+        expected_counts = gui_instance.hist_counts.copy()
+        expected_grouping = gui_instance.grouping
+
+        gui_instance.compact_storage = True
+        gui_instance.compute_correlation_matrix()
+        gui_instance.compute_histogram()
+        gui_instance.sort_into_groups()
+
+        assert isinstance(gui_instance.raw_correlation_matrix, CondensedMatrix)
+        assert gui_instance.enzyme_correlation_matrix is gui_instance.raw_correlation_matrix
+        np.testing.assert_array_equal(gui_instance.hist_counts, expected_counts)
+        assert gui_instance.grouping == expected_grouping
+
+    def test_compact_cache_round_trip(
+        self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str
+    ) -> None:
+        """Test that condensed matrices are cached and restored."""
+        gui_instance.compact_storage = True
+        gui_instance.datapath = sample_csv_file
+        gui_instance.import_data()
+        gui_instance.compute_correlation_matrix()
+        key = gui_instance.cache_key()
+        gui_instance.store_cached_results(key)
+        expected = gui_instance.raw_correlation_matrix
+
+        assert gui_instance.load_cached_results(key)
+
+        np.testing.assert_array_equal(
+            gui_instance.raw_correlation_matrix.values,  # type: ignore[union-attr]
+            expected.values,  # type: ignore[union-attr]
+        )
+
 
 class TestPlotOnlyLowerTriangle:
     """Tests for plot_only_lt flag behavior."""
@@ -330,7 +471,7 @@ class TestLoadDataCallback:
         self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str
     ) -> None:
         """Test load_data_callback loads data and enables buttons."""
-        with patch("enzyme_correlator.filedialog") as mock_dialog:
+        with patch("enzyme_correlator.gui.filedialog") as mock_dialog:
             mock_dialog.askopenfilename.return_value = sample_csv_file
             gui_instance.cutoff.get = MagicMock(return_value="0.85")
 
@@ -339,9 +480,41 @@ class TestLoadDataCallback:
             assert len(gui_instance.enzyme_list) == 4
             assert gui_instance.enzyme_correlation_matrix.shape == (4, 4)
 
+    def test_load_data_callback_reuses_cache(
+        self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str, isolated_cache: Path
+    ) -> None:
+        """Test that reopening the same file restores results from the cache."""
+        with patch("enzyme_correlator.gui.filedialog") as mock_dialog:
+            mock_dialog.askopenfilename.return_value = sample_csv_file
+            gui_instance.cutoff.get = MagicMock(return_value="0.85")
+            gui_instance.load_data_callback()
+            expected_matrix = gui_instance.enzyme_correlation_matrix.copy()
+            expected_grouping = gui_instance.grouping
+
+            with patch.object(gui_instance, "import_data") as mock_import:
+                gui_instance.load_data_callback()
+                mock_import.assert_not_called()
+
+        assert len(list(isolated_cache.iterdir())) == 1
+        np.testing.assert_array_equal(gui_instance.enzyme_correlation_matrix, expected_matrix)
+        assert gui_instance.grouping == expected_grouping
+        assert list(gui_instance.df.columns) == ["Enzyme1", "Enzyme2", "Enzyme3", "Enzyme4"]
+
+    def test_clear_cache_callback(
+        self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str, isolated_cache: Path
+    ) -> None:
+        """Test that the Clear Cache button removes cached results."""
+        with patch("enzyme_correlator.gui.filedialog") as mock_dialog:
+            mock_dialog.askopenfilename.return_value = sample_csv_file
+            gui_instance.load_data_callback()
+
+        gui_instance.clear_cache_button_callback()
+
+        assert not isolated_cache.exists()
+
     def test_load_data_callback_cancelled(self, gui_instance: EnzymeCorrelatorGUI) -> None:
         """Test load_data_callback handles cancelled dialog."""
-        with patch("enzyme_correlator.filedialog") as mock_dialog:
+        with patch("enzyme_correlator.gui.filedialog") as mock_dialog:
             mock_dialog.askopenfilename.return_value = ""
 
             gui_instance.load_data_callback()
@@ -349,6 +522,422 @@ class TestLoadDataCallback:
             assert gui_instance.datapath == ""
 
 
+class TestSubstrateSelection:
+    """Tests for the substrate selection panel."""
+
+    def test_load_lists_all_substrates(
+        self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str
+    ) -> None:
+        """Test that loading a file fills and selects the substrate list."""
+        with patch("enzyme_correlator.gui.filedialog") as mock_dialog:
+            mock_dialog.askopenfilename.return_value = sample_csv_file
+            gui_instance.load_data_callback()
+
+        inserted = [c.args[1] for c in gui_instance.substrate_list.insert.call_args_list]
+        assert inserted == ["Substrate1", "Substrate2", "Substrate3", "Substrate4"]
+        gui_instance.substrate_list.selection_set.assert_called_with(0, "end")
+
+    def test_selection_callback_updates_analysis(
+        self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str
+    ) -> None:
+        """Test that deselecting substrates recomputes matrix, histogram and grouping."""
+        with patch("enzyme_correlator.gui.filedialog") as mock_dialog:
+            mock_dialog.askopenfilename.return_value = sample_csv_file
+            gui_instance.load_data_callback()
+        listed = ["Substrate1", "Substrate2", "Substrate3", "Substrate4"]
+        gui_instance.substrate_list.curselection.return_value = (0, 1, 2)
+        gui_instance.substrate_list.get.side_effect = lambda i: listed[i]
+        gui_instance.current_plot = MagicMock()
+
+        gui_instance.substrate_selection_callback()
+
+        expected = gui_instance.df.iloc[:3].corr().to_numpy()
+        np.testing.assert_allclose(gui_instance.raw_correlation_matrix, expected, atol=1e-12)
+        assert gui_instance.hist_counts.sum() == 6
+        assert gui_instance.cutoff_index is not None
+        gui_instance.current_plot.assert_called_once()
+
+    def test_select_substrates_reuses_statistics(
+        self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str
+    ) -> None:
+        """Test that repeated toggles update one SubstrateSelection."""
+        gui_instance.datapath = sample_csv_file
+        gui_instance.import_data()
+
+        gui_instance.select_substrates(["Substrate1", "Substrate2", "Substrate3"])
+        selection = gui_instance.substrate_selection
+        gui_instance.select_substrates(["Substrate1", "Substrate2", "Substrate3", "Substrate4"])
+
+        assert gui_instance.substrate_selection is selection
+        np.testing.assert_allclose(
+            gui_instance.raw_correlation_matrix, gui_instance.df.corr().to_numpy(), atol=1e-12
+        )
+
+
+class TestCorrelationMethod:
+    """Tests for the correlation method selector."""
+
+    def test_selector_reanalyzes_with_method(
+        self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str, isolated_cache: Path
+    ) -> None:
+        """Test that picking a method recomputes and separately caches the analysis."""
+        with patch("enzyme_correlator.gui.filedialog") as mock_dialog:
+            mock_dialog.askopenfilename.return_value = sample_csv_file
+            gui_instance.load_data_callback()
+        replot = MagicMock()
+        gui_instance.current_plot = replot
+        gui_instance.method_selector.get.return_value = "spearman"
+
+        gui_instance.method_selector_callback()
+
+        assert gui_instance.correlation_method == "spearman"
+        expected = gui_instance.df.corr(method="spearman").to_numpy()
+        np.testing.assert_allclose(gui_instance.raw_correlation_matrix, expected, atol=1e-12)
+        replot.assert_called_once()
+        assert len(list(isolated_cache.iterdir())) == 2
+
+    def test_small_panel_not_forked(
+        self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str
+    ) -> None:
+        """Test that a rank correlation of a small panel starts no worker processes."""
+        gui_instance.datapath = sample_csv_file
+        gui_instance.correlation_method = "kendall"
+
+        with patch("enzyme_correlator.correlation.process_pool") as mock_pool:
+            gui_instance.analyze_data()
+
+        mock_pool.assert_not_called()
+
+    def test_selector_before_loading(self, gui_instance: EnzymeCorrelatorGUI) -> None:
+        """Test that picking a method without data only records it."""
+        gui_instance.method_selector.get.return_value = "kendall"
+
+        with patch.object(gui_instance, "analyze_data") as mock_analyze:
+            gui_instance.method_selector_callback()
+
+        assert gui_instance.correlation_method == "kendall"
+        mock_analyze.assert_not_called()
+
+    def test_rank_method_recomputes_substrate_selection(
+        self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str
+    ) -> None:
+        """Test that a rank correlation is recomputed over the selected substrates."""
+        from enzyme_correlator.correlation import kendall_matrix
+
+        gui_instance.correlation_method = "kendall"
+        gui_instance.datapath = sample_csv_file
+        gui_instance.import_data()
+
+        gui_instance.select_substrates(["Substrate1", "Substrate2", "Substrate4"])
+
+        expected = kendall_matrix(gui_instance.df.iloc[[0, 1, 3]].to_numpy())
+        np.testing.assert_allclose(gui_instance.raw_correlation_matrix, expected)
+
+    def test_compact_rank_methods(
+        self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str
+    ) -> None:
+        """Test that rank correlations are stored condensed in compact mode."""
+        from enzyme_correlator.correlation import CondensedMatrix
+
+        gui_instance.datapath = sample_csv_file
+        gui_instance.import_data()
+        gui_instance.compact_storage = True
+        for method in ("spearman", "kendall"):
+            gui_instance.correlation_method = method
+            gui_instance.compute_correlation_matrix()
+
+            assert isinstance(gui_instance.raw_correlation_matrix, CondensedMatrix)
+            np.testing.assert_allclose(
+                gui_instance.raw_correlation_matrix.to_dense(),
+                gui_instance.df.corr(method="spearman").to_numpy()
+                if method == "spearman"
+                else gui_instance.correlate_data(gui_instance.df.to_numpy()),
+                atol=1e-6,
+            )
+
+
+class TestMissingActivities:
+    """Tests for activity exports with blank cells."""
+
+    def test_load_keeps_and_caches_overlap(
+        self, gui_instance: EnzymeCorrelatorGUI, tmp_path: Path
+    ) -> None:
+        """Test that blank cells give pairwise-complete correlations and cached overlaps."""
+        path = tmp_path / "gaps.csv"
+        path.write_text(";S1;S2;S3;S4\nE1;1;2;3;4\nE2;2;;6;8,5\nE3;4;3;;1\n")
+        with patch("enzyme_correlator.gui.filedialog") as mock_dialog:
+            mock_dialog.askopenfilename.return_value = str(path)
+            gui_instance.load_data_callback()
+            expected = gui_instance.overlap
+            gui_instance.overlap = None
+
+            with patch.object(gui_instance, "import_data") as mock_import:
+                gui_instance.load_data_callback()
+                mock_import.assert_not_called()
+
+        np.testing.assert_allclose(
+            gui_instance.raw_correlation_matrix, gui_instance.df.corr().to_numpy(), atol=1e-12
+        )
+        assert expected is not None
+        np.testing.assert_array_equal(gui_instance.overlap, expected)
+        assert gui_instance.overlap[1, 2] == 2
+
+    def test_heatmap_greys_out_low_support(
+        self, gui_instance: EnzymeCorrelatorGUI, tmp_path: Path
+    ) -> None:
+        """Test that the heatmap masks pairs sharing too few substrates."""
+        path = tmp_path / "gaps.csv"
+        path.write_text(";S1;S2;S3;S4\nE1;1;2;3;4\nE2;2;;6;8,5\nE3;4;3;;1\n")
+        gui_instance.datapath = str(path)
+        gui_instance.import_data()
+        gui_instance.compute_correlation_matrix()
+
+        with patch("enzyme_correlator.gui.FigureCanvasTkAgg"):
+            gui_instance.plot_correlation_data_callback()
+
+        assert gui_instance.heatmap is not None
+        mask = np.ma.getmaskarray(gui_instance.heatmap.image.get_array())
+        np.testing.assert_array_equal(mask, gui_instance.overlap < 3)
+
+
+class TestProfiling:
+    """Tests for the stage timings in the status bar."""
+
+    def test_status_bar_shows_load_stages(
+        self, mock_tk: MagicMock, mock_ttk: MagicMock, sample_csv_file: str
+    ) -> None:
+        """Test that loading shows the analysis and its stages in the status bar."""
+        from enzyme_correlator.gui import EnzymeCorrelatorGUI
+        from enzyme_correlator.profiling import StageProfiler
+
+        mock_tk.StringVar.return_value.get.return_value = "0.85"
+        gui = EnzymeCorrelatorGUI(MagicMock(), profiler=StageProfiler(enabled=True))
+        with patch("enzyme_correlator.gui.filedialog") as mock_dialog:
+            mock_dialog.askopenfilename.return_value = sample_csv_file
+            gui.load_data_callback()
+
+        stages = [record.stage for record in gui.profiler.records]
+        assert stages[-1] == "analyze_data"
+        assert {"import_data", "compute_correlation_matrix", "sort_into_groups"} <= set(stages)
+        text = mock_ttk.Label.return_value.__setitem__.call_args.args[1]
+        assert text.startswith("analyze_data ")
+        assert "| import_data " in text
+        assert gui.stage_records == []
+
+    def test_disabled_by_default(
+        self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str
+    ) -> None:
+        """Test that nothing is recorded and no status bar is shown unless enabled."""
+        gui_instance.datapath = sample_csv_file
+        gui_instance.analyze_data()
+
+        assert gui_instance.status_bar is None
+        assert not gui_instance.profiler.records
+
+
+class TestPartnerLookup:
+    """Tests for the most-correlated partner panel."""
+
+    def test_lists_partners(self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str) -> None:
+        """Test that the partners of the entered enzyme are listed, most correlated first."""
+        gui_instance.datapath = sample_csv_file
+        gui_instance.analyze_data()
+        gui_instance.partner_selector.get.return_value = "Enzyme1"  # type: ignore[attr-defined]
+        gui_instance.partner_count.get.return_value = "2"  # type: ignore[attr-defined]
+        gui_instance.details_text.insert.reset_mock()  # type: ignore[attr-defined]
+
+        gui_instance.partner_lookup_callback()
+
+        text = gui_instance.details_text.insert.call_args.args[1]  # type: ignore[attr-defined]
+        lines = text.splitlines()
+        assert lines[0] == "Partners of Enzyme1"
+        assert len(lines) == 4
+        assert lines[2].split()[1] == "Enzyme4"
+
+    def test_follows_lower_triangle_matrix(
+        self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str
+    ) -> None:
+        """Test that partners right of the diagonal are found in a lower-triangle matrix."""
+        gui_instance.plot_only_lt = True
+        gui_instance.datapath = sample_csv_file
+        gui_instance.analyze_data()
+        gui_instance.partner_selector.get.return_value = "Enzyme1"  # type: ignore[attr-defined]
+        gui_instance.partner_count.get.return_value = "10"  # type: ignore[attr-defined]
+
+        gui_instance.partner_lookup_callback()
+
+        text = gui_instance.details_text.insert.call_args.args[1]  # type: ignore[attr-defined]
+        assert len(text.splitlines()) == 5
+
+    def test_unknown_enzyme(self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str) -> None:
+        """Test that an unknown name is reported instead of raising."""
+        gui_instance.datapath = sample_csv_file
+        gui_instance.analyze_data()
+        gui_instance.partner_selector.get.return_value = "CYP3A4"  # type: ignore[attr-defined]
+        gui_instance.partner_count.get.return_value = "x"  # type: ignore[attr-defined]
+
+        gui_instance.partner_lookup_callback()
+
+        gui_instance.details_text.insert.assert_called_with(  # type: ignore[attr-defined]
+            "end", "Unknown enzyme 'CYP3A4'"
+        )
+
+
+class TestCompareDatasets:
+    """Tests for comparing several datasets side by side."""
+
+    @pytest.fixture
+    def second_csv_file(self, tmp_path: Path) -> str:
+        """A second plate of the sample panel on which Enzyme3 joins the group."""
+        path = tmp_path / "plate2.csv"
+        path.write_text(
+            """;Substrate1;Substrate2;Substrate3;Substrate4
+Enzyme1;0,90;0,85;0,80;0,75
+Enzyme2;0,10;0,92;0,08;0,82
+Enzyme3;0,95;0,88;0,86;0,80
+Enzyme4;0,91;0,87;0,83;0,79
+"""
+        )
+        return str(path)
+
+    def test_compare_datasets_callback(
+        self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str, second_csv_file: str
+    ) -> None:
+        """Test that all files are analyzed, the first is shown and the summary is listed."""
+        with patch("enzyme_correlator.gui.filedialog") as mock_dialog:
+            mock_dialog.askopenfilenames.return_value = (sample_csv_file, second_csv_file)
+
+            gui_instance.compare_datasets_callback()
+
+        assert gui_instance.comparison is not None
+        assert gui_instance.comparison.labels == (Path(sample_csv_file).stem, "plate2")
+        assert gui_instance.datapath == sample_csv_file
+        assert gui_instance.enzyme_correlation_matrix.shape == (4, 4)
+        text = gui_instance.details_text.insert.call_args.args[1]  # type: ignore[attr-defined]
+        assert text.startswith("2 datasets")
+        assert "Enzymes whose group-mates differ: 3" in text
+
+    def test_switch_dataset(
+        self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str, second_csv_file: str
+    ) -> None:
+        """Test that the dataset selector installs another analysis without recomputing it."""
+        with patch("enzyme_correlator.gui.filedialog") as mock_dialog:
+            mock_dialog.askopenfilenames.return_value = (sample_csv_file, second_csv_file)
+            gui_instance.compare_datasets_callback()
+        gui_instance.dataset_selector.get.return_value = "plate2"  # type: ignore[attr-defined]
+
+        with patch("enzyme_correlator.gui.correlate") as mock_correlate:
+            gui_instance.dataset_selector_callback()
+            mock_correlate.assert_not_called()
+
+        assert gui_instance.datapath == second_csv_file
+        assert gui_instance.grouping == {0: ["Enzyme1", "Enzyme3", "Enzyme4"]}
+
+    def test_cancelled(self, gui_instance: EnzymeCorrelatorGUI) -> None:
+        """Test that a cancelled dialog keeps the previous state."""
+        with patch("enzyme_correlator.gui.filedialog") as mock_dialog:
+            mock_dialog.askopenfilenames.return_value = ()
+
+            gui_instance.compare_datasets_callback()
+
+        assert gui_instance.comparison is None
+
+
+class TestExportHeatmap:
+    """Tests for the raster heatmap export."""
+
+    def test_png(
+        self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str, tmp_path: Path
+    ) -> None:
+        """Test that a .png name receives one image with a pixel per cell."""
+        gui_instance.datapath = sample_csv_file
+        gui_instance.analyze_data()
+        path = tmp_path / "heatmap.png"
+
+        with patch("enzyme_correlator.gui.filedialog") as mock_dialog:
+            mock_dialog.asksaveasfilename.return_value = str(path)
+            gui_instance.export_heatmap_button_callback()
+
+        assert path.read_bytes().startswith(b"\x89PNG")
+
+    def test_pyramid(
+        self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str, tmp_path: Path
+    ) -> None:
+        """Test that any other name becomes a tile pyramid directory."""
+        gui_instance.datapath = sample_csv_file
+        gui_instance.analyze_data()
+
+        with patch("enzyme_correlator.gui.filedialog") as mock_dialog:
+            mock_dialog.asksaveasfilename.return_value = str(tmp_path / "tiles")
+            gui_instance.export_heatmap_button_callback()
+
+        assert (tmp_path / "tiles" / "0" / "0_0.png").is_file()
+
+
+class TestWatchFile:
+    """Tests for watching the loaded file for re-measured enzymes."""
+
+    @pytest.fixture
+    def watched(self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str) -> Path:
+        """Analyze the sample file and start watching it."""
+        gui_instance.datapath = sample_csv_file
+        gui_instance.analyze_data()
+        gui_instance.toggle_watch_callback()
+        return Path(sample_csv_file)
+
+    def test_toggle(self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str) -> None:
+        """Test that watching schedules a poll and a second click stops it."""
+        from enzyme_correlator.gui import WATCH_INTERVAL_MS
+
+        gui_instance.datapath = sample_csv_file
+        gui_instance.toggle_watch_callback()
+
+        assert gui_instance.watching
+        gui_instance.root.after.assert_called_with(  # type: ignore[attr-defined]
+            WATCH_INTERVAL_MS, gui_instance.poll_watched_file
+        )
+
+        gui_instance.toggle_watch_callback()
+
+        assert not gui_instance.watching
+        gui_instance.root.after.reset_mock()  # type: ignore[attr-defined]
+        gui_instance.poll_watched_file()
+        gui_instance.root.after.assert_not_called()  # type: ignore[attr-defined]
+
+    def test_changed_rows_recomputed(
+        self, gui_instance: EnzymeCorrelatorGUI, watched: Path
+    ) -> None:
+        """Test that a re-measured enzyme updates the matrix, histogram and grouping."""
+        watched.write_text(
+            watched.read_text().replace(
+                "Enzyme3;0,20;0,25;0,30;0,35", "Enzyme3;0,89;0,86;0,81;0,77"
+            )
+        )
+        os.utime(watched, ns=(0, 0))
+
+        with patch("enzyme_correlator.gui.correlate") as mock_correlate:
+            gui_instance.poll_watched_file()
+            mock_correlate.assert_not_called()
+
+        updated = gui_instance.enzyme_correlation_matrix.copy()
+        counts = gui_instance.hist_counts.copy()
+        grouping = gui_instance.grouping
+        gui_instance.analyze_data()
+        np.testing.assert_array_equal(updated, gui_instance.enzyme_correlation_matrix)
+        np.testing.assert_array_equal(counts, gui_instance.hist_counts)
+        assert grouping == gui_instance.grouping
+
+    def test_new_enzyme_reanalyzes(self, gui_instance: EnzymeCorrelatorGUI, watched: Path) -> None:
+        """Test that an added enzyme falls back to analyzing the whole file."""
+        watched.write_text(watched.read_text() + "Enzyme5;0,89;0,86;0,81;0,77\n")
+        os.utime(watched, ns=(0, 0))
+
+        gui_instance.poll_watched_file()
+
+        assert gui_instance.enzyme_correlation_matrix.shape == (5, 5)
+        assert gui_instance.hist_counts.sum() == 10
+
+
 class TestPlotCallbacks:
     """Tests for plotting callback methods."""
 
@@ -361,7 +950,7 @@ class TestPlotCallbacks:
         gui_instance.import_data()
         gui_instance.compute_correlation_matrix()
 
-        with patch("enzyme_correlator.FigureCanvasTkAgg") as mock_canvas:
+        with patch("enzyme_correlator.gui.FigureCanvasTkAgg") as mock_canvas:
             mock_canvas_instance = MagicMock()
             mock_canvas.return_value = mock_canvas_instance
 
@@ -373,7 +962,7 @@ class TestPlotCallbacks:
     def test_plot_correlation_data_with_existing_canvas(
         self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str
     ) -> None:
-        """Test plot_correlation_data_callback replaces existing canvas."""
+        """Test plot_correlation_data_callback shows its figure on the existing canvas."""
         gui_instance.datapath = sample_csv_file
         gui_instance.cutoff.get = MagicMock(return_value="0.85")
         gui_instance.import_data()
@@ -382,12 +971,13 @@ class TestPlotCallbacks:
         old_canvas = MagicMock()
         gui_instance.canvas = old_canvas
 
-        with patch("enzyme_correlator.FigureCanvasTkAgg") as mock_canvas:
-            mock_canvas.return_value = MagicMock()
-
+        with patch("enzyme_correlator.gui.FigureCanvasTkAgg") as mock_canvas:
             gui_instance.plot_correlation_data_callback()
 
-            old_canvas.get_tk_widget().grid_forget.assert_called_once()
+            mock_canvas.assert_not_called()
+        assert old_canvas.figure is gui_instance.fig
+        assert gui_instance.fig.canvas is old_canvas
+        old_canvas.draw.assert_called_once()
 
     def test_plot_histogram_callback(
         self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str
@@ -399,7 +989,7 @@ class TestPlotCallbacks:
         gui_instance.compute_correlation_matrix()
         gui_instance.compute_histogram()
 
-        with patch("enzyme_correlator.FigureCanvasTkAgg") as mock_canvas:
+        with patch("enzyme_correlator.gui.FigureCanvasTkAgg") as mock_canvas:
             mock_canvas_instance = MagicMock()
             mock_canvas.return_value = mock_canvas_instance
 
@@ -411,7 +1001,7 @@ class TestPlotCallbacks:
     def test_plot_histogram_with_existing_canvas(
         self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str
     ) -> None:
-        """Test plot_histogram_button_callback replaces existing canvas."""
+        """Test plot_histogram_button_callback shows its figure on the existing canvas."""
         gui_instance.datapath = sample_csv_file
         gui_instance.cutoff.get = MagicMock(return_value="0.85")
         gui_instance.import_data()
@@ -421,12 +1011,200 @@ class TestPlotCallbacks:
         old_canvas = MagicMock()
         gui_instance.canvas = old_canvas
 
-        with patch("enzyme_correlator.FigureCanvasTkAgg") as mock_canvas:
-            mock_canvas.return_value = MagicMock()
+        with patch("enzyme_correlator.gui.FigureCanvasTkAgg") as mock_canvas:
+            gui_instance.plot_histogram_button_callback()
+
+            mock_canvas.assert_not_called()
+        assert old_canvas.figure is gui_instance.fig
+        old_canvas.draw.assert_called_once()
+
+    def test_switching_views_reuses_canvas_and_figures(
+        self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str
+    ) -> None:
+        """Test that each view builds its figure once and the canvas is created once."""
+        gui_instance.datapath = sample_csv_file
+        gui_instance.cutoff.get = MagicMock(return_value="0.85")
+        gui_instance.import_data()
+        gui_instance.compute_correlation_matrix()
+        gui_instance.compute_histogram()
+
+        with patch("enzyme_correlator.gui.FigureCanvasTkAgg") as mock_canvas:
+            gui_instance.plot_correlation_data_callback()
+            heatmap_figure = gui_instance.fig
+            gui_instance.plot_histogram_button_callback()
+            histogram_figure = gui_instance.fig
+            gui_instance.plot_correlation_data_callback()
 
+            mock_canvas.assert_called_once()
+        assert gui_instance.fig is heatmap_figure
+        assert histogram_figure is not heatmap_figure
+        assert gui_instance.figures == {
+            "correlation": heatmap_figure,
+            "histogram": histogram_figure,
+        }
+        assert gui_instance.canvas is not None
+        assert gui_instance.canvas.figure is heatmap_figure
+
+    def test_replot_updates_heatmap_in_place(
+        self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str
+    ) -> None:
+        """Test that new correlations are blitted into the existing heatmap."""
+        gui_instance.datapath = sample_csv_file
+        gui_instance.import_data()
+        gui_instance.compute_correlation_matrix()
+
+        with patch("enzyme_correlator.gui.FigureCanvasTkAgg"):
+            gui_instance.plot_correlation_data_callback()
+            figure = gui_instance.fig
+            gui_instance.select_substrates(["Substrate1", "Substrate2", "Substrate3"])
+            with patch.object(gui_instance.blitters["correlation"], "update") as blit:
+                gui_instance.plot_correlation_data_callback()
+
+            blit.assert_called_once()
+        assert gui_instance.fig is figure
+        assert gui_instance.heatmap is not None
+        np.testing.assert_array_equal(
+            gui_instance.heatmap.image.get_array(), gui_instance.enzyme_correlation_matrix
+        )
+
+    def test_loading_data_discards_figures(
+        self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str
+    ) -> None:
+        """Test that a new dataset gets freshly built figures."""
+        with patch("enzyme_correlator.gui.filedialog") as mock_dialog:
+            mock_dialog.askopenfilename.return_value = sample_csv_file
+            gui_instance.load_data_callback()
+            with patch("enzyme_correlator.gui.FigureCanvasTkAgg"):
+                gui_instance.plot_correlation_data_callback()
+
+            gui_instance.load_data_callback()
+
+        assert gui_instance.figures == {}
+        assert gui_instance.heatmap is None
+        assert gui_instance.view == ""
+
+    def test_cutoff_slider_only_recolors_bars(
+        self, gui_instance: EnzymeCorrelatorGUI, mock_tk: MagicMock, sample_csv_file: str
+    ) -> None:
+        """Test that moving the slider recolors the existing bars without replotting."""
+        gui_instance.datapath = sample_csv_file
+        gui_instance.cutoff.get = MagicMock(return_value="0.85")
+        gui_instance.import_data()
+        gui_instance.compute_correlation_matrix()
+        gui_instance.compute_histogram()
+        update_cutoff = mock_tk.Scale.call_args.kwargs["command"]
+
+        with patch("enzyme_correlator.gui.FigureCanvasTkAgg") as mock_canvas:
             gui_instance.plot_histogram_button_callback()
+            figure = gui_instance.fig
+            gui_instance.cutoff.get = MagicMock(return_value="0.5")
 
-            old_canvas.get_tk_widget().grid_forget.assert_called_once()
+            update_cutoff("0.5")
+            assert gui_instance.grouping_worker.wait(timeout=5)
+            with patch.object(gui_instance.blitters["histogram"], "update") as blit:
+                gui_instance.poll_grouping_worker()
+
+            mock_canvas.assert_called_once()
+            blit.assert_called_once()
+        assert gui_instance.fig is figure
+        colors = [bar.get_facecolor() for bar in gui_instance.patches]
+        assert colors.count(colors[-1]) == 10
+
+
+class TestCutoffWorker:
+    """Tests for regrouping on the background worker."""
+
+    @pytest.fixture
+    def loaded_gui(
+        self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str
+    ) -> EnzymeCorrelatorGUI:
+        """Return a GUI with data loaded and its cutoff index built."""
+        gui_instance.datapath = sample_csv_file
+        gui_instance.import_data()
+        gui_instance.compute_correlation_matrix()
+        gui_instance.build_cutoff_index()
+        return gui_instance
+
+    def test_rapid_updates_schedule_one_poll(self, loaded_gui: EnzymeCorrelatorGUI) -> None:
+        """Test that slider bursts schedule a single poll of the worker."""
+        from enzyme_correlator.gui import REDRAW_INTERVAL_MS
+
+        for cutoff in (0.9, 0.8, 0.7):
+            loaded_gui.request_grouping(cutoff)
+
+        loaded_gui.root.after.assert_called_once_with(  # type: ignore[attr-defined]
+            REDRAW_INTERVAL_MS, loaded_gui.poll_grouping_worker
+        )
+
+    def test_poll_shows_latest_grouping(self, loaded_gui: EnzymeCorrelatorGUI) -> None:
+        """Test that polling installs the grouping of the last requested cutoff."""
+        loaded_gui.request_grouping(0.9)
+        loaded_gui.request_grouping(-1.0)
+        assert loaded_gui.grouping_worker.wait(timeout=5)
+
+        loaded_gui.poll_grouping_worker()
+
+        assert loaded_gui.grouping == {0: ["Enzyme1", "Enzyme2", "Enzyme3", "Enzyme4"]}
+        assert not loaded_gui.poll_scheduled
+        assert loaded_gui.group_view.shown == ["0        Enzyme1, Enzyme2, Enzyme3, Enzyme4"]
+
+    def test_failed_grouping_keeps_slider_working(self, loaded_gui: EnzymeCorrelatorGUI) -> None:
+        """Test that a failed regrouping is reported and the next slider move still applies."""
+        from enzyme_correlator.gui import REDRAW_INTERVAL_MS
+
+        index = loaded_gui.cutoff_index
+        assert index is not None
+        everything = index.grouping(-1.0)
+        with patch.object(index, "grouping", side_effect=[RuntimeError("boom"), everything]):
+            loaded_gui.request_grouping(0.9)
+            assert loaded_gui.grouping_worker.wait(timeout=5)
+            loaded_gui.poll_grouping_worker()
+
+            assert not loaded_gui.poll_scheduled
+            loaded_gui.details_text.insert.assert_called_with(  # type: ignore[attr-defined]
+                "end", "Regrouping failed: boom"
+            )
+            loaded_gui.root.after.reset_mock()  # type: ignore[attr-defined]
+
+            loaded_gui.request_grouping(-1.0)
+            loaded_gui.root.after.assert_called_once_with(  # type: ignore[attr-defined]
+                REDRAW_INTERVAL_MS, loaded_gui.poll_grouping_worker
+            )
+            assert loaded_gui.grouping_worker.wait(timeout=5)
+            loaded_gui.poll_grouping_worker()
+
+        assert loaded_gui.grouping == everything
+
+    def test_poll_reschedules_while_busy(self, loaded_gui: EnzymeCorrelatorGUI) -> None:
+        """Test that polling continues while the worker is still computing."""
+        from enzyme_correlator.gui import REDRAW_INTERVAL_MS
+
+        loaded_gui.grouping_worker = MagicMock(idle=False)
+        loaded_gui.grouping_worker.result.return_value = None
+
+        loaded_gui.poll_grouping_worker()
+
+        loaded_gui.root.after.assert_called_once_with(  # type: ignore[attr-defined]
+            REDRAW_INTERVAL_MS, loaded_gui.poll_grouping_worker
+        )
+
+    def test_result_for_replaced_index_is_dropped(self, loaded_gui: EnzymeCorrelatorGUI) -> None:
+        """Test that a grouping computed before reloading data is not shown."""
+        loaded_gui.request_grouping(-1.0)
+        assert loaded_gui.grouping_worker.wait(timeout=5)
+        loaded_gui.grouping = {}
+        loaded_gui.build_cutoff_index()
+
+        loaded_gui.poll_grouping_worker()
+
+        assert loaded_gui.grouping == {}
+
+    def test_quit_closes_worker(self, loaded_gui: EnzymeCorrelatorGUI) -> None:
+        """Test that quitting stops the worker."""
+        loaded_gui.quit_button_callback()
+
+        with pytest.raises(RuntimeError):
+            loaded_gui.grouping_worker.submit((loaded_gui.build_cutoff_index(), 0.5))
 
 
 class TestSaveFigCallback:
@@ -436,18 +1214,42 @@ class TestSaveFigCallback:
         """Test save_fig_button_callback saves figure."""
         gui_instance.fig = MagicMock()
 
-        with patch("enzyme_correlator.filedialog") as mock_dialog:
+        with patch("enzyme_correlator.gui.filedialog") as mock_dialog:
             mock_dialog.asksaveasfilename.return_value = "/tmp/test.png"
 
             gui_instance.save_fig_button_callback()
 
             gui_instance.fig.savefig.assert_called_once_with("/tmp/test.png")
 
+    def test_save_fig_includes_blitted_artists(
+        self, gui_instance: EnzymeCorrelatorGUI, sample_csv_file: str, tmp_path: Path
+    ) -> None:
+        """Test that animated artists are static while the figure is saved."""
+        gui_instance.datapath = sample_csv_file
+        gui_instance.import_data()
+        gui_instance.compute_correlation_matrix()
+        gui_instance.compute_histogram()
+        with patch("enzyme_correlator.gui.FigureCanvasTkAgg"):
+            gui_instance.plot_histogram_button_callback()
+        animated_during_save = []
+        gui_instance.fig.savefig = MagicMock(  # type: ignore[method-assign]
+            side_effect=lambda _name: animated_during_save.append(
+                gui_instance.patches[0].get_animated()
+            )
+        )
+
+        with patch("enzyme_correlator.gui.filedialog") as mock_dialog:
+            mock_dialog.asksaveasfilename.return_value = str(tmp_path / "histogram.png")
+            gui_instance.save_fig_button_callback()
+
+        assert animated_during_save == [False]
+        assert gui_instance.patches[0].get_animated()
+
     def test_save_fig_callback_cancelled(self, gui_instance: EnzymeCorrelatorGUI) -> None:
         """Test save_fig_button_callback handles cancelled dialog."""
         gui_instance.fig = MagicMock()
 
-        with patch("enzyme_correlator.filedialog") as mock_dialog:
+        with patch("enzyme_correlator.gui.filedialog") as mock_dialog:
             mock_dialog.asksaveasfilename.return_value = ""
 
             gui_instance.save_fig_button_callback()
@@ -471,3 +1273,18 @@ class TestModuleAttributes:
 
         assert "EnzymeCorrelatorGUI" in __all__
         assert "main" in __all__
+
+    def test_exports_resolve(self) -> None:
+        """Test that every lazily imported export is found in its submodule."""
+        import enzyme_correlator
+
+        for name in enzyme_correlator.__all__:
+            assert getattr(enzyme_correlator, name) is not None
+        assert set(enzyme_correlator.__all__) <= set(dir(enzyme_correlator))
+
+    def test_unknown_attribute(self) -> None:
+        """Test that unknown names still raise AttributeError."""
+        import enzyme_correlator
+
+        with pytest.raises(AttributeError, match="no attribute 'missing'"):
+            _ = enzyme_correlator.missing  # type: ignore[attr-defined]
@@ -0,0 +1,139 @@
+"""Tests for the sparse correlation graph export."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from enzyme_correlator.correlation import correlate
+from enzyme_correlator.graph import correlation_graph, threshold_edges, write_edge_list
+from enzyme_correlator.grouping import group_enzymes
+
+
+@pytest.fixture
+def panel() -> pd.DataFrame:
+    """Thirty enzymes drawn around five activity profiles, with one gap."""
+    rng = np.random.default_rng(0)
+    profiles = rng.random((12, 5))
+    values = profiles[:, rng.integers(0, 5, 30)] + 0.1 * rng.random((12, 30))
+    values[2, 3] = np.nan
+    return pd.DataFrame(values, columns=[f"E{i}" for i in range(30)])
+
+
+def dense_graph(matrix: np.ndarray, cutoff: float) -> np.ndarray:
+    """Reference: the above-cutoff off-diagonal entries of a dense matrix, zero elsewhere."""
+    linked = (matrix >= cutoff) & ~np.eye(len(matrix), dtype=bool)
+    return np.where(linked, matrix, 0.0)
+
+
+class TestThresholdEdges:
+    """Tests for the threshold_edges function."""
+
+    @pytest.mark.parametrize("method", ["pearson", "spearman", "kendall"])
+    def test_each_pair_once(self, panel: pd.DataFrame, method: str) -> None:
+        """Test that every above-cutoff pair is yielded once, below the diagonal."""
+        data = panel.to_numpy()
+        matrix = correlate(data, method)
+
+        batches = list(threshold_edges(data, 0.8, method, tile_size=7))
+
+        sources = np.concatenate([batch[0] for batch in batches])
+        targets = np.concatenate([batch[1] for batch in batches])
+        assert (sources > targets).all()
+        assert len(sources) == np.tril(matrix >= 0.8, k=-1).sum()
+        np.testing.assert_allclose(
+            np.concatenate([batch[2] for batch in batches]), matrix[sources, targets]
+        )
+
+
+class TestCorrelationGraph:
+    """Tests for the correlation_graph function."""
+
+    @pytest.mark.parametrize("method", ["pearson", "kendall"])
+    def test_matches_dense_threshold(self, panel: pd.DataFrame, method: str) -> None:
+        """Test that the CSR structure holds exactly the above-cutoff pairs in both directions."""
+        matrix = correlate(panel.to_numpy(), method)
+
+        graph = correlation_graph(panel, cutoff=0.8, method=method, tile_size=7)
+
+        dense = np.zeros(matrix.shape)
+        for row in range(len(matrix)):
+            neighbors = slice(graph.indptr[row], graph.indptr[row + 1])
+            assert (np.diff(graph.indices[neighbors]) > 0).all()
+            dense[row, graph.indices[neighbors]] = graph.weights[neighbors]
+        np.testing.assert_allclose(dense, dense_graph(matrix, 0.8))
+        assert graph.edge_count == np.tril(matrix >= 0.8, k=-1).sum()
+
+    def test_components_are_the_groups(self, panel: pd.DataFrame) -> None:
+        """Test that the grouping cutoff semantics apply to the edges."""
+        graph = correlation_graph(panel, cutoff=0.9)
+
+        grouped = {
+            enzyme
+            for enzymes in group_enzymes(
+                correlate(panel.to_numpy()), graph.enzyme_names, 0.9
+            ).values()
+            for enzyme in enzymes
+        }
+        assert grouped == {
+            name for row, name in enumerate(graph.enzyme_names) if graph.neighbors(row)
+        }
+
+    def test_no_edges(self, panel: pd.DataFrame) -> None:
+        """Test that an unreachable cutoff gives an empty graph."""
+        graph = correlation_graph(panel, cutoff=1.5)
+
+        assert graph.edge_count == 0
+        np.testing.assert_array_equal(graph.indptr, np.zeros(31))
+
+    def test_neighbors(self) -> None:
+        """Test that neighbors are listed with their correlations."""
+        df = pd.DataFrame({"A": [1.0, 2.0, 3.0], "B": [2.0, 4.0, 6.5], "C": [3.0, 1.0, 2.0]})
+
+        graph = correlation_graph(df, cutoff=0.9)
+
+        assert [name for name, _ in graph.neighbors(0)] == ["B"]
+        assert graph.neighbors(2) == []
+
+    def test_unknown_method(self, panel: pd.DataFrame) -> None:
+        """Test that an unknown correlation method is rejected."""
+        with pytest.raises(ValueError, match="distance"):
+            correlation_graph(panel, method="distance")
+
+    def test_to_scipy(self, panel: pd.DataFrame) -> None:
+        """Test that the graph converts to a SciPy sparse array."""
+        pytest.importorskip("scipy")
+        graph = correlation_graph(panel, cutoff=0.8)
+
+        np.testing.assert_allclose(
+            graph.to_scipy().toarray(), dense_graph(correlate(panel.to_numpy()), 0.8)
+        )
+
+
+class TestWriteEdgeList:
+    """Tests for the write_edge_list function."""
+
+    def test_streams_edges(self, panel: pd.DataFrame, tmp_path: Path) -> None:
+        """Test that the file lists each edge once in the input CSV format."""
+        path = tmp_path / "edges.csv"
+
+        count = write_edge_list(panel, path, cutoff=0.8, tile_size=7)
+
+        edges = pd.read_csv(path, sep=";", decimal=",")
+        assert len(edges) == count == correlation_graph(panel, cutoff=0.8).edge_count
+        matrix = correlate(panel.to_numpy())
+        positions = {name: i for i, name in enumerate(panel.columns)}
+        for source, target, correlation in edges.itertuples(index=False):
+            assert correlation == pytest.approx(matrix[positions[source], positions[target]])
+
+    def test_separators(self, panel: pd.DataFrame, tmp_path: Path) -> None:
+        """Test that delimiter and decimal separator can be chosen."""
+        path = tmp_path / "edges.csv"
+
+        write_edge_list(panel, path, cutoff=0.8, sep=",", decimal=".")
+
+        assert path.read_text().splitlines()[0] == "Source,Target,Correlation"
+        assert len(pd.read_csv(path)) > 0
@@ -0,0 +1,198 @@
+"""Tests for union-find enzyme grouping."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from enzyme_correlator.correlation import (
+    pearson_condensed,
+    pearson_matrix,
+    pearson_matrix_tiled,
+)
+from enzyme_correlator.grouping import CutoffIndex, DisjointSet, group_enzymes, linked_pairs
+
+
+def legacy_grouping(df: pd.DataFrame, cutoff: float) -> set[frozenset[str]]:
+    """Group enzymes with pairwise Series.corr checks, as sort_into_groups used to."""
+    linked: dict[str, set[str]] = {str(name): set() for name in df.columns}
+    for enzyme1 in df.columns:
+        for enzyme2 in df.columns:
+            if enzyme1 != enzyme2 and float(df[enzyme1].corr(df[enzyme2])) >= cutoff:
+                linked[str(enzyme1)].add(str(enzyme2))
+
+    groups: set[frozenset[str]] = set()
+    seen: set[str] = set()
+    for start, partners in linked.items():
+        if start in seen or not partners:
+            continue
+        component = {start}
+        frontier = [start]
+        while frontier:
+            for partner in linked[frontier.pop()]:
+                if partner not in component:
+                    component.add(partner)
+                    frontier.append(partner)
+        seen |= component
+        groups.add(frozenset(component))
+    return groups
+
+
+@pytest.fixture
+def clustered_panel() -> pd.DataFrame:
+    """Create a panel with a few noisy clusters of enzymes."""
+    rng = np.random.default_rng(7)
+    profiles = rng.random((4, 8))
+    columns = {}
+    for i in range(40):
+        columns[f"Enzyme{i}"] = profiles[i % 4] + rng.normal(scale=0.15, size=8)
+    return pd.DataFrame(columns)
+
+
+class TestDisjointSet:
+    """Tests for the DisjointSet class."""
+
+    def test_union_merges_sets(self) -> None:
+        """Test that union links elements transitively."""
+        components = DisjointSet(5)
+
+        assert components.union(0, 1)
+        assert components.union(1, 2)
+        assert not components.union(0, 2)
+        assert components.find(0) == components.find(2)
+        assert components.find(3) != components.find(0)
+
+
+class TestLinkedPairs:
+    """Tests for the linked_pairs function."""
+
+    def test_tiled_scan_finds_same_pairs(self, clustered_panel: pd.DataFrame) -> None:
+        """Test that small tiles find the same pairs as a single tile."""
+        correlations = pearson_matrix(clustered_panel.to_numpy())
+
+        tiled = set(zip(*(index.tolist() for index in linked_pairs(correlations, 0.7, 6))))
+        whole = set(zip(*(index.tolist() for index in linked_pairs(correlations, 0.7, 1000))))
+
+        assert tiled == whole
+
+    def test_condensed_matrix_finds_same_pairs(self, clustered_panel: pd.DataFrame) -> None:
+        """Test that scanning condensed values maps back to the same pairs."""
+        data = clustered_panel.to_numpy()
+
+        condensed = linked_pairs(pearson_condensed(data), 0.7, tile_size=3)
+        dense = linked_pairs(pearson_matrix(data), 0.7)
+
+        assert set(zip(*(index.tolist() for index in condensed))) == set(
+            zip(*(index.tolist() for index in dense))
+        )
+
+    def test_reads_strict_lower_triangle(self) -> None:
+        """Test that only pairs below the diagonal are returned."""
+        matrix = np.array([[1.0, 0.9, 0.9], [0.9, 1.0, 0.1], [0.9, 0.1, 1.0]])
+
+        rows, columns = linked_pairs(matrix, 0.85)
+
+        assert rows.tolist() == [1, 2]
+        assert columns.tolist() == [0, 0]
+
+
+class TestGroupEnzymes:
+    """Tests for the group_enzymes function."""
+
+    @pytest.mark.parametrize("cutoff", [0.5, 0.7, 0.85, 0.95])
+    def test_matches_pairwise_grouping(self, clustered_panel: pd.DataFrame, cutoff: float) -> None:
+        """Test that group membership matches the former pairwise algorithm."""
+        correlations = pearson_matrix(clustered_panel.to_numpy())
+        names = [str(name) for name in clustered_panel.columns]
+
+        grouping = group_enzymes(correlations, names, cutoff)
+
+        assert {frozenset(group) for group in grouping.values()} == legacy_grouping(
+            clustered_panel, cutoff
+        )
+
+    def test_lower_triangle_matrix(self, clustered_panel: pd.DataFrame) -> None:
+        """Test that a lower-triangle-only matrix gives the same grouping."""
+        data = clustered_panel.to_numpy()
+        names = [str(name) for name in clustered_panel.columns]
+
+        assert group_enzymes(pearson_matrix(data, lower_triangle_only=True), names, 0.8) == (
+            group_enzymes(pearson_matrix(data), names, 0.8)
+        )
+
+    def test_deterministic_order(self) -> None:
+        """Test that groups are numbered by first member and keep matrix order."""
+        matrix = np.array(
+            [
+                [1.0, 0.0, 0.0, 0.0],
+                [0.0, 1.0, 0.0, 0.0],
+                [0.9, 0.0, 1.0, 0.0],
+                [0.0, 0.9, 0.0, 1.0],
+            ]
+        )
+
+        grouping = group_enzymes(matrix, ["A", "B", "C", "D"], 0.85)
+
+        assert grouping == {0: ["A", "C"], 1: ["B", "D"]}
+
+    def test_no_links(self) -> None:
+        """Test that no group is formed when nothing reaches the cutoff."""
+        assert group_enzymes(np.eye(3), ["A", "B", "C"], 0.85) == {}
+
+
+class TestCutoffIndex:
+    """Tests for the CutoffIndex class."""
+
+    def test_matches_group_enzymes_over_slider_range(self, clustered_panel: pd.DataFrame) -> None:
+        """Test that every slider position gives the same grouping as a full recompute."""
+        correlations = pearson_matrix(clustered_panel.to_numpy())
+        names = [str(name) for name in clustered_panel.columns]
+
+        index = CutoffIndex(correlations, names)
+
+        for cutoff in np.round(np.arange(-1, 1.01, 0.01), 2):
+            assert index.grouping(cutoff) == group_enzymes(correlations, names, cutoff)
+
+    def test_forest_edges_sorted(self, clustered_panel: pd.DataFrame) -> None:
+        """Test that the index holds n - 1 edges by decreasing correlation."""
+        index = CutoffIndex(pearson_matrix(clustered_panel.to_numpy()), list(clustered_panel))
+
+        assert len(index.weights) == clustered_panel.shape[1] - 1
+        assert np.all(np.diff(index.weights) <= 0)
+
+    def test_symmetric_memory_mapped_matrix(
+        self, clustered_panel: pd.DataFrame, tmp_path: Path
+    ) -> None:
+        """Test that row-wise reads of a tiled matrix give the same index."""
+        data = clustered_panel.to_numpy()
+        names = [str(name) for name in clustered_panel.columns]
+
+        index = CutoffIndex(
+            pearson_matrix_tiled(data, tmp_path / "corr.npy", tile_size=8), names, symmetric=True
+        )
+
+        for cutoff in (0.5, 0.85):
+            assert index.grouping(cutoff) == group_enzymes(pearson_matrix(data), names, cutoff)
+
+    @pytest.mark.parametrize("symmetric", [False, True])
+    def test_condensed_matrix(self, clustered_panel: pd.DataFrame, symmetric: bool) -> None:
+        """Test that the index reads condensed matrices directly."""
+        data = clustered_panel.to_numpy()
+        names = [str(name) for name in clustered_panel.columns]
+
+        index = CutoffIndex(pearson_condensed(data), names, symmetric=symmetric)
+
+        for cutoff in (0.5, 0.85):
+            assert index.grouping(cutoff) == group_enzymes(pearson_matrix(data), names, cutoff)
+
+    def test_undefined_correlations_never_link(self) -> None:
+        """Test that a constant enzyme with NaN correlations stays ungrouped."""
+        data = np.array([[1.0, 2.0, 5.0], [2.0, 4.0, 5.0], [3.0, 6.1, 5.0]])
+
+        index = CutoffIndex(pearson_matrix(data, lower_triangle_only=True), ["A", "B", "C"])
+
+        assert index.grouping(-1.0) == {0: ["A", "B"]}
+        assert index.linked_count(-1.0) == 1
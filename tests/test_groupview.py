@@ -0,0 +1,135 @@
+"""Tests for the virtualized group list."""
+
+from __future__ import annotations
+
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+
+from enzyme_correlator.groupview import GroupRows, VirtualGroupList
+
+
+class FakeListbox:
+    """Records the lines of a listbox and how many were written."""
+
+    def __init__(self) -> None:
+        """Start empty."""
+        self.items: list[str] = []
+        self.inserted = 0
+
+    def insert(self, index: int, line: str) -> None:
+        """Insert one line before ``index``."""
+        self.items.insert(index, line)
+        self.inserted += 1
+
+    def delete(self, first: int, last: int | None = None) -> None:
+        """Delete the lines from ``first`` through ``last``."""
+        del self.items[first : (first if last is None else last) + 1]
+
+
+def grouping(count: int) -> dict[int, list[str]]:
+    """Return ``count`` groups of two enzymes each."""
+    return {group: [f"E{2 * group}", f"E{2 * group + 1}"] for group in range(count)}
+
+
+@pytest.fixture
+def view() -> VirtualGroupList:
+    """A five-row view of 100 groups."""
+    listbox: Any = FakeListbox()
+    view = VirtualGroupList(listbox, MagicMock(), height=5)
+    view.show(grouping(100))
+    return view
+
+
+class TestGroupRows:
+    """Tests for the GroupRows class."""
+
+    def test_lines(self) -> None:
+        """Test that groups are shown with their number and enzymes."""
+        rows = GroupRows()
+        rows.set_grouping(grouping(3))
+
+        assert len(rows) == 3
+        assert rows.lines(1, 5) == ["1        E2, E3", "2        E4, E5"]
+
+    def test_changed_groups(self) -> None:
+        """Test that only groups with other members are reported as changed."""
+        rows = GroupRows()
+        rows.set_grouping(grouping(4))
+        moved = grouping(5)
+        moved[2] = ["E4", "E5", "E8"]
+
+        assert rows.set_grouping(moved) == [2, 4]
+
+    def test_search(self) -> None:
+        """Test that the search ignores case and narrows as the query grows."""
+        rows = GroupRows()
+        rows.set_grouping({0: ["ADH1", "ADH2"], 1: ["Lipase"], 2: ["adh7", "Esterase"]})
+
+        rows.search("ad")
+        assert rows.matches == [0, 2]
+        rows.search("adh7")
+        assert rows.matches == [2]
+        rows.search("")
+        assert len(rows) == 3
+
+    def test_search_follows_grouping(self) -> None:
+        """Test that an active search applies to a new grouping."""
+        rows = GroupRows()
+        rows.set_grouping(grouping(3))
+        rows.search("e5")
+
+        rows.set_grouping({0: ["E0", "E1", "E5"], 1: ["E2", "E3"]})
+
+        assert rows.lines(0, 10) == ["0        E0, E1, E5"]
+
+
+class TestVirtualGroupList:
+    """Tests for the VirtualGroupList class."""
+
+    def test_only_visible_rows(self, view: VirtualGroupList) -> None:
+        """Test that the listbox holds one screenful and the scrollbar spans the rest."""
+        assert view.listbox.items == [  # type: ignore[attr-defined]
+            f"{group:<8} E{2 * group}, E{2 * group + 1}" for group in range(5)
+        ]
+        view.scrollbar.set.assert_called_with(0.0, 0.05)  # type: ignore[attr-defined]
+
+    def test_scroll(self, view: VirtualGroupList) -> None:
+        """Test that scrollbar commands move the window and stop at the ends."""
+        view.scroll("moveto", "0.5")
+        assert view.shown[0].startswith("50 ")
+        view.scroll("scroll", "1", "pages")
+        assert view.top == 55
+        view.scroll("moveto", "1.0")
+        assert view.top == 95
+        view.scroll("scroll", "-200")
+        assert view.top == 0
+
+    def test_wheel(self, view: VirtualGroupList) -> None:
+        """Test that the wheel scrolls down on Button-5 and up on a positive delta."""
+        view.wheel(MagicMock(num=5, delta=0))
+        assert view.top == 3
+        view.wheel(MagicMock(num="??", delta=120))
+        assert view.top == 0
+
+    def test_unchanged_rows_not_rewritten(self, view: VirtualGroupList) -> None:
+        """Test that a new grouping only rewrites the visible rows that changed."""
+        listbox: Any = view.listbox
+        listbox.inserted = 0
+        changed = grouping(100)
+        changed[1] = ["E2", "E3", "E99"]
+
+        view.show(changed)
+
+        assert listbox.inserted == 1
+        assert listbox.items[1] == "1        E2, E3, E99"
+
+    def test_search_shrinks_list(self, view: VirtualGroupList) -> None:
+        """Test that surplus rows are removed when fewer groups match."""
+        view.scroll("moveto", "0.5")
+
+        view.search("e111")
+
+        assert view.listbox.items == ["55       E110, E111"]  # type: ignore[attr-defined]
+        view.scrollbar.set.assert_called_with(0.0, 1.0)  # type: ignore[attr-defined]
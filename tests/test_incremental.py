@@ -0,0 +1,119 @@
+"""Tests for the row-level incremental updates of an analysis."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from enzyme_correlator.analysis import histogram_counts
+from enzyme_correlator.correlation import CondensedMatrix, correlate, overlap_counts
+from enzyme_correlator.grouping import group_enzymes
+from enzyme_correlator.incremental import IncrementalAnalysis, changed_rows, row_hashes
+
+
+@pytest.fixture
+def df() -> pd.DataFrame:
+    """Activities of 30 enzymes from five families, so that groups form at 0.8."""
+    rng = np.random.default_rng(0)
+    families = rng.random((12, 5))
+    data = families[:, rng.integers(0, 5, 30)] + 0.05 * rng.random((12, 30))
+    return pd.DataFrame(data, columns=[f"E{i}" for i in range(30)])
+
+
+def remeasure(df: pd.DataFrame) -> pd.DataFrame:
+    """Replace the activities of three enzymes and drop one measurement."""
+    updated = df.copy()
+    updated.iloc[:, [4, 11, 12]] = np.random.default_rng(1).random((len(df), 3))
+    updated.iloc[2, 20] = np.nan
+    return updated
+
+
+class TestRowHashes:
+    """Tests for the row_hashes and changed_rows functions."""
+
+    def test_changed_enzymes(self, df: pd.DataFrame) -> None:
+        """Test that exactly the enzymes with different activities are reported."""
+        changed = changed_rows(row_hashes(df), row_hashes(remeasure(df)))
+
+        assert changed.tolist() == [4, 11, 12, 20]
+
+
+class TestIncrementalAnalysis:
+    """Tests for the IncrementalAnalysis class."""
+
+    @pytest.mark.parametrize("method", ["pearson", "spearman", "kendall"])
+    @pytest.mark.parametrize("lower_triangle_only", [False, True])
+    def test_matches_full_analysis(
+        self, df: pd.DataFrame, method: str, lower_triangle_only: bool
+    ) -> None:
+        """Test that the updated matrix, histogram and grouping equal a full recompute."""
+        matrix = correlate(df.to_numpy(), method, lower_triangle_only)
+        incremental = IncrementalAnalysis(df, matrix, method, 0.8, lower_triangle_only)
+        updated = remeasure(df)
+
+        changed = incremental.update(updated)
+
+        expected = correlate(updated.to_numpy(), method, lower_triangle_only)
+        assert changed.tolist() == [4, 11, 12, 20]
+        assert incremental.correlations is matrix
+        np.testing.assert_allclose(matrix, expected, atol=1e-12)
+        np.testing.assert_array_equal(incremental.histogram_counts, histogram_counts(expected))
+        assert incremental.grouping == group_enzymes(expected, incremental.enzyme_names, 0.8)
+        assert incremental.overlap is not None
+        np.testing.assert_array_equal(incremental.overlap, overlap_counts(updated.to_numpy()))
+
+    def test_condensed(self, df: pd.DataFrame) -> None:
+        """Test that a condensed matrix is updated in its compact storage."""
+        condensed = CondensedMatrix.from_dense(correlate(df.to_numpy()))
+        incremental = IncrementalAnalysis(df, condensed, cutoff=0.8)
+        updated = remeasure(df)
+
+        incremental.update(updated)
+
+        expected = correlate(updated.to_numpy())
+        np.testing.assert_allclose(condensed.to_dense(), expected, atol=1e-6)
+        np.testing.assert_array_equal(incremental.histogram_counts, histogram_counts(condensed))
+        assert incremental.grouping == group_enzymes(expected, incremental.enzyme_names, 0.8)
+
+    def test_read_only_matrix_copied(self, df: pd.DataFrame) -> None:
+        """Test that a read-only matrix, as mapped from the cache, is copied before updating."""
+        matrix = correlate(df.to_numpy())
+        matrix.flags.writeable = False
+        incremental = IncrementalAnalysis(df, matrix, cutoff=0.8)
+
+        incremental.update(remeasure(df))
+
+        assert incremental.correlations is not matrix
+        np.testing.assert_array_equal(matrix, correlate(df.to_numpy()))
+
+    def test_unchanged_file(self, df: pd.DataFrame) -> None:
+        """Test that an identical frame changes nothing."""
+        incremental = IncrementalAnalysis(df, correlate(df.to_numpy()), cutoff=0.8)
+        grouping = incremental.grouping
+
+        assert len(incremental.update(df.copy())) == 0
+        assert incremental.grouping is grouping
+
+    def test_new_cutoff(self, df: pd.DataFrame) -> None:
+        """Test that a moved cutoff regroups the whole matrix."""
+        matrix = correlate(df.to_numpy())
+        incremental = IncrementalAnalysis(df, matrix, cutoff=0.8)
+
+        incremental.update(df, cutoff=0.95)
+
+        assert incremental.grouping == group_enzymes(matrix, incremental.enzyme_names, 0.95)
+
+    def test_structure_changed(self, df: pd.DataFrame) -> None:
+        """Test that added enzymes or substrates require a full recompute."""
+        incremental = IncrementalAnalysis(df, correlate(df.to_numpy()))
+
+        with pytest.raises(ValueError, match="recomputed"):
+            incremental.update(df.assign(extra=1.0))
+        with pytest.raises(ValueError, match="recomputed"):
+            incremental.update(df.iloc[1:])
+
+    def test_unknown_method(self, df: pd.DataFrame) -> None:
+        """Test that an unknown method is rejected."""
+        with pytest.raises(ValueError, match="unknown correlation method"):
+            IncrementalAnalysis(df, correlate(df.to_numpy()), method="distance")
@@ -0,0 +1,117 @@
+"""Tests for the bulk activity CSV reader."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from enzyme_correlator.parsing import CsvFormatError, read_activity_csv
+
+HEADER = ";Substrate1;Substrate2;Substrate3\n"
+
+
+@pytest.fixture
+def write_csv(tmp_path: Path) -> Callable[[str], Path]:
+    """Return a helper writing CSV content to a temporary file."""
+
+    def write(content: str) -> Path:
+        path = tmp_path / "plate.csv"
+        path.write_text(content)
+        return path
+
+    return write
+
+
+class TestReadActivityCsv:
+    """Tests for the read_activity_csv function."""
+
+    def test_float64_block(self, write_csv: Callable[[str], Path]) -> None:
+        """Test that cells are parsed into one float64 substrates x enzymes block."""
+        path = write_csv(HEADER + "Enzyme1;0,90;1;-2,5e-1\nEnzyme2;0,88;0,92;0,78\n")
+
+        df = read_activity_csv(path)
+
+        assert list(df.columns) == ["Enzyme1", "Enzyme2"]
+        assert list(df.index) == ["Substrate1", "Substrate2", "Substrate3"]
+        assert set(df.dtypes) == {np.dtype(np.float64)}
+        np.testing.assert_allclose(df["Enzyme1"], [0.9, 1.0, -0.25])
+
+    def test_names_kept_verbatim(self, write_csv: Callable[[str], Path]) -> None:
+        """Test that numeric-looking enzyme names and duplicate substrates are kept as written."""
+        path = write_csv(";S1;S1\n007;1,0;2,0\n")
+
+        df = read_activity_csv(path)
+
+        assert list(df.columns) == ["007"]
+        assert list(df.index) == ["S1", "S1"]
+
+    @pytest.mark.parametrize("chunksize", [1, 2, 100])
+    def test_chunked_matches_single_pass(
+        self, write_csv: Callable[[str], Path], chunksize: int
+    ) -> None:
+        """Test that chunked parsing gives the same frame as a single pass."""
+        rows = "".join(f"Enzyme{i};{i},5;{i + 1},25;0,{i}\n" for i in range(5))
+        path = write_csv(HEADER + rows + "\n")
+
+        expected = read_activity_csv(path)
+        chunked = read_activity_csv(path, chunksize=chunksize)
+
+        assert list(chunked.columns) == list(expected.columns)
+        np.testing.assert_array_equal(chunked.to_numpy(), expected.to_numpy())
+
+    @pytest.mark.parametrize("chunksize", [None, 1])
+    @pytest.mark.parametrize(
+        ("row", "cell"),
+        [("Enzyme2;0,88;abc;0,78", "'abc'"), ("Enzyme2;0,88;0.92;0,78", "'0.92'")],
+    )
+    def test_malformed_cell_is_named(
+        self, write_csv: Callable[[str], Path], chunksize: int | None, row: str, cell: str
+    ) -> None:
+        """Test that a malformed cell is reported with its enzyme and substrate."""
+        path = write_csv(HEADER + "Enzyme1;0,90;0,85;0,80\n" + row + "\n")
+
+        with pytest.raises(CsvFormatError, match=f"'Enzyme2', substrate 'Substrate2'.*{cell}"):
+            read_activity_csv(path, chunksize=chunksize)
+
+    def test_missing_cell(self, write_csv: Callable[[str], Path]) -> None:
+        """Test that the cells missing from a short row are read as NaN."""
+        path = write_csv(HEADER + "Enzyme1;0,90;0,85;0,80\nEnzyme2;0,88;0,92\n")
+
+        df = read_activity_csv(path)
+
+        np.testing.assert_array_equal(df["Enzyme2"], [0.88, 0.92, np.nan])
+
+    @pytest.mark.parametrize("chunksize", [None, 1])
+    def test_blank_and_na_cells(
+        self, write_csv: Callable[[str], Path], chunksize: int | None
+    ) -> None:
+        """Test that blank, whitespace-only and NA cells are read as missing values."""
+        path = write_csv(HEADER + "Enzyme1;0,90;;NA\nEnzyme2; ; 1,5 ;n/a\nEnzyme3;1;2;3\n")
+
+        df = read_activity_csv(path, chunksize=chunksize)
+
+        assert set(df.dtypes) == {np.dtype(np.float64)}
+        np.testing.assert_array_equal(df["Enzyme1"], [0.9, np.nan, np.nan])
+        np.testing.assert_array_equal(df["Enzyme2"], [np.nan, 1.5, np.nan])
+
+    def test_malformed_cell_among_blanks(self, write_csv: Callable[[str], Path]) -> None:
+        """Test that a malformed cell is still reported in a column with blanks."""
+        path = write_csv(HEADER + "Enzyme1;;0,85;0,80\nEnzyme2;x;0,92;0,78\n")
+
+        with pytest.raises(CsvFormatError, match="'Enzyme2', substrate 'Substrate1'.*'x'"):
+            read_activity_csv(path)
+
+    def test_too_many_cells(self, write_csv: Callable[[str], Path]) -> None:
+        """Test that a row with extra cells is reported with its line."""
+        path = write_csv(HEADER + "Enzyme1;0,90;0,85;0,80;0,1\n")
+
+        with pytest.raises(CsvFormatError, match="line 2"):
+            read_activity_csv(path)
+
+    def test_empty_file(self, write_csv: Callable[[str], Path]) -> None:
+        """Test that an empty file is rejected."""
+        with pytest.raises(CsvFormatError, match="empty"):
+            read_activity_csv(write_csv(""))
@@ -0,0 +1,145 @@
+"""Tests for the most-correlated partner queries."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from enzyme_correlator.correlation import CondensedMatrix, correlate, pearson_matrix_tiled
+from enzyme_correlator.partners import (
+    data_row_bands,
+    matrix_row_bands,
+    matrix_rows,
+    nearest_partners,
+    top_k,
+    top_partners,
+)
+
+
+@pytest.fixture
+def panel() -> pd.DataFrame:
+    """Random activities of 12 enzymes on 9 substrates."""
+    rng = np.random.default_rng(5)
+    return pd.DataFrame(rng.random((9, 12)), columns=[f"E{i}" for i in range(12)])
+
+
+def sorted_partners(matrix: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Reference: fully sort every row without its diagonal."""
+    keys = np.where(np.eye(len(matrix), dtype=bool), -np.inf, matrix)
+    indices = np.argsort(-keys, axis=1, kind="stable")[:, :k]
+    return indices, np.take_along_axis(matrix, indices, axis=1)
+
+
+class TestTopK:
+    """Tests for the top_k function."""
+
+    def test_matches_full_sort(self) -> None:
+        """Test that partial selection keeps the largest values in descending order."""
+        rows = np.random.default_rng(1).random((5, 40))
+
+        indices, values = top_k(rows, 6)
+
+        expected = np.argsort(-rows, axis=1)[:, :6]
+        np.testing.assert_array_equal(indices, expected)
+        np.testing.assert_array_equal(values, np.take_along_axis(rows, expected, axis=1))
+
+    def test_nan_and_excluded_come_last(self) -> None:
+        """Test that undefined and excluded columns are only padding."""
+        rows = np.array([[0.5, np.nan, 0.9, 0.1]])
+
+        indices, values = top_k(rows, 4, exclude=[2])
+
+        np.testing.assert_array_equal(indices, [[0, 3, -1, -1]])
+        np.testing.assert_array_equal(values, [[0.5, 0.1, np.nan, np.nan]])
+
+    def test_k_larger_than_row(self) -> None:
+        """Test that asking for more values than columns returns them all."""
+        indices, _values = top_k(np.array([[0.2, 0.8]]), 5)
+
+        np.testing.assert_array_equal(indices, [[1, 0]])
+
+
+class TestMatrixRows:
+    """Tests for reading full rows from stored matrices."""
+
+    def test_storage_modes(self, panel: pd.DataFrame, tmp_path: Path) -> None:
+        """Test that dense, lower-triangle, memory-mapped and condensed rows agree."""
+        data = panel.to_numpy()
+        matrix = correlate(data)
+        expected = matrix[[7, 0, 11]]
+        mapped = pearson_matrix_tiled(data, tmp_path / "corr.npy", tile_size=5)
+
+        for stored, lower in (
+            (matrix, False),
+            (np.tril(matrix), True),
+            (mapped, False),
+            (CondensedMatrix.from_dense(matrix), False),
+        ):
+            np.testing.assert_allclose(
+                matrix_rows(stored, [7, 0, 11], lower_triangle_only=lower), expected, atol=1e-6
+            )
+
+
+class TestNearestPartners:
+    """Tests for the nearest_partners function."""
+
+    @pytest.mark.parametrize("method", ["pearson", "spearman", "kendall"])
+    def test_streamed_from_data(self, panel: pd.DataFrame, method: str) -> None:
+        """Test that partners computed band by band match a full sort of the matrix."""
+        data = panel.to_numpy()
+        expected_indices, expected_values = sorted_partners(correlate(data, method), 4)
+
+        indices, values = nearest_partners(data_row_bands(data, method, band_size=5), 12, k=4)
+
+        np.testing.assert_allclose(values, expected_values)
+        if method == "pearson":  # rank correlations of few substrates tie
+            np.testing.assert_array_equal(indices, expected_indices)
+
+    def test_streamed_from_matrix(self, panel: pd.DataFrame) -> None:
+        """Test that stored matrices give the same partners as the data."""
+        data = panel.to_numpy()
+        expected = nearest_partners(data_row_bands(data), 12, k=3)
+
+        condensed = CondensedMatrix.from_dense(correlate(data))
+        indices, _values = nearest_partners(matrix_row_bands(condensed, band_size=4), 12, k=3)
+
+        np.testing.assert_array_equal(indices, expected[0])
+
+
+class TestTopPartners:
+    """Tests for the top_partners function."""
+
+    def test_single_row_from_data(self, panel: pd.DataFrame) -> None:
+        """Test that one enzyme is looked up without the full matrix."""
+        matrix = correlate(panel.to_numpy())
+        order = [j for j in np.argsort(-matrix[3], kind="stable") if j != 3][:5]
+
+        partners = top_partners(panel, "E3", k=5)
+
+        assert [name for name, _ in partners] == [f"E{j}" for j in order]
+        assert partners[0][1] == pytest.approx(matrix[3, order[0]])
+
+    def test_from_stored_matrix(self, panel: pd.DataFrame) -> None:
+        """Test that a stored lower-triangle matrix gives the same partners."""
+        matrix = np.tril(correlate(panel.to_numpy()))
+
+        partners = top_partners(panel, "E0", correlations=matrix, lower_triangle_only=True)
+
+        expected = top_partners(panel, "E0")
+        assert [name for name, _ in partners] == [name for name, _ in expected]
+        assert [value for _, value in partners] == pytest.approx([value for _, value in expected])
+        assert len(partners) == 10
+
+    def test_undefined_partners_left_out(self) -> None:
+        """Test that constant enzymes are not listed as partners."""
+        df = pd.DataFrame({"A": [1.0, 2.0, 3.0], "B": [2.0, 4.0, 7.0], "C": [1.0, 1.0, 1.0]})
+
+        assert [name for name, _ in top_partners(df, "A")] == ["B"]
+
+    def test_unknown_enzyme(self, panel: pd.DataFrame) -> None:
+        """Test that an unknown enzyme name is rejected."""
+        with pytest.raises(KeyError, match="CYP3A4"):
+            top_partners(panel, "CYP3A4")
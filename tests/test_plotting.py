@@ -0,0 +1,266 @@
+"""Tests for the plotting module."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import to_rgba
+from matplotlib.figure import Figure
+
+from enzyme_correlator.analysis import histogram_axis
+from enzyme_correlator.correlation import CondensedMatrix
+from enzyme_correlator.plotting import (
+    MAX_ANNOTATED_CELLS,
+    BlitManager,
+    CellAnnotations,
+    draw_correlation_matrix,
+    draw_histogram,
+    highlight_grouped_bins,
+    update_histogram,
+)
+
+
+def random_matrix(n: int) -> np.ndarray:
+    """Return a rounded random correlation matrix of n enzymes."""
+    rng = np.random.default_rng(5)
+    return np.corrcoef(rng.random((n, 8))).round(2)
+
+
+def labels(n: int) -> list[str]:
+    """Return n enzyme names."""
+    return [f"Enzyme{i}" for i in range(n)]
+
+
+@pytest.fixture
+def fig() -> Figure:
+    """Return an Agg-backed figure."""
+    figure = Figure()
+    FigureCanvasAgg(figure)
+    return figure
+
+
+class TestCellAnnotations:
+    """Tests for the CellAnnotations class."""
+
+    def test_small_matrix_fully_annotated(self, fig: Figure) -> None:
+        """Test that every cell of a small matrix gets its value."""
+        matrix = random_matrix(5)
+        ax = fig.add_subplot(111)
+        ax.imshow(matrix)
+
+        annotations = CellAnnotations(ax, matrix)
+
+        assert len(annotations.texts) == 25
+        assert {text.get_text() for text in annotations.texts} == {str(v) for v in matrix.ravel()}
+
+    def test_large_matrix_annotated_after_zoom(self, fig: Figure) -> None:
+        """Test that a large matrix is only annotated within a readable view."""
+        matrix = random_matrix(100)
+        ax = fig.add_subplot(111)
+        ax.imshow(matrix)
+        annotations = CellAnnotations(ax, matrix)
+        assert MAX_ANNOTATED_CELLS < 100 * 100
+        assert annotations.texts == []
+
+        ax.set_xlim(19.5, 29.5)
+        ax.set_ylim(49.5, 39.5)
+
+        assert len(annotations.texts) == 100
+        positions = {text.get_position() for text in annotations.texts}
+        assert positions == {(j, i) for i in range(40, 50) for j in range(20, 30)}
+        assert len(ax.texts) == 100
+
+    def test_labels_removed_when_zooming_out(self, fig: Figure) -> None:
+        """Test that zooming back out removes the labels."""
+        matrix = random_matrix(100)
+        ax = fig.add_subplot(111)
+        ax.imshow(matrix)
+        annotations = CellAnnotations(ax, matrix)
+        ax.set_xlim(-0.5, 4.5)
+        ax.set_ylim(4.5, -0.5)
+
+        ax.set_xlim(-0.5, 99.5)
+        ax.set_ylim(99.5, -0.5)
+
+        assert annotations.texts == []
+        assert len(ax.texts) == 0
+
+    def test_upper_triangle_white_for_lower_triangle_plots(self, fig: Figure) -> None:
+        """Test that upper-triangle labels are hidden in white."""
+        matrix = np.tril(random_matrix(3))
+        ax = fig.add_subplot(111)
+        ax.imshow(matrix)
+
+        annotations = CellAnnotations(ax, matrix, lower_triangle_only=True)
+
+        white = {text.get_position() for text in annotations.texts if text.get_color() == "white"}
+        assert white == {(1, 0), (2, 0), (2, 1)}
+
+
+class TestHeatmap:
+    """Tests for the Heatmap class."""
+
+    def test_set_matrix_updates_image_and_labels(self, fig: Figure) -> None:
+        """Test that a new matrix replaces image data and cell labels in place."""
+        heatmap = draw_correlation_matrix(fig, random_matrix(3), labels(3))
+        new = np.full((3, 3), 0.5)
+
+        heatmap.set_matrix(new)
+
+        np.testing.assert_array_equal(heatmap.image.get_array(), new)
+        assert heatmap.annotations is not None
+        assert {text.get_text() for text in heatmap.annotations.texts} == {"0.5"}
+        assert len(fig.axes[0].texts) == 9
+
+    def test_artists(self, fig: Figure) -> None:
+        """Test that the image and labels are the changing artists."""
+        heatmap = draw_correlation_matrix(fig, random_matrix(2), labels(2), animated=True)
+
+        artists = heatmap.artists()
+
+        assert artists[0] is heatmap.image
+        assert len(artists) == 5
+        assert all(artist.get_animated() for artist in artists)
+
+
+class TestDrawCorrelationMatrix:
+    """Tests for the draw_correlation_matrix function."""
+
+    def test_tick_labels_are_enzyme_names(self, fig: Figure) -> None:
+        """Test that every enzyme of a small panel is named on both axes."""
+        draw_correlation_matrix(fig, random_matrix(6), labels(6))
+        fig.canvas.draw()
+
+        ax = fig.axes[0]
+        names = [label.get_text() for label in ax.get_xticklabels() if label.get_text()]
+        assert names == labels(6)
+        assert len(ax.texts) == 36
+
+    def test_large_panel_thins_ticks_and_skips_labels(self, fig: Figure) -> None:
+        """Test that a large panel gets neither n^2 labels nor n tick labels."""
+        draw_correlation_matrix(fig, random_matrix(300), labels(300))
+        fig.canvas.draw()
+
+        ax = fig.axes[0]
+        assert len(ax.texts) == 0
+        assert len(ax.get_xticks()) <= 52
+
+    def test_condensed_matrix_rounded_at_display(self, fig: Figure) -> None:
+        """Test that a condensed matrix is drawn as float32 pixels with rounded labels."""
+        matrix = np.corrcoef(np.random.default_rng(1).random((4, 6)))
+
+        heatmap = draw_correlation_matrix(fig, CondensedMatrix.from_dense(matrix), labels(4))
+
+        assert heatmap.image.get_array().dtype == np.float32
+        assert heatmap.annotations is not None
+        shown = sorted(text.get_text() for text in heatmap.annotations.texts)
+        assert shown == sorted(str(value) for value in matrix.round(2).ravel().tolist())
+
+    def test_low_support_cells_masked(self, fig: Figure) -> None:
+        """Test that pairs sharing too few substrates are masked and drawn grey."""
+        support = np.array([[5, 2, 5], [2, 4, 3], [5, 3, 5]])
+
+        heatmap = draw_correlation_matrix(fig, random_matrix(3), labels(3), support=support)
+
+        pixels = heatmap.image.get_array()
+        np.testing.assert_array_equal(np.ma.getmaskarray(pixels), support < 3)
+        assert heatmap.image.get_cmap().get_bad().tolist() == list(to_rgba("lightgrey"))
+
+    def test_set_matrix_with_support(self, fig: Figure) -> None:
+        """Test that a new overlap is applied to the replaced image."""
+        heatmap = draw_correlation_matrix(
+            fig, random_matrix(2), labels(2), lower_triangle_only=True, min_support=4
+        )
+
+        heatmap.set_matrix(np.tril(random_matrix(2)), np.array([[4, 1], [1, 4]]))
+
+        mask = np.ma.getmaskarray(heatmap.image.get_array())
+        np.testing.assert_array_equal(mask, [[False, False], [True, False]])
+
+    def test_annotate_false(self, fig: Figure) -> None:
+        """Test that annotations can be switched off."""
+        draw_correlation_matrix(fig, random_matrix(4), labels(4), annotate=False)
+
+        assert len(fig.axes[0].texts) == 0
+
+
+class TestDrawHistogram:
+    """Tests for the draw_histogram and highlight_grouped_bins functions."""
+
+    def test_bars_drawn_from_counts(self, fig: Figure) -> None:
+        """Test that bar heights are the given counts."""
+        bins = histogram_axis()
+        counts = np.arange(len(bins) - 1)
+
+        bars = draw_histogram(fig, counts, bins, cutoff=0.85)
+
+        assert [bar.get_height() for bar in bars] == counts.tolist()
+        assert bars[0].get_x() == pytest.approx(-1.0)
+
+    def test_highlight_grouped_bins(self, fig: Figure) -> None:
+        """Test that recoloring follows the cutoff in both directions."""
+        bins = histogram_axis()
+        bars = draw_histogram(fig, np.ones(len(bins) - 1), bins, cutoff=0.85)
+        red = bars[-1].get_facecolor()
+
+        highlight_grouped_bins(bars, 0.5)
+        assert sum(bar.get_facecolor() == red for bar in bars) == 10
+
+        highlight_grouped_bins(bars, 0.9)
+        assert sum(bar.get_facecolor() == red for bar in bars) == 2
+
+    def test_update_histogram(self, fig: Figure) -> None:
+        """Test that bar heights and the count axis follow new counts."""
+        bins = histogram_axis()
+        bars = draw_histogram(fig, np.ones(len(bins) - 1), bins, cutoff=0.85)
+
+        update_histogram(bars, np.full(len(bins) - 1, 40))
+
+        assert {bar.get_height() for bar in bars} == {40}
+        assert fig.axes[0].get_ylim()[1] >= 40
+
+
+class TestBlitManager:
+    """Tests for the BlitManager class."""
+
+    def test_update_before_first_draw_requests_draw(self, fig: Figure) -> None:
+        """Test that without a cached background a full draw is requested."""
+        bars = draw_histogram(fig, np.ones(40), histogram_axis(), 0.85, animated=True)
+        blitter = BlitManager(fig, lambda: bars)
+
+        with patch.object(fig.canvas, "draw_idle") as draw_idle:
+            blitter.update()
+
+        draw_idle.assert_called_once()
+
+    def test_blits_over_cached_background(self, fig: Figure) -> None:
+        """Test that after a full draw only the artists are redrawn and blitted."""
+        bars = draw_histogram(fig, np.ones(40), histogram_axis(), 0.85, animated=True)
+        blitter = BlitManager(fig, lambda: bars)
+        fig.canvas.draw()
+        assert blitter.background is not None
+
+        with (
+            patch.object(fig, "draw_artist") as draw_artist,
+            patch.object(fig.canvas, "blit") as blit,
+            patch.object(fig.canvas, "draw") as draw,
+        ):
+            highlight_grouped_bins(bars, 0.5)
+            blitter.update()
+
+        assert draw_artist.call_count == 40
+        blit.assert_called_once()
+        draw.assert_not_called()
+
+    def test_static(self, fig: Figure) -> None:
+        """Test that static temporarily clears the animated flag."""
+        bars = draw_histogram(fig, np.ones(40), histogram_axis(), 0.85, animated=True)
+        blitter = BlitManager(fig, lambda: bars)
+
+        with blitter.static():
+            assert not any(bar.get_animated() for bar in bars)
+
+        assert all(bar.get_animated() for bar in bars)
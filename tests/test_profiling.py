@@ -0,0 +1,126 @@
+"""Tests for the stage profiler."""
+
+from __future__ import annotations
+
+import logging
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from enzyme_correlator.profiling import (
+    PROFILE_ENV_VAR,
+    StageProfiler,
+    StageRecord,
+    format_records,
+    profiled,
+)
+
+
+class Pipeline:
+    """Minimal owner of profiled methods."""
+
+    def __init__(self, profiler: StageProfiler) -> None:
+        self.profiler = profiler
+
+    @profiled("allocate")
+    def allocate(self, size: int) -> int:
+        return int(np.ones(size).sum())
+
+    @profiled("run")
+    def run(self) -> int:
+        return self.allocate(2**20)
+
+
+class TestStageProfiler:
+    """Tests for the StageProfiler class."""
+
+    def test_disabled_records_nothing(self) -> None:
+        """Test that a disabled profiler passes calls through without records."""
+        profiler = StageProfiler()
+
+        assert Pipeline(profiler).run() == 2**20
+        assert not profiler.records
+
+    def test_nested_stages(self) -> None:
+        """Test that inner stages are recorded first and the outer stage sees their peak."""
+        profiler = StageProfiler(enabled=True)
+
+        Pipeline(profiler).run()
+
+        inner, outer = profiler.records
+        assert (inner.stage, inner.depth) == ("allocate", 1)
+        assert (outer.stage, outer.depth) == ("run", 0)
+        assert inner.peak_bytes is not None and inner.peak_bytes >= 8 * 2**20
+        assert outer.peak_bytes is not None and outer.peak_bytes >= inner.peak_bytes
+        assert outer.seconds >= inner.seconds
+        assert not tracemalloc.is_tracing()
+
+    def test_time_only(self) -> None:
+        """Test that memory tracing can be left off."""
+        profiler = StageProfiler(enabled=True, trace_memory=False)
+
+        with profiler.stage("parse"):
+            pass
+
+        assert profiler.records[0].peak_bytes is None
+
+    def test_failing_stage_is_recorded(self) -> None:
+        """Test that a stage raising an error is still measured."""
+        profiler = StageProfiler(enabled=True)
+
+        with pytest.raises(RuntimeError), profiler.stage("parse"):
+            raise RuntimeError
+
+        assert profiler.records[0].stage == "parse"
+        assert not tracemalloc.is_tracing()
+
+    def test_listeners_and_logging(self, caplog: pytest.LogCaptureFixture) -> None:
+        """Test that records reach listeners and the log as structured fields."""
+        profiler = StageProfiler(enabled=True, trace_memory=False)
+        received: list[StageRecord] = []
+        profiler.add_listener(received.append)
+
+        with (
+            caplog.at_level(logging.DEBUG, logger="enzyme_correlator.profiling"),
+            profiler.stage("parse"),
+        ):
+            pass
+
+        assert received == list(profiler.records)
+        assert caplog.records[0].stage_record == received[0].as_dict()
+
+    def test_keeps_latest_records(self) -> None:
+        """Test that a long-running profiler only keeps its latest records."""
+        profiler = StageProfiler(enabled=True, trace_memory=False, max_records=3)
+
+        for stage in ["load", "parse", "correlate", "group", "plot"]:
+            with profiler.stage(stage):
+                pass
+
+        assert [record.stage for record in profiler.records] == ["correlate", "group", "plot"]
+
+    @pytest.mark.parametrize(
+        ("value", "enabled", "trace_memory"),
+        [("", False, True), ("0", False, True), ("1", True, True), ("time", True, False)],
+    )
+    def test_from_environment(self, value: str, enabled: bool, trace_memory: bool) -> None:
+        """Test that the environment variable enables the profiler and selects memory tracing."""
+        profiler = StageProfiler.from_environment({PROFILE_ENV_VAR: value})
+
+        assert profiler.enabled is enabled
+        assert profiler.trace_memory is trace_memory
+
+    def test_flag_overrides_unset_environment(self) -> None:
+        """Test that a command-line flag enables the profiler without the variable."""
+        assert StageProfiler.from_environment({}, enabled=True).enabled
+
+
+class TestFormatRecords:
+    """Tests for the format_records function."""
+
+    def test_status_line(self) -> None:
+        """Test that records are joined into one line with time and memory."""
+        records = [StageRecord("load", 1.5, 3 * 2**20, 0), StageRecord("parse", 0.25, None, 1)]
+
+        assert format_records(records) == "load 1.500 s, 3.0 MiB | parse 0.250 s"
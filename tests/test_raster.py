@@ -0,0 +1,172 @@
+"""Tests for the raster export of correlation matrices."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+from matplotlib import colormaps
+from PIL import Image
+
+from enzyme_correlator.correlation import CondensedMatrix, correlate, pearson_matrix_tiled
+from enzyme_correlator.raster import (
+    PngWriter,
+    colorize,
+    heatmap_bands,
+    write_heatmap_png,
+    write_heatmap_tiles,
+)
+
+
+@pytest.fixture
+def matrix() -> np.ndarray:
+    """Correlations of 37 enzymes, one pair undefined."""
+    matrix = correlate(np.random.default_rng(0).random((10, 37)))
+    matrix[3, 5] = matrix[5, 3] = np.nan
+    return matrix
+
+
+def heatmap_colors(values: np.ndarray) -> np.ndarray:
+    """Reference: the RGB colors matplotlib gives the rounded values in the heatmap."""
+    cmap = colormaps["bwr"].with_extremes(bad="lightgrey")
+    scaled = (np.round(values, 2) + 1) / 2
+    return cmap(np.ma.masked_invalid(scaled), bytes=True)[..., :3]
+
+
+def read_png(path: Path) -> np.ndarray:
+    """Decode a PNG file into an RGB array."""
+    with Image.open(path) as image:
+        return np.asarray(image.convert("RGB"))
+
+
+class TestPngWriter:
+    """Tests for the PngWriter class."""
+
+    def test_streamed_rows(self, tmp_path: Path) -> None:
+        """Test that rows written in several blocks decode to the full image."""
+        pixels = np.random.default_rng(1).integers(0, 256, (7, 5, 3), dtype=np.uint8)
+        path = tmp_path / "image.png"
+
+        with PngWriter(path, width=5, height=7) as writer:
+            writer.write_rows(pixels[:3])
+            writer.write_rows(pixels[3:])
+
+        np.testing.assert_array_equal(read_png(path), pixels)
+
+    def test_rejects_wrong_width(self, tmp_path: Path) -> None:
+        """Test that a block of another width is rejected."""
+        with PngWriter(tmp_path / "image.png", width=5, height=2) as writer:
+            with pytest.raises(ValueError, match="does not fit"):
+                writer.write_rows(np.zeros((2, 4, 3), dtype=np.uint8))
+            writer.write_rows(np.zeros((2, 5, 3), dtype=np.uint8))
+
+    def test_missing_rows(self, tmp_path: Path) -> None:
+        """Test that closing an incomplete image raises."""
+        writer = PngWriter(tmp_path / "image.png", width=2, height=2)
+        writer.write_rows(np.zeros((1, 2, 3), dtype=np.uint8))
+
+        with pytest.raises(ValueError, match="1 of 2"):
+            writer.close()
+
+
+class TestColorize:
+    """Tests for the colorize function."""
+
+    def test_matches_matplotlib(self, matrix: np.ndarray) -> None:
+        """Test that values get the heatmap colors and NaN the grey of undefined cells."""
+        values = np.round(matrix, 2)
+        values[0, :3] = [-1.0, 0.0, 1.0]
+
+        np.testing.assert_array_equal(colorize(values), heatmap_colors(values))
+
+
+class TestHeatmapBands:
+    """Tests for the heatmap_bands function."""
+
+    def test_lower_triangle_and_support(self, matrix: np.ndarray) -> None:
+        """Test that the upper triangle is blanked and low-support cells are undefined."""
+        support = np.full(matrix.shape, 5)
+        support[10, 2] = support[2, 10] = 1
+
+        values = np.concatenate(
+            list(heatmap_bands(matrix, lower_triangle_only=True, support=support, band_size=8))
+        )
+
+        assert np.isnan(values[10, 2])
+        assert values[2, 10] == 0
+        np.testing.assert_array_equal(values[np.triu_indices(37, 1)], 0)
+
+
+class TestWriteHeatmapPng:
+    """Tests for the write_heatmap_png function."""
+
+    def test_pixels_match_heatmap(self, matrix: np.ndarray, tmp_path: Path) -> None:
+        """Test that every cell becomes one pixel in the heatmap's color."""
+        path = tmp_path / "heatmap.png"
+
+        size = write_heatmap_png(matrix, path, band_size=8)
+
+        assert size == (37, 37)
+        np.testing.assert_array_equal(read_png(path), heatmap_colors(matrix))
+
+    def test_storage_modes(self, tmp_path: Path) -> None:
+        """Test that memory-mapped and condensed matrices give the same image."""
+        data = np.random.default_rng(2).random((6, 20))
+        dense = correlate(data)
+        write_heatmap_png(dense, tmp_path / "dense.png")
+        mapped = pearson_matrix_tiled(data, tmp_path / "corr.npy", tile_size=7)
+
+        for name, stored in (("mapped", mapped), ("condensed", CondensedMatrix.from_dense(dense))):
+            write_heatmap_png(stored, tmp_path / f"{name}.png", band_size=6)
+            np.testing.assert_array_equal(
+                read_png(tmp_path / f"{name}.png"), read_png(tmp_path / "dense.png")
+            )
+
+    def test_scale(self, matrix: np.ndarray, tmp_path: Path) -> None:
+        """Test that each cell can span several pixels."""
+        path = tmp_path / "heatmap.png"
+
+        write_heatmap_png(matrix, path, scale=3)
+
+        image = read_png(path)
+        assert image.shape == (111, 111, 3)
+        np.testing.assert_array_equal(image[::3, ::3], heatmap_colors(matrix))
+
+    def test_invalid_scale(self, matrix: np.ndarray, tmp_path: Path) -> None:
+        """Test that a scale below one pixel per cell is rejected."""
+        with pytest.raises(ValueError, match="scale"):
+            write_heatmap_png(matrix, tmp_path / "heatmap.png", scale=0)
+
+
+class TestWriteHeatmapTiles:
+    """Tests for the write_heatmap_tiles function."""
+
+    def test_tiles_assemble_image(self, matrix: np.ndarray, tmp_path: Path) -> None:
+        """Test that the full-resolution tiles put together give the whole image."""
+        levels = write_heatmap_tiles(matrix, tmp_path, tile_size=16)
+
+        assert levels == 1
+        rows = [
+            np.hstack([read_png(tmp_path / "0" / f"{row}_{column}.png") for column in range(3)])
+            for row in range(3)
+        ]
+        np.testing.assert_array_equal(np.vstack(rows), heatmap_colors(matrix))
+
+    def test_pyramid(self, matrix: np.ndarray, tmp_path: Path) -> None:
+        """Test that every level halves the resolution down to a single tile."""
+        levels = write_heatmap_tiles(matrix, tmp_path, tile_size=8, pyramid=True)
+
+        assert levels == 4
+        assert len(list((tmp_path / "0").iterdir())) == 25
+        assert len(list((tmp_path / "1").iterdir())) == 9
+        top = read_png(tmp_path / "3" / "0_0.png")
+        assert top.shape == (5, 5, 3)
+        cells = np.round(matrix[:16, :16], 2).astype(np.float32)
+        halved = np.nanmean(cells.reshape(8, 2, 8, 2), axis=(1, 3))
+        np.testing.assert_array_equal(read_png(tmp_path / "1" / "0_0.png"), colorize(halved))
+
+    def test_odd_pyramid_tiles(self, matrix: np.ndarray, tmp_path: Path) -> None:
+        """Test that pyramid tiles must have an even size."""
+        with pytest.raises(ValueError, match="even"):
+            write_heatmap_tiles(matrix, tmp_path, tile_size=7, pyramid=True)
@@ -0,0 +1,159 @@
+"""Tests for the substrate selection module."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from enzyme_correlator.analysis import analyze
+from enzyme_correlator.correlation import pearson_matrix
+from enzyme_correlator.selection import SubstrateSelection
+
+
+@pytest.fixture
+def panel() -> pd.DataFrame:
+    """Return a substrates x enzymes panel with a large offset and a constant enzyme."""
+    rng = np.random.default_rng(11)
+    df = pd.DataFrame(
+        rng.random((20, 6)) * 100 + 1e4,
+        index=[f"S{i}" for i in range(20)],
+        columns=[f"E{i}" for i in range(6)],
+    )
+    df["E5"] = 3.0
+    return df
+
+
+@pytest.fixture
+def gapped_panel(panel: pd.DataFrame) -> pd.DataFrame:
+    """Return the panel with a scattering of missing activities."""
+    rng = np.random.default_rng(12)
+    return panel.mask(rng.random(panel.shape) < 0.2)
+
+
+def reference(df: pd.DataFrame) -> np.ndarray:
+    """Recompute the correlation matrix from scratch."""
+    return pearson_matrix(df.to_numpy())
+
+
+class TestSubstrateSelection:
+    """Tests for the SubstrateSelection class."""
+
+    def test_everything_included_initially(self, panel: pd.DataFrame) -> None:
+        """Test that a new selection equals the full correlation matrix."""
+        selection = SubstrateSelection(panel)
+
+        assert selection.included_substrates == list(panel.index)
+        np.testing.assert_allclose(selection.correlations(), reference(panel), atol=1e-12)
+
+    def test_exclude_and_include(self, panel: pd.DataFrame) -> None:
+        """Test that toggling substrates matches recomputing on the remaining ones."""
+        selection = SubstrateSelection(panel)
+
+        selection.exclude("S3", "S8")
+        np.testing.assert_allclose(
+            selection.correlations(), reference(panel.drop(index=["S3", "S8"])), atol=1e-12
+        )
+
+        selection.include("S3")
+        np.testing.assert_allclose(
+            selection.correlations(), reference(panel.drop(index=["S8"])), atol=1e-12
+        )
+
+    def test_repeated_toggles_are_idempotent(self, panel: pd.DataFrame) -> None:
+        """Test that excluding an excluded substrate changes nothing."""
+        selection = SubstrateSelection(panel)
+
+        selection.exclude("S1")
+        selection.exclude("S1")
+
+        assert selection.included_substrates == [f"S{i}" for i in range(20) if i != 1]
+        np.testing.assert_allclose(
+            selection.correlations(), reference(panel.drop(index=["S1"])), atol=1e-12
+        )
+
+    def test_select(self, panel: pd.DataFrame) -> None:
+        """Test that select includes exactly the given substrates."""
+        selection = SubstrateSelection(panel)
+        selection.exclude("S0")
+
+        selection.select(["S0", "S2", "S4", "S6"])
+
+        assert selection.included_substrates == ["S0", "S2", "S4", "S6"]
+        assert selection.frame().index.tolist() == ["S0", "S2", "S4", "S6"]
+        np.testing.assert_allclose(
+            selection.correlations(), reference(panel.loc[["S0", "S2", "S4", "S6"]]), atol=1e-12
+        )
+
+    def test_constant_over_selection_is_nan(self, panel: pd.DataFrame) -> None:
+        """Test that an enzyme constant over the included substrates has no correlation."""
+        panel.loc[["S0", "S1", "S2"], "E0"] = 5.0
+        selection = SubstrateSelection(panel)
+
+        selection.select(["S0", "S1", "S2"])
+
+        matrix = selection.correlations()
+        assert np.isnan(matrix[0]).all()
+        assert np.isnan(matrix[5]).all()
+
+    def test_fewer_than_two_substrates(self, panel: pd.DataFrame) -> None:
+        """Test that a single included substrate gives an all-NaN matrix."""
+        selection = SubstrateSelection(panel)
+
+        selection.select(["S0"])
+
+        assert np.isnan(selection.correlations()).all()
+
+    def test_unknown_substrate(self, panel: pd.DataFrame) -> None:
+        """Test that unknown substrate names raise KeyError."""
+        selection = SubstrateSelection(panel)
+
+        with pytest.raises(KeyError, match="S99"):
+            selection.exclude("S99")
+
+    def test_analyze_matches_full_analysis(self, panel: pd.DataFrame) -> None:
+        """Test that analyze equals the analysis of the reduced frame."""
+        selection = SubstrateSelection(panel)
+        selection.exclude("S4", "S5")
+
+        result = selection.analyze(cutoff=0.2)
+        expected = analyze(panel.drop(index=["S4", "S5"]), cutoff=0.2)
+
+        assert result.grouping == expected.grouping
+        np.testing.assert_array_equal(result.histogram_counts, expected.histogram_counts)
+        np.testing.assert_allclose(result.correlations, expected.correlations, atol=1e-12)
+
+
+class TestMissingActivities:
+    """Tests for substrate selection over panels with missing activities."""
+
+    def test_toggles_match_pairwise_complete_correlation(self, gapped_panel: pd.DataFrame) -> None:
+        """Test that toggling substrates matches pandas' pairwise-complete correlation."""
+        selection = SubstrateSelection(gapped_panel)
+        np.testing.assert_allclose(
+            selection.correlations(), gapped_panel.corr().to_numpy(), atol=1e-10, equal_nan=True
+        )
+
+        selection.exclude("S0", "S4", "S9")
+        remaining = gapped_panel.drop(index=["S0", "S4", "S9"])
+        np.testing.assert_allclose(
+            selection.correlations(), remaining.corr().to_numpy(), atol=1e-10, equal_nan=True
+        )
+
+        selection.include("S4")
+        remaining = gapped_panel.drop(index=["S0", "S9"])
+        np.testing.assert_allclose(
+            selection.correlations(), remaining.corr().to_numpy(), atol=1e-10, equal_nan=True
+        )
+
+    def test_overlap(self, panel: pd.DataFrame, gapped_panel: pd.DataFrame) -> None:
+        """Test that overlap counts follow the selection and are only kept for gaps."""
+        selection = SubstrateSelection(gapped_panel)
+        selection.exclude("S1")
+
+        overlap = selection.overlap()
+
+        present = gapped_panel.drop(index="S1").notna().to_numpy(dtype=int)
+        np.testing.assert_array_equal(overlap, present.T @ present)
+        assert SubstrateSelection(panel).overlap() is None
+        assert selection.analyze().overlap is not None
@@ -0,0 +1,144 @@
+"""Tests for the permutation and bootstrap statistics."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from enzyme_correlator import significance
+from enzyme_correlator.correlation import pearson_matrix
+from enzyme_correlator.significance import assess_significance
+
+
+@pytest.fixture
+def panel() -> pd.DataFrame:
+    """Three tightly correlated enzymes next to three unrelated ones."""
+    rng = np.random.default_rng(1)
+    trend = rng.random((20, 1))
+    values = np.hstack([trend + 0.05 * rng.random((20, 3)), rng.random((20, 3))])
+    return pd.DataFrame(values, columns=[f"E{i}" for i in range(6)])
+
+
+@pytest.fixture
+def grouping() -> dict[int, list[str]]:
+    """A correlated group and a group of unrelated enzymes."""
+    return {1: ["E0", "E1", "E2"], 2: ["E3", "E4"]}
+
+
+class TestAssessSignificance:
+    """Tests for the assess_significance function."""
+
+    def test_correlated_pairs_are_significant(
+        self, panel: pd.DataFrame, grouping: dict[int, list[str]]
+    ) -> None:
+        """Test that strong correlations get the smallest possible p-value."""
+        result = assess_significance(panel, grouping, resamples=99)
+
+        np.testing.assert_allclose(result.correlations, pearson_matrix(panel.to_numpy()))
+        assert result.p_values[1, 0] == pytest.approx(0.01)
+        assert result.p_values[4, 3] > 0.1
+        assert np.isnan(np.diag(result.p_values)).all()
+        np.testing.assert_array_equal(result.p_values, result.p_values.T)
+
+    def test_intervals_bracket_correlations(self, panel: pd.DataFrame) -> None:
+        """Test that bootstrap intervals are ordered and contain strong correlations."""
+        result = assess_significance(panel, resamples=200)
+
+        assert (result.lower <= result.upper).all()
+        assert result.lower[1, 0] <= result.correlations[1, 0] <= result.upper[1, 0]
+        assert result.upper[4, 3] - result.lower[4, 3] > result.upper[1, 0] - result.lower[1, 0]
+
+    def test_groups(self, panel: pd.DataFrame, grouping: dict[int, list[str]]) -> None:
+        """Test that groups get the mean correlation of their pairs and its statistics."""
+        result = assess_significance(panel, grouping, resamples=99)
+        correlated = result.groups[1]
+
+        expected = result.correlations[[1, 2, 2], [0, 0, 1]].mean()
+        assert correlated.enzymes == ["E0", "E1", "E2"]
+        assert correlated.mean_correlation == pytest.approx(expected)
+        assert correlated.p_value == pytest.approx(0.01)
+        assert correlated.interval[0] <= expected <= correlated.interval[1]
+        assert result.groups[2].p_value > 0.1
+
+    def test_independent_of_jobs_and_batches(
+        self,
+        panel: pd.DataFrame,
+        grouping: dict[int, list[str]],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test that the seed alone determines the results."""
+        expected = assess_significance(panel, grouping, resamples=40, seed=7)
+
+        monkeypatch.setattr(significance, "RESAMPLE_BATCH_SIZE", 3)
+        monkeypatch.setattr(significance, "_BAND_VALUES", 40 * 6 * 2)
+        monkeypatch.setattr(significance, "PARALLEL_MIN_WORK", 0)
+        batched = assess_significance(panel, grouping, resamples=40, seed=7)
+        parallel = assess_significance(panel, grouping, resamples=40, seed=7, jobs=2)
+
+        for result in (batched, parallel):
+            np.testing.assert_array_equal(result.p_values, expected.p_values)
+            np.testing.assert_allclose(result.lower, expected.lower)
+            np.testing.assert_allclose(result.upper, expected.upper)
+            assert result.groups == expected.groups
+
+    def test_small_panel_stays_in_process(
+        self, panel: pd.DataFrame, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that no worker processes are started for little work."""
+
+        def no_pool(jobs: int) -> None:
+            raise AssertionError(f"started {jobs} workers")
+
+        monkeypatch.setattr(significance, "process_pool", no_pool)
+
+        result = assess_significance(panel, resamples=40, seed=7, jobs=8)
+
+        assert result.p_values.shape == (6, 6)
+
+    def test_constant_resamples_are_undefined(self) -> None:
+        """Test that a column constant within a resample correlates NaN, not 1 and ~0."""
+        blocks = np.random.default_rng(4).random((2, 7, 3))
+        blocks[0, :, 0] = 0.1
+
+        values = significance._batch_correlations(blocks, 0, 3)
+
+        assert np.isnan(values[0, 0]).all()
+        assert np.isnan(values[0, 1:, 0]).all()
+        assert not np.isnan(values[1]).any()
+
+    def test_seed_changes_resamples(self, panel: pd.DataFrame) -> None:
+        """Test that another seed draws other resamples."""
+        first = assess_significance(panel, resamples=40, seed=1)
+        second = assess_significance(panel, resamples=40, seed=2)
+
+        assert not np.array_equal(first.lower, second.lower)
+
+    def test_missing_activities(self, panel: pd.DataFrame) -> None:
+        """Test that missing activities are left out of every resample pair by pair."""
+        panel.iloc[3, 1] = np.nan
+
+        result = assess_significance(panel, resamples=49)
+
+        assert result.p_values[1, 0] == pytest.approx(0.02)
+        assert not np.isnan(result.lower[1, 0])
+
+    def test_spearman(self, panel: pd.DataFrame) -> None:
+        """Test that Spearman correlations are resampled on ranks."""
+        result = assess_significance(panel, method="spearman", resamples=49)
+
+        np.testing.assert_allclose(result.correlations, panel.rank().corr().to_numpy())
+        assert result.p_values[1, 0] == pytest.approx(0.02)
+
+    @pytest.mark.parametrize("method", ["kendall", "distance"])
+    def test_unsupported_method(self, panel: pd.DataFrame, method: str) -> None:
+        """Test that methods without a batched matrix form are rejected."""
+        with pytest.raises(ValueError, match="cannot be resampled"):
+            assess_significance(panel, method=method, resamples=10)
+
+    def test_invalid_arguments(self, panel: pd.DataFrame) -> None:
+        """Test that resample counts and confidence levels are checked."""
+        with pytest.raises(ValueError, match="resamples"):
+            assess_significance(panel, resamples=0)
+        with pytest.raises(ValueError, match="confidence"):
+            assess_significance(panel, confidence=1.0)
@@ -0,0 +1,70 @@
+"""Tests for the worker module."""
+
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from enzyme_correlator.worker import CoalescingWorker
+
+
+class TestCoalescingWorker:
+    """Tests for the CoalescingWorker class."""
+
+    def test_result_after_wait(self) -> None:
+        """Test that a finished request is returned once with its result."""
+        worker: CoalescingWorker[int, int] = CoalescingWorker(lambda x: x * x)
+
+        worker.submit(7)
+        assert worker.wait(timeout=5)
+
+        assert worker.result() == (7, 49)
+        assert worker.result() is None
+        assert worker.idle
+
+    def test_stale_requests_dropped(self) -> None:
+        """Test that requests replaced before they start are never computed."""
+        started = threading.Event()
+        release = threading.Event()
+        computed: list[int] = []
+
+        def slow(x: int) -> int:
+            started.set()
+            release.wait(timeout=5)
+            computed.append(x)
+            return x
+
+        worker: CoalescingWorker[int, int] = CoalescingWorker(slow)
+        worker.submit(1)
+        assert started.wait(timeout=5)
+        for x in range(2, 10):
+            worker.submit(x)
+        assert not worker.idle
+        release.set()
+        assert worker.wait(timeout=5)
+
+        assert computed == [1, 9]
+        assert worker.result() == (9, 9)
+
+    def test_failure_raised_by_result(self) -> None:
+        """Test that an error of the computation surfaces in result()."""
+
+        def fail(_x: int) -> int:
+            raise ValueError("boom")
+
+        worker: CoalescingWorker[int, int] = CoalescingWorker(fail)
+        worker.submit(1)
+        assert worker.wait(timeout=5)
+
+        with pytest.raises(ValueError, match="boom"):
+            worker.result()
+        assert worker.result() is None
+
+    def test_closed_worker_rejects_requests(self) -> None:
+        """Test that submitting to a closed worker raises RuntimeError."""
+        worker: CoalescingWorker[int, int] = CoalescingWorker(lambda x: x)
+        worker.close()
+
+        with pytest.raises(RuntimeError, match="closed"):
+            worker.submit(1)